@@ -21,268 +21,1233 @@ __version__ = "0.0.1"
 import os
 import re
 import json
+import datetime
+import shutil
+import tempfile
+import threading
+import collections
+import contextlib
 import subprocess
+import time
+import types
 
 # Third-party library imports
-from PySide6.QtCore import Qt
-from PySide6.QtWidgets import (
-    QApplication, QWidget, QMainWindow,
-    QTreeView, QAbstractItemView, QLabel,
-    QVBoxLayout, QPushButton
-)
-from PySide6.QtGui import QStandardItem, QStandardItemModel, QFont, QColor
-from shotgun_api3.shotgun import Shotgun
+# PySide6 and shotgun_api3 are imported on first use so loading this module
+# at Nuke startup (including farm `nuke -t` sessions) stays cheap. For the
+# same reason hashlib, sqlite3, fractions and concurrent.futures are imported
+# by the functions using them; benchmarks/imports.py holds the budget.
 
 # Local application imports
 from .config import SERVER_PATH, LOGIN, PASSWORD, PROJECT_FOLDER_LOCATION
-import nuke
+from . import config
+from .sequences import find_sequence
+from .tracing import traced, span, current, process_span
+try:
+    import nuke
+except ImportError:  # plain Python, e.g. the headless command line
+    nuke = None
+
+
+# Optional settings, override them in config.py
+CACHE_FOLDER_LOCATION = getattr(
+    config, "CACHE_FOLDER_LOCATION", os.path.join(os.path.expanduser("~"), ".sgnukebuilder")
+)
+TASK_CACHE_MAX_AGE = getattr(config, "TASK_CACHE_MAX_AGE", 24 * 60 * 60)  # seconds before a full re-query
+EXTRACT_WORKERS = getattr(config, "EXTRACT_WORKERS", 0)  # ffmpeg processes per extraction, 0 = auto
+EXTRACT_MIN_SEGMENT_FRAMES = getattr(config, "EXTRACT_MIN_SEGMENT_FRAMES", 48)
+PLATE_FORMAT = getattr(config, "PLATE_FORMAT", "exr")  # encoding of extracted plates, one of PLATE_FORMATS
+STREAMING_PUBLISH = getattr(config, "STREAMING_PUBLISH", False)  # encode the review movie while rendering
+STREAM_BATCH_FRAMES = getattr(config, "STREAM_BATCH_FRAMES", 24)
+NUKE_EXECUTABLE = getattr(config, "NUKE_EXECUTABLE", "nuke")  # used for command line renders
+PARALLEL_RENDER = getattr(config, "PARALLEL_RENDER", False)  # render frame chunks in separate Nuke processes
+RENDER_PROCESSES = getattr(config, "RENDER_PROCESSES", 0)  # 0 = auto from the core count
+RENDER_THREADS_PER_PROCESS = getattr(config, "RENDER_THREADS_PER_PROCESS", 4)
+RENDER_MIN_CHUNK_FRAMES = getattr(config, "RENDER_MIN_CHUNK_FRAMES", 10)
+RENDER_CACHE = getattr(config, "RENDER_CACHE", True)  # skip publish renders whose script and inputs are unchanged
+INCREMENTAL_RENDER = getattr(config, "INCREMENTAL_RENDER", True)  # only render missing, empty or outdated frames
+SG_POOL_SIZE = getattr(config, "SG_POOL_SIZE", 4)  # ShotGrid connections used at once per process
+SG_POOL_TIMEOUT = getattr(config, "SG_POOL_TIMEOUT", 120)  # seconds to wait for a free connection, 0 = forever
+SG_POOL_MAX_IDLE = getattr(config, "SG_POOL_MAX_IDLE", 300)  # seconds before an unused connection is replaced
+SG_RETRIES = getattr(config, "SG_RETRIES", 2)  # retries of calls failing on the network, a busy site or a lost session
+
+FIRST_FRAME = 1001
+PIPELINE_FPS = 24
+
+# Encodings plates can be extracted to: file extension, ffmpeg output options and
+# bytes per pixel before compression. ffmpeg's EXR encoder has no piz or dwaa.
+PLATE_FORMATS = {
+    "exr": {"extension": "exr", "options": [], "bytes_per_pixel": 12},  # ffmpeg's default, float, uncompressed
+    "exr_zip": {"extension": "exr", "options": ["-compression", "zip1"], "bytes_per_pixel": 12},
+    "exr_half": {"extension": "exr", "options": ["-format", "half"], "bytes_per_pixel": 6},
+    "exr_half_rle": {"extension": "exr", "options": ["-format", "half", "-compression", "rle"], "bytes_per_pixel": 6},
+    "exr_half_zip": {"extension": "exr", "options": ["-format", "half", "-compression", "zip1"], "bytes_per_pixel": 6},
+    "exr_half_zip16": {
+        "extension": "exr", "options": ["-format", "half", "-compression", "zip16"], "bytes_per_pixel": 6
+    },
+    "dpx10": {"extension": "dpx", "options": ["-pix_fmt", "gbrp10le"], "bytes_per_pixel": 4},
+    "dpx16": {"extension": "dpx", "options": ["-pix_fmt", "rgb48le"], "bytes_per_pixel": 6},
+}
+PLATE_FORMATS.update(getattr(config, "PLATE_FORMATS", {}))
+
+_USER_ID = None
+_SG_POOL = None
+_SG_LOCK = threading.Lock()
+
+
+def get_user_id():
+    """Read the ShotGrid user id from the USER_ID environment variable once"""
+    global _USER_ID
+    if _USER_ID is None:
+        user_id = os.getenv("USER_ID")
+        if not user_id:
+            print("USER_ID environment variable is not set")
+            return None
+        _USER_ID = int(user_id)
+        print('ID: ', _USER_ID)
+    return _USER_ID
 
 
-RETRIEVED_USER_ID = int(os.getenv("USER_ID"))
-if not RETRIEVED_USER_ID:
-    print("USER_ID environment variable is not set")
-print('ID: ', RETRIEVED_USER_ID)
+def create_shotgun():
+    """Open a new ShotGrid connection with the config credentials"""
+    from shotgun_api3.shotgun import Shotgun
 
-SG = Shotgun(
-    SERVER_PATH,
-    login=LOGIN,
-    password=PASSWORD
-)
+    return Shotgun(
+        SERVER_PATH,
+        login=LOGIN,
+        password=PASSWORD
+    )
 
 
-class PipelineFileManager:
-    """Unified file path manager with consistent naming conventions"""
+def get_shotgun_pool():
+    """The process wide ShotGrid connection pool, created on first use"""
+    global _SG_POOL
+    with _SG_LOCK:
+        if _SG_POOL is None:
+            _SG_POOL = ShotGridPool()
+    return _SG_POOL
 
-    def __init__(self, base_path=None, tree=None):
-        self.proj_path = base_path or PROJECT_FOLDER_LOCATION
-        self.tree = tree
-        self.proj = None
-        self.seq = None
-        self.shot = None
 
-    def get_data(self):
-        """Get current selection data from tree"""
-        if not self.tree:
-            print('No tree found')
-            return
+def shotgun_failure(error):
+    """Why a ShotGrid call failed: 'session', 'network', 'busy' or None for errors a retry won't fix"""
+    from xmlrpc.client import ProtocolError
+    from shotgun_api3.shotgun import AuthenticationFault
+    from shotgun_api3.lib.httplib2 import HttpLib2Error
 
-        index = self.tree.currentIndex()
-        item = self.tree.model().itemFromIndex(index)
-        if item:
-            self.proj = item.data(Qt.UserRole)
-            self.seq = item.data(Qt.UserRole + 1)
-            self.shot = item.data(Qt.UserRole + 2)
-            print('All data set')
+    if isinstance(error, AuthenticationFault):
+        return 'session'
+    if isinstance(error, (OSError, HttpLib2Error)):
+        return 'network'
+    if isinstance(error, ProtocolError) and error.errcode in (429, 502, 503, 504):
+        return 'busy'
+    return None
 
-    def get_shot_dir(self):
-        """Get base shot directory"""
-        if not all([self.proj, self.seq, self.shot]):
-            self.get_data()
 
-        if not all([self.proj, self.seq, self.shot]):
-            print("Missing project, sequence, or shot data")
-            return None
+class _PoolWaiter:
+    """A thread queued for a pool connection; release() hands it one directly"""
 
-        base = os.path.join(
-            self.proj_path,
-            self.proj,
-            "shots",
-            self.seq,
-            self.shot.split('_')[-1]
-        )
-        return base
+    __slots__ = ('event', 'granted', 'connection')
 
-    def get_latest_version(self, folder_path):
-        """Get latest version folder (v001, v002, etc.)"""
-        if not os.path.exists(folder_path):
-            print(f"Path not found: {folder_path}")
-            return None
+    def __init__(self):
+        self.event = threading.Event()
+        self.granted = False
+        self.connection = None  # None with granted set: open a new connection in the freed slot
+
+
+class ShotGridPool:
+    """Bounded pool of ShotGrid connections.
+
+    A Shotgun instance keeps one HTTP connection and must only be used by one
+    thread at a time. Every operation borrows a connection with connection()
+    or call(); connections are opened on demand up to size and, when all are
+    busy, callers queue and get them in the order they asked. A connection
+    that failed on the network or an expired session, or sat unused longer
+    than max_idle, is dropped and replaced by a fresh one.
+    """
+
+    def __init__(self, factory=None, size=None, timeout=None, max_idle=None):
+        self.factory = factory or create_shotgun
+        self.size = max(1, size or SG_POOL_SIZE)
+        self.timeout = SG_POOL_TIMEOUT if timeout is None else timeout
+        self.max_idle = SG_POOL_MAX_IDLE if max_idle is None else max_idle
+        self._idle = []  # (connection, monotonic time it was returned), most recent last
+        self._waiters = collections.deque()
+        self._open = 0
+        self._in_use = 0
+        self._lock = threading.Lock()
+        self._counters = {
+            "borrows": 0, "waits": 0, "wait_seconds": 0.0, "max_wait_seconds": 0.0, "timeouts": 0,
+            "created": 0, "reconnects": 0, "expired_sessions": 0, "retries": 0, "peak_in_use": 0,
+        }
 
-        try:
-            all_dirs = [
-                d for d in os.listdir(folder_path)
-                if os.path.isdir(os.path.join(folder_path, d)) and re.match(r'v\d{3}', d)
-            ]
+    def acquire(self):
+        """Borrow a connection, opening one if none is idle; give it back with release() or discard()"""
+        started = time.monotonic()
+        waiter = None
+        with self._lock:
+            # Queued callers go first, so a busy thread can't keep taking connections back
+            granted = None if self._waiters else self._take(started)
+            if granted is None:
+                waiter = _PoolWaiter()
+                self._waiters.append(waiter)
+
+        if waiter is None:
+            connection = granted[0]
+        else:
+            if not waiter.event.wait(self.timeout or None):
+                with self._lock:
+                    if not waiter.granted:
+                        self._waiters.remove(waiter)
+                        self._counters["timeouts"] += 1
+                        raise TimeoutError(f"No free ShotGrid connection after {self.timeout} s, {self.size} in use")
+            connection = waiter.connection
+
+        with self._lock:
+            self._in_use += 1
+            counters = self._counters
+            counters["borrows"] += 1
+            counters["peak_in_use"] = max(counters["peak_in_use"], self._in_use)
+            if waiter is not None:
+                wait = time.monotonic() - started
+                counters["waits"] += 1
+                counters["wait_seconds"] += wait
+                counters["max_wait_seconds"] = max(counters["max_wait_seconds"], wait)
+        if waiter is not None:
+            current().set(pool_wait_ms=round((time.monotonic() - started) * 1000, 1))
+
+        if connection is None:
+            try:
+                connection = self.factory()
+            except Exception:
+                with self._lock:
+                    self._in_use -= 1
+                    self._free_slot()
+                raise
+            with self._lock:
+                self._counters["created"] += 1
+        return connection
+
+    def _take(self, now):
+        """(connection,) from the idle list, (None,) for a slot to open one in, None when all are busy"""
+        while self._idle:
+            connection, returned_at = self._idle.pop()
+            if not self.max_idle or now - returned_at <= self.max_idle:
+                return (connection,)
+            # The site has likely closed it already; replace it rather than fail the call
+            self._open -= 1
+            self._counters["reconnects"] += 1
+        if self._open < self.size:
+            self._open += 1
+            return (None,)
+        return None
+
+    def _grant(self, connection):
+        waiter = self._waiters.popleft()
+        waiter.connection = connection
+        waiter.granted = True
+        waiter.event.set()
+
+    def _free_slot(self):
+        if self._waiters:
+            self._grant(None)
+        else:
+            self._open -= 1
 
-            if all_dirs:
-                versions = [int(re.search(r'v(\d{3})', d).group(1)) for d in all_dirs]
-                max_version = max(versions)
-                return f"v{max_version:03d}"
+    def release(self, connection):
+        with self._lock:
+            self._in_use -= 1
+            if self._waiters:
+                self._grant(connection)
             else:
-                print(f"No version folders found in: {folder_path}")
-                return None
+                self._idle.append((connection, time.monotonic()))
+
+    def discard(self, connection):
+        """Drop a broken connection; its slot goes to the next borrower, who opens a new one"""
+        with self._lock:
+            self._in_use -= 1
+            self._counters["reconnects"] += 1
+            self._free_slot()
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    @contextlib.contextmanager
+    def connection(self):
+        """Borrow a connection for a block: `with pool.connection() as sg: sg.find(...)`"""
+        connection = self.acquire()
+        try:
+            yield connection
         except Exception as e:
+            if shotgun_failure(e) in ('session', 'network'):
+                self.discard(connection)
+            else:
+                self.release(connection)
+            raise
+        except BaseException:
+            self.release(connection)
+            raise
+        self.release(connection)
+
+    def call(self, method, *args, retry=True, **kwargs):
+        """Run one Shotgun method on a borrowed connection, e.g. call('find', 'Task', filters, fields).
+
+        Calls failing on an expired session are always repeated on a new
+        connection, the site rejected them before doing anything. Network
+        errors and a busy site (429, 502-504) are retried only with retry=True;
+        pass retry=False for calls that create something, so a request that
+        did reach the site isn't applied twice.
+        """
+        attempt = 0
+        while True:
+            try:
+                with self.connection() as sg:
+                    return getattr(sg, method)(*args, **kwargs)
+            except Exception as e:
+                failure = shotgun_failure(e)
+                if failure == 'session':
+                    with self._lock:
+                        self._counters["expired_sessions"] += 1
+                if failure is None or attempt >= SG_RETRIES or (failure != 'session' and not retry):
+                    raise
+                attempt += 1
+                with self._lock:
+                    self._counters["retries"] += 1
+                print(f"ShotGrid {method} failed ({e}), retry {attempt} of {SG_RETRIES}")
+                if failure == 'busy':
+                    time.sleep(attempt)
+
+    def metrics(self):
+        """Counters and current state, to size SG_POOL_SIZE"""
+        with self._lock:
+            metrics = dict(self._counters, size=self.size, open=self._open, in_use=self._in_use, idle=len(self._idle))
+        metrics["mean_wait_seconds"] = metrics["wait_seconds"] / metrics["waits"] if metrics["waits"] else 0.0
+        return metrics
+
+    def print_metrics(self):
+        m = self.metrics()
+        print(f"ShotGrid pool: {m['in_use']}/{m['size']} in use (peak {m['peak_in_use']}), {m['open']} open, "
+              f"{m['borrows']} borrows, {m['waits']} waited (mean {m['mean_wait_seconds'] * 1000:.0f} ms, "
+              f"max {m['max_wait_seconds'] * 1000:.0f} ms), {m['timeouts']} timeouts, {m['created']} created, "
+              f"{m['reconnects']} reconnects, {m['expired_sessions']} expired sessions, {m['retries']} retries")
+
+    def close(self):
+        with self._lock:
+            idle = [connection for connection, _ in self._idle]
+            self._open -= len(idle)
+            self._idle = []
+        for connection in idle:
+            try:
+                connection.close()
+            except Exception:
+                pass
+
+
+VERSION_REGEX = re.compile(r'v(\d{3})')
+
+
+class VersionIndex:
+    """Cache of version folders per directory, rescanned only when the directory mtime changes"""
+
+    def __init__(self):
+        self._entries = {}  # folder_path -> (mtime_ns, sorted version numbers)
+        self._lock = threading.Lock()
+
+    def get_versions(self, folder_path):
+        """Return the sorted version numbers in folder_path, or None if it doesn't exist"""
+        return self.lookup(folder_path)[1]
+
+    def lookup(self, folder_path):
+        """(folder mtime_ns, sorted version numbers), (None, None) if the folder doesn't exist"""
+        try:
+            mtime = os.stat(folder_path).st_mtime_ns
+        except OSError:
+            with self._lock:
+                self._entries.pop(folder_path, None)
+            return None, None
+
+        with self._lock:
+            entry = self._entries.get(folder_path)
+        if entry and entry[0] == mtime:
+            return entry
+
+        try:
+            versions = self._scan(folder_path)
+        except OSError as e:
             print(f"Error getting latest version: {e}")
-            return None
+            return mtime, None
 
-    def get_next_version(self, folder_path):
-        """Get next version number"""
-        latest = self.get_latest_version(folder_path)
-        if latest is None:
-            return "v001"
+        with self._lock:
+            self._entries[folder_path] = (mtime, versions)
+        return mtime, versions
 
-        version_num = int(re.search(r'v(\d{3})', latest).group(1))
-        return f"v{version_num + 1:03d}"
+    def add_version(self, folder_path, version):
+        """Record a version folder we just created so the next lookup doesn't rescan"""
+        version_num = int(VERSION_REGEX.match(version).group(1))
+        try:
+            mtime = os.stat(folder_path).st_mtime_ns
+        except OSError:
+            return
 
-    def make_filename(self, task, version, extension=""):
-        """Create standardized filename: proj_seq_shot_task_version.ext"""
-        if not all([self.proj, self.seq, self.shot]):
-            self.get_data()
+        with self._lock:
+            entry = self._entries.get(folder_path)
+            if entry is None:
+                return
+            versions = entry[1]
+            if version_num not in versions:
+                versions = sorted(versions + [version_num])
+            self._entries[folder_path] = (mtime, versions)
+
+    def invalidate(self, folder_path=None):
+        """Drop cached entries for one folder, or all of them"""
+        with self._lock:
+            if folder_path is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(folder_path, None)
 
-        if not all([self.proj, self.seq, self.shot]):
-            print("Cannot create filename - missing project data")
-            return None
+    @staticmethod
+    def _scan(folder_path):
+        versions = []
+        with os.scandir(folder_path) as entries:
+            for entry in entries:
+                match = VERSION_REGEX.match(entry.name)
+                if match and entry.is_dir():
+                    versions.append(int(match.group(1)))
+        versions.sort()
+        return versions
 
-        base_name = f"{self.proj}_{self.seq}_{self.shot}_{task}_{version}"
 
-        if extension:
-            return f"{base_name}.{extension}"
-        return base_name
+VERSION_INDEX = VersionIndex()
 
-    def get_source_video_path(self):
-        """Get source video file path"""
-        shot_dir = self.get_shot_dir()
-        if not shot_dir:
-            return None
 
-        source_dir = os.path.join(shot_dir, "source", "output")
-        latest_version = self.get_latest_version(source_dir)
+class TaskCache:
+    """On-disk cache of task query results, one JSON file per user and query"""
 
-        if not latest_version:
-            print("No source video version found")
-            return None
+    def __init__(self, cache_dir=None):
+        self.cache_dir = cache_dir or os.path.join(CACHE_FOLDER_LOCATION, "tasks")
 
-        video_filename = self.make_filename("source", latest_version, "mov")
-        video_path = os.path.join(source_dir, latest_version, video_filename)
+    @staticmethod
+    def make_key(user_id, filters, fields):
+        import hashlib
 
-        if os.path.exists(video_path):
-            return video_path
+        payload = json.dumps([user_id, filters, fields], sort_keys=True, default=str)
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+    def path(self, key):
+        return os.path.join(self.cache_dir, f"tasks_{key}.json")
+
+    def load(self, key):
+        """Return (fetched_at, tasks) or None when there is no usable cache"""
+        try:
+            with open(self.path(key), "r", encoding="utf-8") as f:
+                cached = json.load(f)
+            fetched_at = datetime.datetime.fromisoformat(cached["fetched_at"])
+            return fetched_at, cached["tasks"]
+        except (OSError, ValueError, KeyError) as e:
+            if not isinstance(e, FileNotFoundError):
+                print(f"Ignoring unreadable task cache: {e}")
+            return None
+
+    def save(self, key, fetched_at, tasks):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self.path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"fetched_at": fetched_at.isoformat(), "tasks": tasks}, f, default=_json_default)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Could not write task cache: {e}")
+
+
+def _json_default(value):
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    return str(value)
+
+
+class MediaRecord:
+    """What ffprobe reports about a movie's first video stream"""
+
+    __slots__ = ('path', 'size', 'mtime_ns', 'width', 'height', 'fps', 'frame_count', 'duration', 'pix_fmt', 'codec')
+
+    def __init__(self, path, size, mtime_ns, width, height, fps, frame_count, duration, pix_fmt, codec):
+        self.path = path
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self.width = width
+        self.height = height
+        self.fps = fps  # fractions.Fraction, e.g. 24000/1001
+        self.frame_count = frame_count
+        self.duration = duration  # seconds
+        self.pix_fmt = pix_fmt
+        self.codec = codec
+
+    def __repr__(self):
+        return (f"<MediaRecord {os.path.basename(self.path)} {self.width}x{self.height} {self.fps} fps "
+                f"{self.frame_count} frames {self.codec} {self.pix_fmt}>")
+
+    @property
+    def pipeline_frame_count(self):
+        """Frames the movie gives once converted to PIPELINE_FPS"""
+        if self.fps == PIPELINE_FPS and self.frame_count:
+            return self.frame_count
+        return int(round(self.duration * PIPELINE_FPS)) if self.duration else self.frame_count
+
+    @classmethod
+    def from_ffprobe(cls, path, stat, info):
+        from fractions import Fraction
+
+        stream = info["streams"][0]
+        fps = Fraction(0)
+        for key in ("r_frame_rate", "avg_frame_rate"):
+            num, _, den = stream.get(key, "0/0").partition("/")
+            try:
+                fps = Fraction(num) / Fraction(den or 1)
+            except (ValueError, ZeroDivisionError):  # 0/0 when unknown
+                continue
+            if fps:
+                break
+
+        duration = stream.get("duration") or info.get("format", {}).get("duration")
+        duration = float(duration) if duration not in (None, "N/A") else None
+        frame_count = stream.get("nb_frames")
+        if frame_count in (None, "N/A"):
+            frame_count = int(round(duration * fps)) if duration and fps else None
         else:
-            print(f"Source video not found: {video_path}")
+            frame_count = int(frame_count)
+        return cls(path, stat.st_size, stat.st_mtime_ns, int(stream["width"]), int(stream["height"]),
+                   fps, frame_count, duration, stream.get("pix_fmt"), stream.get("codec_name"))
+
+
+class ProbeCache:
+    """ffprobe results in a small sqlite database, keyed by path, size and mtime.
+
+    A movie is only probed again once it changed on disk. The database lives
+    in CACHE_FOLDER_LOCATION so it is shared by the panel and the command line.
+    """
+
+    COLUMNS = ("path", "size", "mtime_ns", "width", "height", "fps_num", "fps_den",
+               "frame_count", "duration", "pix_fmt", "codec")
+
+    def __init__(self, db_path=None):
+        self.db_path = db_path or os.path.join(CACHE_FOLDER_LOCATION, "probe_cache.sqlite")
+        self._connection = None
+        self._lock = threading.Lock()
+
+    def connection(self):
+        import sqlite3
+
+        if self._connection is None:
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+            self._connection = sqlite3.connect(self.db_path, timeout=10, check_same_thread=False)
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS media ("
+                "path TEXT, size INTEGER, mtime_ns INTEGER, width INTEGER, height INTEGER, "
+                "fps_num INTEGER, fps_den INTEGER, frame_count INTEGER, duration REAL, pix_fmt TEXT, codec TEXT, "
+                "PRIMARY KEY (path, size, mtime_ns))"
+            )
+            self._connection.commit()
+        return self._connection
+
+    def lookup(self, path, stat):
+        import sqlite3
+        from fractions import Fraction
+
+        try:
+            with self._lock:
+                row = self.connection().execute(
+                    f"SELECT {', '.join(self.COLUMNS)} FROM media WHERE path = ? AND size = ? AND mtime_ns = ?",
+                    (path, stat.st_size, stat.st_mtime_ns)
+                ).fetchone()
+        except sqlite3.Error as e:
+            print(f"Probe cache unavailable: {e}")
+            return None
+        if row is None:
             return None
+        values = dict(zip(self.COLUMNS, row))
+        fps = Fraction(values.pop("fps_num"), values.pop("fps_den") or 1)
+        return MediaRecord(fps=fps, **values)
 
-    def get_comp_input_path(self, for_nuke=False):
-        """Get comp input image sequence path"""
-        shot_dir = self.get_shot_dir()
-        if not shot_dir:
+    def store(self, record):
+        import sqlite3
+
+        values = (record.path, record.size, record.mtime_ns, record.width, record.height,
+                  record.fps.numerator, record.fps.denominator, record.frame_count, record.duration,
+                  record.pix_fmt, record.codec)
+        try:
+            with self._lock:
+                connection = self.connection()
+                # Older entries of the same path are of a previous version of the file
+                connection.execute("DELETE FROM media WHERE path = ?", (record.path,))
+                connection.execute(
+                    f"INSERT OR REPLACE INTO media VALUES ({', '.join('?' * len(values))})", values
+                )
+                connection.commit()
+        except sqlite3.Error as e:
+            print(f"Could not write probe cache: {e}")
+
+    @traced("probe")
+    def probe(self, path, job=None):
+        """MediaRecord of a movie, from the cache or ffprobe; None if it can't be read.
+
+        From a background Job, ffprobe runs through the job, at its priority
+        and stopped when it is cancelled.
+        """
+        path = os.path.abspath(path)
+        try:
+            stat = os.stat(path)
+        except OSError as e:
+            print(f"Cannot probe {path}: {e}")
             return None
 
-        # Use same version as source
-        source_dir = os.path.join(shot_dir, "source", "output")
-        source_version = self.get_latest_version(source_dir)
+        record = self.lookup(path, stat)
+        if record is not None:
+            return record
 
-        if not source_version:
-            print("No source version found for comp input")
+        cmd = [
+            "ffprobe",
+            "-v", "error",
+            "-select_streams", "v:0",
+            "-show_entries",
+            "stream=width,height,r_frame_rate,avg_frame_rate,nb_frames,duration,pix_fmt,codec_name"
+            ":format=duration",
+            "-of", "json",
+            path
+        ]
+        try:
+            if job is not None:
+                lines = []
+                job.run_process(cmd, on_line=lines.append)
+                output = "".join(lines)
+            else:
+                with process_span(cmd) as process_trace:
+                    result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+                    process_trace.set(returncode=result.returncode)
+                output = result.stdout
+            record = MediaRecord.from_ffprobe(path, stat, json.loads(output))
+        except (OSError, ValueError, KeyError, IndexError) as e:
+            print(f"Could not probe {path}: {e}")
             return None
+        self.store(record)
+        return record
 
-        comp_input_dir = os.path.join(shot_dir, "comp", "input", source_version)
-        base_name = self.make_filename("source", source_version)
+    def probe_many(self, paths, workers=4):
+        """Probe several movies in parallel, e.g. to warm the cache; returns {path: MediaRecord or None}"""
+        from concurrent.futures import ThreadPoolExecutor
 
-        if for_nuke:
-            # Nuke format: filename.####.exr
-            return os.path.join(comp_input_dir, f"{base_name}.####.exr")
-        else:
-            # Python/FFmpeg format: filename.%04d.exr
-            return os.path.join(comp_input_dir, f"{base_name}.%04d.exr")
+        paths = [path for path in dict.fromkeys(paths) if path]
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            return dict(zip(paths, executor.map(self.probe, paths)))
 
-    def get_comp_output_path(self, for_nuke=False):
-        """Get comp output image sequence path"""
-        shot_dir = self.get_shot_dir()
-        if not shot_dir:
-            return None
 
-        comp_output_dir = os.path.join(shot_dir, "comp", "output")
-        comp_work_dir = os.path.join(shot_dir, "comp", "work")
+PROBE_CACHE = ProbeCache()
 
-        # Get next version for new output
-        next_version = self.get_latest_version(comp_work_dir)
 
-        output_dir = os.path.join(comp_output_dir, next_version)
+def stream_command(cmd, on_line, job=None):
+    """Run cmd, calling on_line for every line of output; returns the exit code"""
+    if job is not None:
+        return job.run_process(cmd, on_line=on_line).returncode
 
-        # Create directory if it doesn't exist
-        os.makedirs(output_dir, exist_ok=True)
+    with process_span(cmd) as process_trace:
+        process = subprocess.Popen(
+            cmd, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True
+        )
+        for line in process.stdout:
+            on_line(line)
+        process_trace.set(returncode=process.wait())
+    return process.returncode
+
+
+def run_command(cmd, job=None, **kwargs):
+    """subprocess.run, or Job.run_process when called from a background job so it can be cancelled"""
+    if job is None:
+        with process_span(cmd) as process_trace:
+            try:
+                result = subprocess.run(cmd, **kwargs)
+            except subprocess.CalledProcessError as e:
+                process_trace.set(returncode=e.returncode)
+                raise
+            process_trace.set(returncode=result.returncode)
+            return result
+    return job.run_process(cmd, check=kwargs.get('check', False))
+
+
+def scan_frames(image_path):
+    """Return {frame: size} for the files on disk matching a %04d image path"""
+    return dict(find_sequence(image_path, use_cache=False).sizes)
+
+
+def frames_to_render(image_path, first_frame, last_frame, script_path, input_paths=()):
+    """Frames of a range that are missing, empty or older than the saved script or its Read inputs"""
+    newest = os.stat(script_path).st_mtime_ns
+    for input_path in input_paths:
+        input_path = input_path.replace('\\', '/')
+        try:
+            if '%04d' in input_path or '####' in input_path:
+                mtimes = list(find_sequence(input_path, use_cache=False).mtimes.values())
+            else:
+                mtimes = [os.stat(input_path).st_mtime_ns]
+        except (OSError, ValueError):
+            continue
+        newest = max([newest] + mtimes)
 
-        base_name = self.make_filename("comp", next_version)
+    sequence = find_sequence(image_path, use_cache=False)
+    return [
+        frame for frame in range(first_frame, last_frame + 1)
+        if not sequence.sizes.get(frame) or sequence.mtimes[frame] < newest
+    ]
 
-        if for_nuke:
-            # Nuke format: filename.####.exr
-            return os.path.join(output_dir, f"{base_name}.####.exr")
-        else:
-            # Python/FFmpeg format: filename.%04d.exr
-            return os.path.join(output_dir, f"{base_name}.%04d.exr")
 
-    def get_nuke_script_path(self, new=False):
-        shot_dir = self.get_shot_dir()
-        if not shot_dir:
+def describe_ranges(ranges):
+    return ', '.join(f'{a}-{b}' if a != b else str(a) for a, b in ranges)
+
+
+def frame_ranges(frames):
+    """Merge frame numbers into sorted, contiguous (first, last) ranges"""
+    ranges = []
+    for frame in sorted(frames):
+        if ranges and frame == ranges[-1][1] + 1:
+            ranges[-1][1] = frame
+        else:
+            ranges.append([frame, frame])
+    return [tuple(r) for r in ranges]
+
+
+def get_plate_format(name=None):
+    """Profile of a plate encoding from PLATE_FORMATS, PLATE_FORMAT by default"""
+    name = name or PLATE_FORMAT
+    if name not in PLATE_FORMATS:
+        raise ValueError(f"Unknown plate format {name!r}, expected one of {', '.join(PLATE_FORMATS)}")
+    return PLATE_FORMATS[name]
+
+
+class ExtractionManifest:
+    """Record of an extracted image sequence, stored as json next to its frames.
+
+    Holds the source movie's path, size and mtime, the plate format, the
+    expected frame count and the size of every frame written, so an
+    interrupted extraction can be repaired without extracting the whole
+    plate again.
+    """
+
+    def __init__(self, image_path, source, source_size, source_mtime, frame_count, complete=False, frames=None,
+                 plate_format="exr"):
+        self.image_path = image_path
+        self.source = source
+        self.source_size = source_size
+        self.source_mtime = source_mtime
+        self.frame_count = frame_count
+        self.complete = complete
+        self.frames = frames or {}
+        self.plate_format = plate_format
+
+    @staticmethod
+    def manifest_path(image_path):
+        base = os.path.basename(image_path).partition('%04d')[0].rstrip('.')
+        return os.path.join(os.path.dirname(image_path), f"{base}.manifest.json")
+
+    @classmethod
+    def for_source(cls, image_path, source_path, frame_count, plate_format="exr"):
+        stat = os.stat(source_path)
+        return cls(image_path, source_path, stat.st_size, stat.st_mtime_ns, frame_count, plate_format=plate_format)
+
+    @classmethod
+    def load(cls, image_path):
+        try:
+            with open(cls.manifest_path(image_path), "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return cls(
+                image_path,
+                data["source"],
+                data["source_size"],
+                data["source_mtime"],
+                data["frame_count"],
+                data["complete"],
+                {int(frame): size for frame, size in data["frames"].items()},
+                # Plates were always ffmpeg's default EXR before formats could be chosen
+                data.get("plate_format", "exr"),
+            )
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Ignoring unreadable extraction manifest: {e}")
             return None
 
-        work_dir = os.path.join(shot_dir, "comp", "work")
+    def save(self):
+        data = {
+            "source": self.source,
+            "source_size": self.source_size,
+            "source_mtime": self.source_mtime,
+            "first_frame": FIRST_FRAME,
+            "frame_count": self.frame_count,
+            "complete": self.complete,
+            "plate_format": self.plate_format,
+            "frames": {str(frame): size for frame, size in sorted(self.frames.items())},
+        }
+        with open(self.manifest_path(self.image_path), "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=1)
 
-        if new is False:
-            version = self.get_latest_version(work_dir)
-            if version is None:
-                version = 'v001'
+    def matches_source(self, source_path):
+        try:
+            stat = os.stat(source_path)
+        except OSError:
+            return False
+        return (
+            os.path.normpath(source_path) == os.path.normpath(self.source)
+            and stat.st_size == self.source_size
+            and stat.st_mtime_ns == self.source_mtime
+        )
 
-            print('latest v: ', version)
-            if version is None:
-                print("No existing version found.")
-                return None
+    def damaged_frames(self, frames):
+        """Frames that are missing, empty or differ from the recorded size, given {frame: size} on disk"""
+        last = FIRST_FRAME + self.frame_count - 1
+        damaged = set()
+        for frame in range(FIRST_FRAME, last + 1):
+            size = frames.get(frame, 0)
+            recorded = self.frames.get(frame)
+            if size == 0 or (recorded is not None and size != recorded):
+                damaged.add(frame)
+
+        if not self.complete:
+            # The last frame an interrupted ffmpeg wrote before a gap may be cut off
+            for frame in range(FIRST_FRAME, last + 1):
+                if frame in damaged or frame in self.frames:
+                    continue
+                if frame + 1 in damaged or frame == last:
+                    damaged.add(frame)
+        return damaged
+
+    def record_frames(self, frames):
+        """Store the frames on disk after a successful extraction"""
+        self.frames = dict(frames)
+        if frames:
+            self.frame_count = max(frames) - FIRST_FRAME + 1
+        self.complete = True
+
+
+def read_script_info(script_path):
+    """Frame range and Read node files of a saved .nk script, parsed without Nuke.
+
+    Returns {"first_frame", "last_frame", "read_files"}; values stay None/empty
+    when the script can't be read as text (e.g. encrypted .nknc scripts).
+    """
+    info = {"first_frame": None, "last_frame": None, "read_files": []}
+    try:
+        with open(script_path, "r", encoding="utf-8", errors="replace") as f:
+            text = f.read()
+    except OSError as e:
+        print(f"Could not read script {script_path}: {e}")
+        return info
+
+    root = re.search(r'^Root \{(.*?)^\}', text, re.M | re.S)
+    if root:
+        first = re.search(r'^\s*first_frame (-?\d+)', root.group(1), re.M)
+        last = re.search(r'^\s*last_frame (-?\d+)', root.group(1), re.M)
+        info["first_frame"] = int(first.group(1)) if first else 1
+        info["last_frame"] = int(last.group(1)) if last else 100
+    for block in re.finditer(r'^Read \{(.*?)^\}', text, re.M | re.S):
+        path = re.search(r'^\s*file "?([^"\n]+?)"?\s*$', block.group(1), re.M)
+        if path:
+            info["read_files"].append(path.group(1))
+    return info
+
+
+def report_frames(on_frame, first_frame, last_frame):
+    """Call on_frame for every frame of a range that didn't need rendering"""
+    if on_frame is not None:
+        for frame in range(first_frame, last_frame + 1):
+            on_frame(frame)
+
+
+class RenderCache:
+    """Hash of what a comp render depends on, stored next to its output frames.
+
+    The key covers the saved script, the Read node inputs (their extraction
+    manifest, or else file sizes and mtimes) and the frame range. A publish
+    can skip the render while the key matches and every recorded frame is
+    still on disk. Hits and misses are counted in CACHE_FOLDER_LOCATION.
+    """
+
+    FILENAME = "render_cache.json"
+    STATS_FILENAME = "render_cache_stats.jsonl"
+
+    def __init__(self, script_path, image_path, first_frame, last_frame, input_paths=()):
+        self.script_path = script_path
+        self.image_path = image_path
+        self.first_frame = first_frame
+        self.last_frame = last_frame
+        self.input_paths = list(input_paths)
+        self.key = None
+        self._started = None
+
+    @classmethod
+    def from_script(cls, script_path, image_path, input_paths=None):
+        """RenderCache for a saved script whose frame range and inputs are read from the file, None if they can't be"""
+        info = read_script_info(script_path)
+        inputs = info["read_files"] if input_paths is None else input_paths
+        if info["first_frame"] is None or not inputs:
+            return None
+        return cls(script_path, image_path, info["first_frame"], info["last_frame"], inputs)
+
+    def path(self):
+        return os.path.join(os.path.dirname(self.image_path), self.FILENAME)
+
+    def make_key(self):
+        import hashlib
+
+        digest = hashlib.sha1()
+        with open(self.script_path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        digest.update(f"{self.first_frame}-{self.last_frame}".encode("utf-8"))
+        for input_path in sorted(set(self.input_paths)):
+            signature = self.input_signature(input_path)
+            digest.update(json.dumps([input_path, signature], default=str).encode("utf-8"))
+        return digest.hexdigest()
+
+    @staticmethod
+    def input_signature(input_path):
+        """What an input's contents are judged by: its extraction manifest, else sizes and mtimes"""
+        image_path = input_path.replace('\\', '/').replace('####', '%04d')
+        manifest = ExtractionManifest.load(image_path)
+        if manifest is not None and manifest.complete:
+            return ["manifest", manifest.source, manifest.source_size, manifest.source_mtime,
+                    sorted(manifest.frames.items())]
+
+        if '%04d' not in image_path:
+            try:
+                stat = os.stat(image_path)
+                return ["file", stat.st_size, stat.st_mtime_ns]
+            except OSError:
+                return ["missing"]
+
+        sequence = find_sequence(image_path, use_cache=False)
+        files = [(frame, size, sequence.mtimes[frame]) for frame, size in sequence.sizes.items()]
+        return ["files", sorted(files)]
+
+    def load(self):
+        try:
+            with open(self.path(), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable render cache: {e}")
+            return None
+
+    def check(self):
+        """Return True if the frames on disk are a render of the current script and inputs"""
+        self._started = datetime.datetime.now()
+        try:
+            self.key = self.make_key()
+        except OSError as e:
+            print(f"Render cache unavailable: {e}")
+            self.key = None
+            return False
+
+        cached = self.load()
+        hit = False
+        reason = "no previous render"
+        if cached is not None:
+            frames = scan_frames(self.image_path)
+            recorded = {int(frame): size for frame, size in cached.get("frames", {}).items()}
+            if cached.get("key") != self.key:
+                reason = "script, inputs or frame range changed"
+            elif any(
+                frames.get(frame, 0) == 0 or frames[frame] != recorded.get(frame)
+                for frame in range(self.first_frame, self.last_frame + 1)
+            ):
+                reason = "frames missing or changed on disk"
+            else:
+                hit = True
+
+        frame_count = self.last_frame - self.first_frame + 1
+        stats = self.record_stats(hit, frame_count, cached.get("render_seconds", 0) if hit else 0)
+        if hit:
+            print(f"Render cache hit: skipping render of {frame_count} frames in "
+                  f"{os.path.dirname(self.image_path)}")
         else:
-            version = self.get_next_version(work_dir)
+            print(f"Render cache miss: {reason}")
+        print(f"Render cache: {stats['hits']} hits, {stats['misses']} misses, "
+              f"{stats['frames_skipped']} frames and ~{stats['seconds_saved'] / 60:.0f} min of rendering saved")
+        return hit
+
+    def store(self):
+        """Record the frames just rendered under the key taken by check()"""
+        if self.key is None:
+            return
+        render_seconds = 0
+        if self._started is not None:
+            render_seconds = (datetime.datetime.now() - self._started).total_seconds()
+        frames = scan_frames(self.image_path)
+        data = {
+            "key": self.key,
+            "script": self.script_path,
+            "first_frame": self.first_frame,
+            "last_frame": self.last_frame,
+            "rendered_at": datetime.datetime.now().isoformat(),
+            "render_seconds": round(render_seconds, 1),
+            "frames": {
+                str(frame): frames[frame]
+                for frame in range(self.first_frame, self.last_frame + 1) if frame in frames
+            },
+        }
+        path = self.path()
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=1)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Could not write render cache: {e}")
+
+    @classmethod
+    def load_stats(cls):
+        """Hit/miss totals, summed from one line per lookup so every process can append to them"""
+        stats = {"hits": 0, "misses": 0, "frames_skipped": 0, "seconds_saved": 0}
+        try:
+            with open(os.path.join(CACHE_FOLDER_LOCATION, cls.STATS_FILENAME), "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        lookup = json.loads(line)
+                    except ValueError:
+                        continue  # cut short by a crash
+                    if lookup.get("hit"):
+                        stats["hits"] += 1
+                        stats["frames_skipped"] += lookup.get("frames", 0)
+                        stats["seconds_saved"] += lookup.get("seconds_saved", 0)
+                    else:
+                        stats["misses"] += 1
+        except OSError:
+            pass
+        return stats
+
+    @classmethod
+    def record_stats(cls, hit, frame_count, seconds_saved):
+        """Add one lookup to the hit/miss totals, returns the updated totals"""
+        lookup = {"hit": hit, "frames": frame_count if hit else 0, "seconds_saved": seconds_saved}
+        try:
+            os.makedirs(CACHE_FOLDER_LOCATION, exist_ok=True)
+            # One short write in append mode, so lines from Nuke sessions and farm jobs don't interleave
+            with open(os.path.join(CACHE_FOLDER_LOCATION, cls.STATS_FILENAME), "a", encoding="utf-8") as f:
+                f.write(json.dumps(lookup) + "\n")
+        except OSError as e:
+            print(f"Could not write render cache stats: {e}")
+        return cls.load_stats()
+
+
+class TaskRecord:
+    """Compact, flattened copy of the task fields the pipeline needs"""
+
+    __slots__ = ('proj', 'seq', 'shot', 'task_id', 'proj_id', 'shot_id')
+
+    def __init__(self, proj, seq, shot, task_id, proj_id, shot_id):
+        self.proj = proj
+        self.seq = seq
+        self.shot = shot
+        self.task_id = task_id
+        self.proj_id = proj_id
+        self.shot_id = shot_id
+
+    @classmethod
+    def from_task(cls, task):
+        """Build a record from a ShotGrid Task dict as returned by SGIO.get_tasks"""
+        return cls(
+            task["entity.Shot.project"]["name"].replace(' ', ''),
+            task["entity.Shot.sg_sequence"]["name"],
+            task["entity.Shot.code"].split('_')[-1],
+            task["id"],
+            task['entity.Shot.project.Project.id'],
+            task['entity.Shot.id'],
+        )
+
+    def sort_key(self):
+        return self.proj, self.seq, self.shot, self.task_id
+
+
+class ShotContext:
+    """Paths of one shot, resolved once per selection.
+
+    Built from a TaskRecord (or project, sequence and shot names), the latest
+    versions of the source, work and output folders are looked up and every
+    pipeline path is worked out in one pass into the read-only `paths`
+    table. Nothing is created on disk until something is written: only
+    get_nuke_script_path(new=True) makes its version folder, renders and
+    encodes create their own output folders. A context is immutable and can
+    be shared by the panel, NukeHandler and jobs; the panel's ShotStateIndex
+    builds a new one when a shot's folders change.
+    """
+
+    __slots__ = ('proj', 'seq', 'shot', 'base_path', 'versions', 'paths')
+
+    # Version folders looked up, relative to the shot directory
+    VERSION_FOLDERS = {
+        'source': ('source', 'output'),
+        'work': ('comp', 'work'),
+        'output': ('comp', 'output'),
+    }
+
+    @traced("filesystem", "ShotContext.resolve")
+    def __init__(self, proj, seq, shot, base_path=None):
+        set_slot = object.__setattr__
+        set_slot(self, 'proj', proj)
+        set_slot(self, 'seq', seq)
+        set_slot(self, 'shot', shot)
+        set_slot(self, 'base_path', base_path or PROJECT_FOLDER_LOCATION)
+
+        shot_dir = os.path.join(self.base_path, proj, "shots", seq, shot.split('_')[-1])
+        folders = {name: os.path.join(shot_dir, *parts) for name, parts in self.VERSION_FOLDERS.items()}
+        versions = {}
+        for name, folder in folders.items():
+            _, found = VERSION_INDEX.lookup(folder)
+            versions[name] = f"v{found[-1]:03d}" if found else None
+        work_version = versions['work']
+        versions['next_work'] = (
+            f"v{int(VERSION_REGEX.match(work_version).group(1)) + 1:03d}" if work_version else "v001"
+        )
 
-        script_dir = os.path.join(work_dir, version)
-        if new:
-            os.makedirs(script_dir, exist_ok=True)
+        def name(task, version, extension=""):
+            return f"{proj}_{seq}_{shot}_{task}_{version}{extension}"
+
+        def frames(folder, version, task, extension="exr"):
+            """printf and Nuke style paths of a version's image sequence"""
+            if not version:
+                return None, None
+            base = os.path.join(shot_dir, "comp", folder, version, name(task, version))
+            return f"{base}.%04d.{extension}", f"{base}.####.{extension}"
+
+        source_version = versions['source']
+        script_version = work_version or 'v001'
+        next_version = versions['next_work']
+        paths = {
+            'shot_dir': shot_dir,
+            'source_dir': folders['source'],
+            'work_dir': folders['work'],
+            'output_dir': folders['output'],
+            'source_video': os.path.join(
+                folders['source'], source_version, name("source", source_version, ".mov")
+            ) if source_version else None,
+            'nuke_script': os.path.join(folders['work'], script_version, name("comp", script_version, ".nknc")),
+            'next_nuke_script': os.path.join(folders['work'], next_version, name("comp", next_version, ".nknc")),
+            'publish_script': os.path.join(
+                shot_dir, "comp", "publish", work_version, name("comp", work_version, ".nknc")
+            ) if work_version else None,
+            'publish_video': os.path.join(
+                shot_dir, "comp", "publish", work_version, name("comp", work_version, ".mov")
+            ) if work_version else None,
+        }
+        # The plate is extracted into comp/input under the source version, in the PLATE_FORMAT encoding
+        paths['comp_input'], paths['comp_input_nuke'] = frames(
+            "input", source_version, "source", get_plate_format()["extension"]
+        )
+        # Renders go to the output folder of the script's version
+        paths['comp_output'], paths['comp_output_nuke'] = frames("output", work_version, "comp")
+        paths['next_comp_output'], paths['next_comp_output_nuke'] = frames("output", next_version, "comp")
 
-        filename = self.make_filename("comp", version, "nknc")
-        return os.path.join(script_dir, filename)
+        set_slot(self, 'versions', types.MappingProxyType(versions))
+        set_slot(self, 'paths', types.MappingProxyType(paths))
 
-    def get_publish_script_path(self):
-        """Get publish script path"""
-        shot_dir = self.get_shot_dir()
-        if not shot_dir:
-            return None
+    def __setattr__(self, name, value):
+        raise AttributeError(f"ShotContext is immutable, build a new one instead of setting {name}")
 
-        work_dir = os.path.join(shot_dir, "comp", "work")
-        current_version = self.get_latest_version(work_dir)
+    def __repr__(self):
+        return f"<ShotContext {self.proj}/{self.seq}/{self.shot} work {self.versions['work']}>"
 
-        if not current_version:
-            print("No work version found for publish")
-            return None
+    @classmethod
+    def for_record(cls, record, base_path=None):
+        """Context of the shot of a TaskRecord"""
+        return cls(record.proj, record.seq, record.shot, base_path)
 
-        publish_dir = os.path.join(shot_dir, "comp", "publish", current_version)
-        os.makedirs(publish_dir, exist_ok=True)
+    def matches(self, record):
+        return record is not None and (record.proj, record.seq, record.shot) == (self.proj, self.seq, self.shot)
+
+    def make_filename(self, task, version, extension=""):
+        """Create standardized filename: proj_seq_shot_task_version.ext"""
+        base_name = f"{self.proj}_{self.seq}_{self.shot}_{task}_{version}"
+        if extension:
+            return f"{base_name}.{extension}"
+        return base_name
 
-        filename = self.make_filename("comp", current_version, "nknc")
-        return os.path.join(publish_dir, filename)
+    def get_shot_dir(self):
+        return self.paths['shot_dir']
 
-    def get_publish_video_path(self):
-        """Get publish video path"""
-        shot_dir = self.get_shot_dir()
-        if not shot_dir:
+    def get_source_video_path(self):
+        """Get source video file path, None if it isn't on disk"""
+        video_path = self.paths['source_video']
+        if video_path is None:
+            print("No source video version found")
             return None
+        if os.path.exists(video_path):
+            return video_path
+        print(f"Source video not found: {video_path}")
+        return None
 
-        comp_output_dir = os.path.join(shot_dir, "comp", "output")
-        latest_comp_version = self.get_latest_version(comp_output_dir)
+    def get_comp_input_path(self, for_nuke=False):
+        """Get comp input image sequence path, in the same version as the source and in the PLATE_FORMAT encoding"""
+        if self.paths['comp_input'] is None:
+            print("No source version found for comp input")
+            return None
+        return self.paths['comp_input_nuke' if for_nuke else 'comp_input']
 
-        if not latest_comp_version:
-            print("No comp output version found for publish")
+    def get_comp_output_path(self, for_nuke=False, next_version=False):
+        """Get comp output image sequence path of the latest (or next) work version"""
+        prefix = 'next_comp_output' if next_version else 'comp_output'
+        if self.paths[prefix] is None:
+            print("No work version found for comp output")
             return None
+        return self.paths[f'{prefix}_nuke' if for_nuke else prefix]
 
-        publish_dir = os.path.join(shot_dir, "comp", "publish", latest_comp_version)
-        os.makedirs(publish_dir, exist_ok=True)
+    def get_nuke_script_path(self, new=False):
+        """Latest work script path (v001 if there is none), or with new the next version's.
+
+        new is for saving right away, so the new version folder is created.
+        """
+        if not new:
+            return self.paths['nuke_script']
+        script_path = self.paths['next_nuke_script']
+        work_dir = self.paths['work_dir']
+        os.makedirs(os.path.dirname(script_path), exist_ok=True)
+        VERSION_INDEX.add_version(work_dir, self.versions['next_work'])
+        return script_path
 
-        filename = self.make_filename("comp", latest_comp_version, "mov")
-        return os.path.join(publish_dir, filename)
+    def get_publish_script_path(self):
+        if self.paths['publish_script'] is None:
+            print("No work version found for publish")
+        return self.paths['publish_script']
+
+    def get_publish_video_path(self):
+        """Review movie path of the latest work version; images_to_video creates its folder"""
+        if self.paths['publish_video'] is None:
+            print("No work version found for publish")
+        return self.paths['publish_video']
 
 
 class SGIO:
-    def __init__(self, sg_api, user_id):
-        self.sg = sg_api
-        self.user_id = user_id
+    def __init__(self, sg_api=None, user_id=None, pool=None):
+        if pool is None and sg_api is not None:
+            # A single given connection, still only used by one thread at a time
+            pool = ShotGridPool(factory=lambda: sg_api, size=1)
+        self._pool = pool
+        self._user_id = user_id
         self.can_work_on = ['rdy', 'rti', 'rvi', 'ip', 'att']
-
-    def get_tasks(self):
+        self.task_cache = TaskCache()
+
+    @property
+    def pool(self):
+        """ShotGrid connection pool, the shared one unless a pool or connection was given"""
+        if self._pool is None:
+            self._pool = get_shotgun_pool()
+        return self._pool
+
+    @property
+    def user_id(self):
+        if self._user_id is None:
+            self._user_id = get_user_id()
+        return self._user_id
+
+    def task_query(self):
+        """Filters and fields used for the artist's task list"""
         filters = [
             ['task_assignees', 'in', [{'type': 'HumanUser', 'id': self.user_id}]],
             ['sg_status_list', 'in', self.can_work_on],
@@ -295,107 +1260,421 @@ class SGIO:
             'entity.Shot.sg_sequence',
             'entity.Shot.project',
             'entity.Shot.project.Project.id',
-            'entity.Shot.id'
+            'entity.Shot.id',
+            'sg_status_list',
+            'task_assignees',
+            'step.Step.code',
+            'updated_at'
         ]
+        return filters, fields
+
+    @traced("shotgrid")
+    def get_tasks(self):
+        filters, fields = self.task_query()
         try:
-            tasks = self.sg.find('Task', filters, fields)
+            tasks = self.pool.call('find', 'Task', filters, fields)
             print(f"Retrieved {len(tasks)} tasks for user {self.user_id}")
             return tasks
         except Exception as e:
             print(f"Error fetching tasks: {e}")
             return []
 
-    def video_to_images(self, input_video_path, output_image_path):
-        """Convert video to image sequence"""
+    def get_cached_tasks(self):
+        """Tasks from the last session, or None if nothing is cached yet"""
+        filters, fields = self.task_query()
+        cached = self.task_cache.load(TaskCache.make_key(self.user_id, filters, fields))
+        if cached is None:
+            return None
+        return cached[1]
+
+    @traced("shotgrid")
+    def refresh_tasks(self):
+        """Revalidate the cached task list against ShotGrid and return the merged tasks.
+
+        Only tasks updated since the cache was written are fetched, including
+        cached tasks that no longer match the filters so they can be dropped.
+        Changes that don't touch the Task itself (e.g. a shot moving sequence)
+        are picked up by the full query made once the cache is older than
+        TASK_CACHE_MAX_AGE. Raises if ShotGrid can't be reached.
+        """
+        filters, fields = self.task_query()
+        key = TaskCache.make_key(self.user_id, filters, fields)
+        cached = self.task_cache.load(key)
+        started = datetime.datetime.now(datetime.timezone.utc)
+
+        if cached is None or (started - cached[0]).total_seconds() > TASK_CACHE_MAX_AGE:
+            tasks = self.pool.call('find', 'Task', filters, fields)
+            print(f"Retrieved {len(tasks)} tasks for user {self.user_id}")
+        else:
+            fetched_at, tasks = cached
+            tasks = self.merge_tasks(tasks, self.find_updated_tasks(filters, fields, fetched_at, tasks))
+
+        self.task_cache.save(key, started, tasks)
+        return tasks
+
+    def find_updated_tasks(self, filters, fields, since, known_tasks):
+        """Fetch tasks that changed since `since`, matching the filters or already known"""
+        # Small margin for clock skew between this machine and the ShotGrid server
+        since = since - datetime.timedelta(minutes=1)
+        known_ids = [task['id'] for task in known_tasks]
+        if known_ids:
+            scope = {
+                'filter_operator': 'any',
+                'filters': [
+                    ['id', 'in', known_ids],
+                    {'filter_operator': 'all', 'filters': filters}
+                ]
+            }
+            delta_filters = [['updated_at', 'greater_than', since], scope]
+        else:
+            delta_filters = [['updated_at', 'greater_than', since]] + filters
+
+        updated = self.pool.call('find', 'Task', delta_filters, fields)
+        print(f"Retrieved {len(updated)} updated tasks for user {self.user_id}")
+        return updated
+
+    def merge_tasks(self, tasks, updated):
+        """Apply updated tasks to a task list, dropping the ones that no longer match"""
+        merged = {task['id']: task for task in tasks}
+        for task in updated:
+            if self.task_matches(task):
+                merged[task['id']] = task
+            else:
+                merged.pop(task['id'], None)
+        return list(merged.values())
+
+    def task_matches(self, task):
+        """Check a fetched task against the task_query filters"""
+        assignees = task.get('task_assignees') or []
+        return (
+            any(a.get('type') == 'HumanUser' and a.get('id') == self.user_id for a in assignees)
+            and task.get('sg_status_list') in self.can_work_on
+            and task.get('step.Step.code') == 'comp'
+        )
+
+    def save_cached_tasks(self, tasks, fetched_at):
+        """Store a task list kept current by other means, e.g. the event log, for the next session"""
+        filters, fields = self.task_query()
+        self.task_cache.save(TaskCache.make_key(self.user_id, filters, fields), fetched_at, tasks)
+
+    @traced("shotgrid")
+    def fetch_tasks(self, task_ids, known_ids=()):
+        """Tasks among task_ids that match the task_query filters or are in known_ids.
+
+        Known tasks are returned even when they stopped matching, so the
+        caller can tell them apart from deleted ones and drop them.
+        """
+        if not task_ids:
+            return []
+        filters, fields = self.task_query()
+        scope = {'filter_operator': 'all', 'filters': filters}
+        known_ids = sorted(set(known_ids) & set(task_ids))
+        if known_ids:
+            scope = {'filter_operator': 'any', 'filters': [['id', 'in', known_ids], scope]}
+        return self.pool.call('find', 'Task', [['id', 'in', sorted(task_ids)], scope], fields)
+
+    @traced("shotgrid")
+    def latest_event_id(self):
+        """Id of the newest EventLogEntry, 0 on a site without events"""
+        event = self.pool.call('find_one', 'EventLogEntry', [], ['id'], order=[{'field_name': 'id', 'direction': 'desc'}])
+        return event['id'] if event else 0
+
+    @traced("shotgrid")
+    def find_events(self, after_id, entity_types=('Task', 'Shot'), limit=500):
+        """EventLogEntries of entity_types newer than after_id, oldest first"""
+        event_types = [
+            f"Shotgun_{entity_type}_{action}"
+            for entity_type in entity_types
+            for action in ('New', 'Change', 'Retirement', 'Revival')
+        ]
+        filters = [['id', 'greater_than', after_id], ['event_type', 'in', event_types]]
+        fields = ['id', 'event_type', 'attribute_name', 'entity', 'meta']
+        return self.pool.call(
+            'find', 'EventLogEntry', filters, fields, order=[{'field_name': 'id', 'direction': 'asc'}], limit=limit
+        )
+
+    @traced("extract")
+    def video_to_images(self, input_video_path, output_image_path, workers=None, job=None, plate_format=None):
+        """Convert video to image sequence, only extracting frames that are missing or damaged.
+
+        Frames are encoded with a profile from PLATE_FORMATS, PLATE_FORMAT by
+        default; output_image_path should have its extension. When run from a
+        background Job, ffmpeg progress is reported on it and cancelling the
+        job stops the conversion.
+        """
         print('Converting published video to image sequence for Nuke.')
+        plate_format = plate_format or PLATE_FORMAT
+        options = get_plate_format(plate_format)["options"]
 
         # Create output directory if it doesn't exist
         output_dir = os.path.dirname(output_image_path)
         os.makedirs(output_dir, exist_ok=True)
 
-        # Check if conversion already exists
-        first_frame_path = output_image_path.replace('%04d', '1001')
-        if os.path.exists(first_frame_path):
-            print(f'Image sequence already exists: {first_frame_path}')
-            return output_image_path
-
         if not os.path.exists(input_video_path):
+            sequence = find_sequence(output_image_path)
+            if sequence.is_complete():
+                # Nothing to validate against, use what's there
+                print(f'Image sequence already exists: {sequence.path} ({sequence.frame_range_text()})')
+                return output_image_path
+            if sequence:
+                print(f'Image sequence {sequence.path} has {sequence.describe_problems()}')
             print(f'Source video not found: {input_video_path}')
             return None
 
-        cmd = [
+        frames = scan_frames(output_image_path)
+        manifest = ExtractionManifest.load(output_image_path)
+
+        if manifest is not None and not (
+            manifest.matches_source(input_video_path) and manifest.plate_format == plate_format
+        ):
+            print('Source video or plate format changed, extracting the whole sequence again.')
+            for frame in frames:
+                os.remove(output_image_path % frame)
+            frames = {}
+            manifest = None
+
+        media = None
+        if manifest is None:
+            media = self.probe_media(input_video_path, job)
+            frame_count = media.pipeline_frame_count if media is not None else None
+            if not frame_count:
+                # Without the movie's length the manifest can't tell a cut off plate from a complete one
+                print(f'Not extracting {input_video_path} without its frame count.')
+                return None
+            manifest = ExtractionManifest.for_source(output_image_path, input_video_path, frame_count, plate_format)
+            if frames:
+                # Extracted before manifests were written; trust it when no frame is missing or empty
+                sequence = find_sequence(output_image_path, use_cache=False)
+                if sequence.is_complete(FIRST_FRAME, FIRST_FRAME + frame_count - 1):
+                    manifest.record_frames(sequence.sizes)
+                    manifest.save()
+                    print(f'Image sequence already exists: {output_image_path}')
+                    return output_image_path
+
+        if not frames:
+            segments = self.plan_segments(media or self.probe_media(input_video_path, job), workers)
+            frames_to_extract = manifest.frame_count
+        else:
+            damaged = manifest.damaged_frames(frames)
+            if not damaged:
+                print(f'Image sequence already exists: {output_image_path}')
+                return output_image_path
+
+            segments = []
+            last_expected = FIRST_FRAME + manifest.frame_count - 1
+            for first, last in frame_ranges(damaged):
+                # The frame count is estimated until one extraction completed, so run the tail to the end
+                end = None if last >= last_expected and not manifest.complete else last + 1 - FIRST_FRAME
+                segments.append((first - FIRST_FRAME, end))
+            print(f'Repairing {len(damaged)} missing or damaged frames in {len(segments)} ranges...')
+            frames_to_extract = len(damaged)
+
+        manifest.complete = False
+        manifest.save()
+
+        if job is not None:
+            job.total_frames = frames_to_extract
+        if not self.run_extraction(input_video_path, output_image_path, segments, workers, job, options):
+            return None
+
+        sequence = find_sequence(output_image_path, use_cache=False)
+        manifest.record_frames(sequence.sizes)
+        manifest.save()
+        current().set(bytes=sequence.total_bytes, frames=len(sequence))
+        if not sequence.is_complete(FIRST_FRAME, FIRST_FRAME + manifest.frame_count - 1):
+            print(f'Extracted sequence is incomplete: {sequence.describe_problems() or "no frames written"}')
+            return None
+        print(f'Video successfully converted! {len(sequence)} frames, {sequence.total_bytes / 1e6:.0f} MB')
+        return output_image_path
+
+    def run_extraction(self, input_video_path, output_image_path, segments, workers=None, job=None, options=()):
+        """Run ffmpeg over [(start, end), ...] output frame segments, return True on success.
+
+        options are ffmpeg output options of the plate format.
+        """
+        if segments == [(0, None)]:
+            cmd = [
+                "ffmpeg",
+                "-y",
+                "-i", input_video_path,
+                "-vf", f"fps={PIPELINE_FPS}",
+                "-start_number", str(FIRST_FRAME),
+                "-threads", "0",
+                *options,
+                output_image_path
+            ]
+
+            try:
+                print('Processing video conversion...')
+                run_command(cmd, job, check=True)
+                return True
+            except subprocess.CalledProcessError as e:
+                print(f'Error converting video to images: {e}')
+                return False
+
+        workers = min(len(segments), workers or EXTRACT_WORKERS or max(1, (os.cpu_count() or 1) // 2))
+        print(f'Processing video conversion in {len(segments)} segments...')
+        threads = max(1, (os.cpu_count() or 1) // workers)
+        cmds = [
+            self.segment_cmd(input_video_path, output_image_path, start, end, threads, options)
+            for start, end in segments
+        ]
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(
+                lambda cmd: run_command(cmd, job, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True),
+                cmds
+            ))
+
+        failed = [(segment, result) for segment, result in zip(segments, results) if result.returncode != 0]
+        for (start, end), result in failed:
+            print(f'Error converting frames {FIRST_FRAME + start}-{"end" if end is None else FIRST_FRAME + end - 1}: '
+                  f'{result.stderr.strip()}')
+        return not failed
+
+    def plan_segments(self, media, workers=None):
+        """Split the output frame range into [(start, end), ...] chunks, end None for the last one.
+
+        media is the movie's MediaRecord, None when it couldn't be probed.
+        Frames are counted from 0 at PIPELINE_FPS. The frame count is only an
+        estimate, so the last segment runs to the end of the movie.
+        """
+        workers = workers or EXTRACT_WORKERS or max(1, (os.cpu_count() or 1) // 2)
+        frame_count = media.pipeline_frame_count if media is not None else None
+        if workers <= 1 or not frame_count:
+            return [(0, None)]
+
+        count = min(workers, frame_count // EXTRACT_MIN_SEGMENT_FRAMES)
+        if count <= 1:
+            return [(0, None)]
+
+        size = -(-frame_count // count)
+        return [(i * size, (i + 1) * size if i < count - 1 else None) for i in range(count)]
+
+    def segment_cmd(self, input_video_path, output_image_path, start, end, threads=0, options=()):
+        """ffmpeg command writing output frames [start, end) of a movie, frame exact with a single pass.
+
+        The input is seeked a second before the segment and timestamps are kept
+        (-copyts) so the fps filter picks the same source frames as a full run;
+        trim then cuts the segment on the 1/PIPELINE_FPS grid.
+        """
+        preroll = max(0.0, start / PIPELINE_FPS - 1.0)
+        trim = f"trim=start_pts={start}"
+        if end is not None:
+            trim += f":end_pts={end}"
+        return [
             "ffmpeg",
+            "-v", "error",
+            "-y",
+            "-ss", f"{preroll:.6f}",
+            "-copyts", "-start_at_zero",
             "-i", input_video_path,
-            "-vf", "fps=24",
-            "-start_number", "1001",
-            "-threads", "0",
+            "-vf", f"fps={PIPELINE_FPS},{trim},setpts=PTS-STARTPTS",
+            "-r", str(PIPELINE_FPS),
+            "-start_number", str(FIRST_FRAME + start),
+            "-threads", str(threads),
+            *options,
             output_image_path
         ]
 
-        try:
-            print('Processing video conversion...')
-            subprocess.run(cmd, check=True)
-            print('Video successfully converted!')
-            return output_image_path
-        except subprocess.CalledProcessError as e:
-            print(f'Error converting video to images: {e}')
-            return None
+    @traced("encode")
+    def images_to_video(self, input_images_path, output_video_path, job=None, frame_range=None):
+        """Encode a rendered sequence to the review movie.
 
-    def images_to_video(self, input_images_path, output_video_path):
+        With frame_range, the comp's (first, last) frame, every frame of it has
+        to be on disk and only those are encoded, so a render that stopped
+        early isn't published as a short movie.
+        """
         print('Converting image sequence to published video for ShotGrid.')
 
+        # ffmpeg stops at the first missing frame, so check the sequence is whole first
+        sequence = find_sequence(input_images_path, use_cache=False)
+        first_frame, last_frame = frame_range or (sequence.first_frame, sequence.last_frame)
+        if not sequence.is_complete(first_frame, last_frame):
+            if sequence and (sequence.first_frame > first_frame or sequence.last_frame < last_frame):
+                problem = f"frames {sequence.frame_range_text()} on disk, the comp is {first_frame}-{last_frame}"
+            else:
+                problem = sequence.describe_problems() or "no frames found"
+            print(f'Cannot convert {input_images_path}: {problem}')
+            return None
+        frame_count = last_frame - first_frame + 1
+
         os.makedirs(os.path.dirname(output_video_path), exist_ok=True)
 
         cmd = [
             "ffmpeg",
-            "-start_number", "1001",
+            "-framerate", str(PIPELINE_FPS),
+            "-start_number", str(first_frame),
             "-i", input_images_path,
-            "-vf", "fps=24",
+            "-frames:v", str(frame_count),
+            "-vf", f"fps={PIPELINE_FPS}",
             "-y",  # Overwrite output file
             output_video_path
         ]
 
+        if job is not None:
+            job.total_frames = frame_count
         try:
             print('Processing image sequence to video conversion...')
-            subprocess.run(cmd, check=True)
+            run_command(cmd, job, check=True)
+            current().set(bytes=os.path.getsize(output_video_path), frames=frame_count)
             print('Image sequence successfully converted to video!')
             return output_video_path
         except subprocess.CalledProcessError as e:
             print(f'Error converting images to video: {e}')
             return None
 
-    def get_video_metadata(self, video_path):
-        """Extracts resolution and fps from a video file using ffprobe."""
-        cmd = [
-            "ffprobe",
-            "-v", "error",
-            "-select_streams", "v:0",
-            "-show_entries", "stream=width,height,r_frame_rate",
-            "-of", "json",
-            video_path
-        ]
-        result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-        info = json.loads(result.stdout)
+    def probe_media(self, video_path, job=None):
+        """MediaRecord of a movie (resolution, exact fps, frame count, codec...), cached until it changes"""
+        return PROBE_CACHE.probe(video_path, job)
 
-        stream = info['streams'][0]
-        width = stream['width']
-        height = stream['height']
+    def probe_many(self, video_paths):
+        """Probe many movies at once, e.g. to warm the cache for every assigned shot"""
+        return PROBE_CACHE.probe_many(video_paths)
 
-        fps_parts = stream['r_frame_rate'].split('/')
-        fps = float(fps_parts[0]) / float(fps_parts[1])
-        return width, height, fps
+    def get_video_metadata(self, video_path):
+        """Resolution and fps of a video file, fps as an exact Fraction"""
+        record = self.probe_media(video_path)
+        if record is None:
+            return None
+        return record.width, record.height, record.fps
 
+    @traced("shotgrid")
     def set_task_status(self, task_id, new_status):
         """Update task status in ShotGrid"""
         print(f'Setting task {task_id} status to {new_status}')
         try:
-            self.sg.update("Task", task_id, {"sg_status_list": new_status})
+            self.pool.call("update", "Task", task_id, {"sg_status_list": new_status})
             print(f"Task {task_id} status updated to {new_status}")
         except Exception as e:
             print(f"Failed to update status for Task {task_id}: {e}")
 
-    def publish_video(self, video_file, version, proj_id, shot_id, task_id):
-        """Publish video to ShotGrid"""
+    @traced("shotgrid")
+    def set_task_statuses(self, task_ids, new_status):
+        """Update the status of several tasks in one batched ShotGrid request"""
+        print(f'Setting {len(task_ids)} tasks status to {new_status}')
+        requests = [
+            {"request_type": "update", "entity_type": "Task", "entity_id": int(task_id),
+             "data": {"sg_status_list": new_status}}
+            for task_id in task_ids
+        ]
+        try:
+            self.pool.call("batch", requests)
+            print(f"Tasks {', '.join(str(t) for t in task_ids)} status updated to {new_status}")
+            return True
+        except Exception as e:
+            print(f"Failed to update status for Tasks {task_ids}: {e}")
+            return False
+
+    @traced("shotgrid")
+    def publish_video(self, video_file, version, proj_id, shot_id, task_id, version_status='rvi', task_status='rvi'):
+        """Publish video to ShotGrid.
+
+        The Version (with its status) is created and the task status updated
+        in a single batch request, then the movie is uploaded. If the upload
+        fails the Version stays without media.
+        """
         if not os.path.exists(video_file):
             print(f"Video file not found: {video_file}")
             return None
@@ -403,16 +1682,30 @@ class SGIO:
         data = {
             "project": {"type": "Project", "id": int(proj_id)},
             "code": version,
-            "description": f"Auto-published from script by user: {int(RETRIEVED_USER_ID)}",
+            "description": f"Auto-published from script by user: {int(self.user_id)}",
             "entity": {"type": "Shot", "id": int(shot_id)},
             "sg_task": {"type": "Task", "id": int(task_id)},
-            "user": {"type": "HumanUser", "id": int(RETRIEVED_USER_ID)},
+            "user": {"type": "HumanUser", "id": int(self.user_id)},
         }
+        if version_status:
+            data["sg_status_list"] = version_status
+
+        requests = [{"request_type": "create", "entity_type": "Version", "data": data}]
+        if task_status:
+            requests.append({
+                "request_type": "update", "entity_type": "Task", "entity_id": int(task_id),
+                "data": {"sg_status_list": task_status}
+            })
 
         try:
-            version = self.sg.create("Version", data)
+            with span("batch", "shotgrid", requests=len(requests)):
+                version = self.pool.call("batch", requests, retry=False)[0]
+            if task_status:
+                print(f"Task {task_id} status updated to {task_status}")
             print('Publishing file to ShotGrid...')
-            self.sg.upload("Version", version["id"], video_file, field_name="sg_uploaded_movie")
+            with span("upload", "upload", bytes=os.path.getsize(video_file)):
+                self.pool.call("upload", "Version", version["id"], video_file, field_name="sg_uploaded_movie",
+                               retry=False)
             print('File successfully published!')
             return version
         except Exception as e:
@@ -420,12 +1713,163 @@ class SGIO:
             return None
 
 
+class StreamingEncoder:
+    """Encode a review movie while its frames are still being rendered.
+
+    ffmpeg can't demux EXR from a pipe, so finished frames are encoded in
+    batches of STREAM_BATCH_FRAMES into part files on a background thread,
+    and the parts are joined with the concat demuxer (stream copy) once the
+    last frame is in. Frames may finish out of order; a batch only starts
+    once every frame in it is on disk.
+    """
+
+    def __init__(self, input_images_path, output_video_path, first_frame, last_frame,
+                 batch_frames=STREAM_BATCH_FRAMES):
+        self.input_images_path = input_images_path
+        self.output_video_path = output_video_path
+        self.first_frame = first_frame
+        self.last_frame = last_frame
+        self.batch_frames = max(1, batch_frames)
+
+        self.next_frame = first_frame
+        self.done_frames = set()
+        self.finished = False
+        self.aborted = False
+        self.failed = False
+        self.parts = []
+        self.process = None
+        self.part_dir = None
+        self.thread = None
+        self.condition = threading.Condition()
+
+    def start(self):
+        output_dir = os.path.dirname(self.output_video_path)
+        os.makedirs(output_dir, exist_ok=True)
+        self.part_dir = tempfile.mkdtemp(prefix='.stream_', dir=output_dir)
+        self.thread = threading.Thread(target=self._encode_loop, daemon=True)
+        self.thread.start()
+
+    def frame_done(self, frame):
+        """Call when a frame has been completely written to disk"""
+        with self.condition:
+            self.done_frames.add(frame)
+            self.condition.notify()
+
+    @traced("encode")
+    def finish(self):
+        """Encode what's left, join the parts and return the movie path, or None on failure"""
+        with self.condition:
+            self.finished = True
+            self.condition.notify()
+        self.thread.join()
+
+        try:
+            if self.failed or self.aborted:
+                return None
+            if self.next_frame <= self.last_frame:
+                print(f'Frames {self.next_frame}-{self.last_frame} were never rendered.')
+                return None
+            return self._concat()
+        finally:
+            shutil.rmtree(self.part_dir, ignore_errors=True)
+
+    def abort(self):
+        """Stop encoding, e.g. because the render was cancelled, and clean up"""
+        with self.condition:
+            self.aborted = True
+            self.condition.notify()
+            if self.process is not None and self.process.poll() is None:
+                self.process.kill()
+        if self.thread is not None:
+            self.thread.join()
+        shutil.rmtree(self.part_dir, ignore_errors=True)
+        if os.path.exists(self.output_video_path):
+            os.remove(self.output_video_path)
+
+    def _next_batch(self):
+        """Wait for the next run of contiguous frames, return (first, count) or None when done"""
+        with self.condition:
+            while True:
+                if self.aborted:
+                    return None
+                count = 0
+                while (self.next_frame + count in self.done_frames
+                       and self.next_frame + count <= self.last_frame):
+                    count += 1
+                remaining = self.last_frame - self.next_frame + 1
+                if count and (count >= min(self.batch_frames, remaining) or self.finished):
+                    first = self.next_frame
+                    self.next_frame += count
+                    return first, count
+                if self.finished or remaining <= 0:
+                    return None
+                self.condition.wait()
+
+    def _encode_loop(self):
+        ext = os.path.splitext(self.output_video_path)[1]
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            first, count = batch
+            part_path = os.path.join(self.part_dir, f'part{len(self.parts):04d}{ext}')
+            cmd = [
+                "ffmpeg",
+                "-v", "error",
+                "-framerate", str(PIPELINE_FPS),
+                "-start_number", str(first),
+                "-i", self.input_images_path,
+                "-frames:v", str(count),
+                "-y",
+                part_path
+            ]
+            with process_span(cmd, frames=count) as process_trace:
+                with self.condition:
+                    if self.aborted:
+                        return
+                    self.process = subprocess.Popen(
+                        cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True
+                    )
+                _, stderr = self.process.communicate()
+                process_trace.set(returncode=self.process.returncode)
+            if self.process.returncode != 0:
+                if not self.aborted:
+                    print(f'Error encoding frames {first}-{first + count - 1}: {stderr.strip()}')
+                    self.failed = True
+                return
+            self.parts.append(part_path)
+            print(f'Encoded frames {first}-{first + count - 1}')
+
+    def _concat(self):
+        list_path = os.path.join(self.part_dir, 'parts.txt')
+        with open(list_path, 'w', encoding='utf-8') as f:
+            for part in self.parts:
+                f.write(f"file '{part.replace(os.sep, '/')}'\n")
+        cmd = [
+            "ffmpeg",
+            "-v", "error",
+            "-f", "concat",
+            "-safe", "0",
+            "-i", list_path,
+            "-c", "copy",
+            "-y",
+            self.output_video_path
+        ]
+        try:
+            run_command(cmd, check=True)
+            print('Image sequence successfully converted to video!')
+            return self.output_video_path
+        except subprocess.CalledProcessError as e:
+            print(f'Error joining encoded parts: {e}')
+            return None
+
+
 class NukeHandler():
     def __init__(self):
         self.write_name = 'RenderNode'
-        self.pfm_instance = PipelineFileManager()
 
     def set_nuke_project_settings(self, width, height, fps):
+        """Set the root format and fps, fps may be an exact Fraction from a MediaRecord"""
         nuke.root()['colorManagement'].setValue('OCIO')
         format_name = f"custom_{int(width)}x{int(height)}"
         format_str = f"{int(width)} {int(height)} 0 0 {int(width)} {int(height)} 1.0 {format_name}"
@@ -433,8 +1877,9 @@ class NukeHandler():
         nuke.root()['format'].setValue(format_name)
         nuke.root()['fps'].setValue(float(fps))
 
-    def create_comp(self, input_images, tree, script_name):
-        """Create new Nuke composition"""
+    @traced("nuke")
+    def create_comp(self, input_images, script_name, context):
+        """Create new Nuke composition for the shot of a ShotContext"""
         print('Creating Comp...')
 
         try:
@@ -443,10 +1888,8 @@ class NukeHandler():
             # read_node["colorspace"].setValue('ACES - ACEScg')
             read_node["colorspace"].setValue('Output - sRGB')
 
-            # Create Write node
-            self.pfm_instance.tree = tree
-            self.pfm_instance.get_data()
-            output_path = self.pfm_instance.get_comp_output_path(for_nuke=True)
+            # Create Write node, rendering into the version of the script about to be saved
+            output_path = context.get_comp_output_path(for_nuke=True, next_version=True)
             if not output_path:
                 print("Could not determine output path")
                 return
@@ -458,30 +1901,29 @@ class NukeHandler():
             # Connect nodes
             self.write_node.setInput(0, read_node)
 
-            dir_path = os.path.dirname(input_images)
-            base_name = os.path.basename(input_images)
-
-            if os.path.exists(dir_path):
-                # Replace %04d with regex for 4 digits
-                pattern = re.sub(r'%04d', r'(\\d{4})', base_name)
-                regex = re.compile('^' + pattern + '$')
-                frames = []
-                for f in os.listdir(dir_path):
-                    m = regex.match(f)
-                    if m:
-                        frames.append(int(m.group(1)))
-                if frames:
-                    first_frame = min(frames)
-                    last_frame = max(frames)
-
-                    read_node["first"].setValue(first_frame)
-                    read_node["last"].setValue(last_frame)
-                    nuke.root()["first_frame"].setValue(first_frame)
-                    nuke.root()["last_frame"].setValue(last_frame)
-
-                    print(f"Set frame range: {first_frame} - {last_frame}")
-                else:
-                    print("No matching image files found")
+            # A finished extraction already recorded its frames, only scan the folder without one
+            manifest = ExtractionManifest.load(input_images)
+            if manifest is not None and manifest.complete and manifest.frames:
+                frame_range = min(manifest.frames), max(manifest.frames)
+                problems = ""
+            else:
+                sequence = find_sequence(input_images)
+                frame_range = (sequence.first_frame, sequence.last_frame) if sequence else None
+                problems = sequence.describe_problems()
+
+            if frame_range:
+                first_frame, last_frame = frame_range
+
+                read_node["first"].setValue(first_frame)
+                read_node["last"].setValue(last_frame)
+                nuke.root()["first_frame"].setValue(first_frame)
+                nuke.root()["last_frame"].setValue(last_frame)
+
+                print(f"Set frame range: {first_frame} - {last_frame}")
+                if problems:
+                    print(f"Warning, input sequence has {problems}")
+            else:
+                print("No matching image files found")
 
             nuke.scriptSaveAs(script_name)
             print('Comp created successfully.')
@@ -489,17 +1931,14 @@ class NukeHandler():
         except Exception as e:
             print(f"Error creating Nuke composition: {e}")
 
-    def upversion_proj(self, tree):
-        # Update pipeline manager with the new tree/context
-        self.pfm_instance.tree = tree
-        self.pfm_instance.get_data()
-
+    @traced("nuke")
+    def upversion_proj(self, context):
         # Get the new versioned Nuke script path
-        nuke_script_name = self.pfm_instance.get_nuke_script_path(new=True)
+        nuke_script_name = context.get_nuke_script_path(new=True)
         print('Saving name as', nuke_script_name)
 
         # Get the new versioned output path for the Write node
-        output_path = self.pfm_instance.get_comp_output_path(for_nuke=True)
+        output_path = context.get_comp_output_path(for_nuke=True, next_version=True)
         print('New Write node output path:', output_path)
 
         # Find the Write node and update its file path
@@ -513,260 +1952,259 @@ class NukeHandler():
         # Save the Nuke script with the new versioned name
         nuke.scriptSaveAs(nuke_script_name)
 
-    def render(self, tree):
-        """Render previously made write node"""
+    def render_command(self, script_path, first_frame=None, last_frame=None, threads=None, ranges=None):
+        """Command line rendering the Write node of a saved script in a separate Nuke process"""
+        cmd = [NUKE_EXECUTABLE, "-x", "-X", self.write_name]
+        if threads:
+            cmd += ["-m", str(threads)]
+        if first_frame is not None and last_frame is not None:
+            cmd += ["-F", f"{first_frame}-{last_frame}"]
+        for first, last in ranges or ():
+            cmd += ["-F", f"{first}-{last}"]
+        cmd.append(script_path.replace('\\', '/'))
+        return cmd
+
+    def frame_range(self):
+        return int(nuke.root()["first_frame"].value()), int(nuke.root()["last_frame"].value())
+
+    @traced("render")
+    def render(self, context, on_frame=None):
+        """Render previously made write node, return True if every frame rendered.
+
+        on_frame is called with the frame number after each frame is written.
+        With PARALLEL_RENDER the frame range is rendered in chunks by separate
+        Nuke processes instead of in this session.
+        """
         write_node = nuke.toNode(self.write_name)
 
-        self.pfm_instance.tree = tree
-        self.pfm_instance.get_data()
+        if PARALLEL_RENDER:
+            render_args = self.prepare_render(context)
+            if render_args is None:
+                return False
+            return self.render_chunks(*render_args, on_frame=on_frame, input_paths=self.read_paths())
 
         if write_node is not None:
-            output_path = self.pfm_instance.get_comp_output_path(for_nuke=True)
+            output_path = context.get_comp_output_path(for_nuke=True)
             if not output_path:
                 print("Could not determine output path")
-                return
+                return False
 
             output_dir = os.path.dirname(write_node["file"].value())
             if not os.path.exists(output_dir):
                 os.makedirs(output_dir)
 
-            first_frame = int(nuke.root()["first_frame"].value())
-            last_frame = int(nuke.root()["last_frame"].value())
-            nuke.render(write_node, first_frame, last_frame)
+            def after_frame():
+                if nuke.thisNode().name() == self.write_name:
+                    on_frame(nuke.frame())
+
+            first_frame, last_frame = self.frame_range()
+            image_path = write_node["file"].value().replace('####', '%04d')
+            input_paths = self.read_paths()
+
+            # Unsaved changes aren't in the script file the cache key and frame ages are compared with
+            script_path = nuke.root().name()
+            saved = script_path and script_path != 'Root' and not nuke.root().modified()
+
+            cache = None
+            if RENDER_CACHE and saved:
+                cache = RenderCache(script_path, image_path, first_frame, last_frame, input_paths)
+                if cache.check():
+                    report_frames(on_frame, first_frame, last_frame)
+                    return True
+
+            ranges = [(first_frame, last_frame)]
+            if INCREMENTAL_RENDER and saved:
+                ranges, fresh_frames = self.incremental_ranges(
+                    script_path, image_path, first_frame, last_frame, input_paths
+                )
+                if on_frame is not None:
+                    for frame in fresh_frames:
+                        on_frame(frame)
+
+            if on_frame is not None:
+                nuke.addAfterFrameRender(after_frame, nodeClass='Write')
+            try:
+                if ranges:
+                    nuke.executeMultiple((write_node,), [(a, b, 1) for a, b in ranges])
+                if cache is not None:
+                    cache.store()
+                return True
+            except RuntimeError as e:
+                print(f"Render stopped: {e}")
+                return False
+            finally:
+                if on_frame is not None:
+                    nuke.removeAfterFrameRender(after_frame, nodeClass='Write')
         else:
             print("Write node not set. Cannot render.")
+            return False
 
+    def read_paths(self):
+        """File paths of the script's Read nodes"""
+        return [node["file"].value() for node in nuke.allNodes('Read')]
 
-class StandardItem(QStandardItem):
-    def __init__(self, txt='', font_size=12, set_bold=False, color=QColor(0, 0, 0)):
-        super().__init__()
-
-        fnt = QFont('Open Sans', font_size)
-        fnt.setBold(set_bold)
-
-        self.setEditable(False)
-        self.setForeground(color)
-        self.setFont(fnt)
-        self.setText(txt)
-
-
-class MainWindow(QMainWindow):
-    def __init__(self, sgio):
-        super().__init__()
-        self.io_instance = sgio
-        self.nuke_instance = NukeHandler()
-        self.pfm = PipelineFileManager(tree=None)  # Will be set after tree creation
-
-        # Sets ui elements
-        self.setWindowTitle("ShotGrid Task Tree")
-        self.resize(600, 400)
-        self.tree = QTreeView()
-        self.tree.header().hide()
-        self.tree.setEditTriggers(QAbstractItemView.NoEditTriggers)
-
-        self.pfm.tree = self.tree
-
-        self.build_comp_button = self.add_button("Build/Open Comp", self.build_comp)
-        self.upversion_button = self.add_button("Write Up Version", self.upversion_passthrough)
-        self.in_progress_button = self.add_button("Put Task 'In Progress'", self.task_in_progress)
-        self.publish_button = self.add_button("Publish Video", self.task_publish)
-
-        self.main_widget = QWidget()
-        layout = QVBoxLayout(self.main_widget)
-
-        layout.addWidget(QLabel("Project Status:"))
-        layout.addWidget(self.tree)
-        layout.addWidget(self.build_comp_button)
-        layout.addWidget(self.upversion_button)
-        layout.addWidget(self.in_progress_button)
-        layout.addWidget(self.publish_button)
-
-        self.setCentralWidget(self.main_widget)
-        self.data = self.io_instance.get_tasks()
-
-        model = self.build_tree(self.data)
-        self.tree.setModel(model)
-        self.tree.expandAll()
-
-    def upversion_passthrough(self):
-        """This class is used to pass through the tree because it is not possible in a qt connect"""
-        self.nuke_instance.upversion_proj(self.tree)
-
-    def build_tree(self, tasks):
-        print('Started building tree...')
-        model = QStandardItemModel()
-        root = model.invisibleRootItem()
-
-        # Sort tasks by proj, seq then shot
-        tasks_sorted = sorted(
-            tasks,
-            key=lambda x: (
-                x["entity.Shot.project"]["name"],
-                x["entity.Shot.sg_sequence"]["name"],
-                x["entity.Shot.code"],
-                x["id"]
-            )
-        )
-
-        project_items = {}
-        for task in tasks_sorted:
-            # Sets al var
-            proj = task["entity.Shot.project"]["name"].replace(' ', '')
-            seq = task["entity.Shot.sg_sequence"]["name"]
-            shot = task["entity.Shot.code"].split('_')[-1]
-            task_id = task["id"]
-            proj_id = task['entity.Shot.project.Project.id']
-            shot_id = task['entity.Shot.id']
-
-            # Build project level
-            if proj not in project_items:
-                project_item = QStandardItem(proj)
-                root.appendRow([project_item])
-                project_items[proj] = (project_item, {})
-
-            project_item, seq_items = project_items[proj]
-
-            # Build sequence level
-            if seq not in seq_items:
-                seq_item = QStandardItem(seq)
-                project_item.appendRow([seq_item])
-                seq_items[seq] = (seq_item, {})
-
-            seq_item, shot_items = seq_items[seq]
-
-            # Build shot level
-            if shot not in shot_items:
-                shot_item = QStandardItem(shot)
-                shot_item.setData(proj, Qt.UserRole)  # Store project
-                shot_item.setData(seq, Qt.UserRole + 1)  # Store sequence
-                shot_item.setData(shot, Qt.UserRole + 2)  # Store shot
-                shot_item.setData(task_id, Qt.UserRole + 3)  # Store task ID
-                shot_item.setData(proj_id, Qt.UserRole + 4)
-                shot_item.setData(shot_id, Qt.UserRole + 5)
-                seq_item.appendRow([shot_item])
-                shot_items[shot] = shot_item
-
-        print('Tree has been built.')
-        return model
-
-    def add_button(self, label, action):
-        button = QPushButton(label)
-        button.clicked.connect(lambda: action())
-        return button
-
-    def task_in_progress(self):
-        """Set task status to In Progress"""
-        index = self.tree.currentIndex()
-        item = self.tree.model().itemFromIndex(index)
-
-        if item is None:
-            print("No item selected!")
-            return
-
-        task_id = item.data(Qt.UserRole + 3)
-        if not task_id:
-            print("No Task ID found for selected item!")
-            return
-
-        self.io_instance.set_task_status(task_id, 'ip')
-        print('Changed status of task to In Progress.')
-
-    def task_publish(self):
-        """Publish task - render images to video and upload to ShotGrid"""
-        index = self.tree.currentIndex()
-        item = self.tree.model().itemFromIndex(index)
-
-        if item is None:
-            print("No item selected!")
-            return
-
-        seq_id = item.data(Qt.UserRole + 1)
-        shot_id = item.data(Qt.UserRole + 5)
-        task_id = item.data(Qt.UserRole + 3)
-        proj_id = item.data(Qt.UserRole + 4)
-        if not task_id:
-            print("No Task ID found for selected item!")
-            return
-
-        # Get current comp output and convert to video
-        comp_output_path = self.pfm.get_comp_output_path(False)
-        publish_video_path = self.pfm.get_publish_video_path()
-
-        if not comp_output_path or not publish_video_path:
-            print("Could not determine comp output or publish video paths")
-            return
-
-        self.nuke_instance.render(self.tree)
-
-        # Convert images to video
-        video_file = self.io_instance.images_to_video(comp_output_path, publish_video_path)
-
-        # Make name
-        base = os.path.splitext(os.path.basename(video_file))[0]
-        version = base[-4:]
-
-        if video_file and os.path.exists(video_file):
-            version  = self.io_instance.publish_video(video_file, version, proj_id, shot_id, task_id)
-            if version:
-                version_id = version["id"]
-                self.io_instance.sg.update("Version", version_id, {"sg_status_list": "rvi"})
-                print("Changed status of version to Review Internal.")
-
-            self.io_instance.set_task_status(task_id, 'rvi')
-            print('Changed status of task to Review Internal.')
-        else:
-            print("Failed to create video for publishing")
-
-
-    def build_comp(self):
-        """Build composition when shot is double-clicked"""
-        nuke_script_path = self.pfm.get_nuke_script_path(new=False)
-        print('path is', nuke_script_path)
-
-        # Will open nuke script if it exists
-        if os.path.exists(nuke_script_path):
-            nuke.scriptOpen(nuke_script_path)
-            return
-
-        else:
-            print('making comp')
-            index = self.tree.currentIndex()
-            item = self.tree.model().itemFromIndex(index)
-            if item is None:
-                print("No item found for index!")
-                return
-
-            # Get source video and convert to images
-            source_video_path = self.pfm.get_source_video_path()
-            comp_input_path = self.pfm.get_comp_input_path(for_nuke=False)
-
-            if not source_video_path:
-                print("Source video not found")
-                return
-
-            if not comp_input_path:
-                print("Could not determine comp input path")
-                return
+    def prepare_render(self, context):
+        """Save the script for a command line render, return (script, image path, first, last) or None"""
+        write_node = nuke.toNode(self.write_name)
+        if write_node is None:
+            print("Write node not set. Cannot render.")
+            return None
 
-            # Convert video to images
-            image_sequence = self.io_instance.video_to_images(source_video_path, comp_input_path)
-            w, h, fps = self.io_instance.get_video_metadata(source_video_path)
-            self.nuke_instance.set_nuke_project_settings(w, h, fps)
+        if not context.get_comp_output_path(for_nuke=True):
+            print("Could not determine output path")
+            return None
 
-            if not image_sequence:
-                print("Failed to convert video to images")
+        script_path = nuke.root().name()
+        if not script_path or script_path == 'Root':
+            print("Save the script before rendering.")
+            return None
+        nuke.scriptSave()
+
+        image_path = write_node["file"].value().replace('####', '%04d')
+        os.makedirs(os.path.dirname(image_path), exist_ok=True)
+        first_frame, last_frame = self.frame_range()
+        return script_path, image_path, first_frame, last_frame
+
+    def incremental_ranges(self, script_path, image_path, first_frame, last_frame, input_paths=()):
+        """Ranges still to render and the frames already rendered since the script and inputs last changed"""
+        pending = frames_to_render(image_path, first_frame, last_frame, script_path, input_paths)
+        ranges = frame_ranges(pending)
+        pending = set(pending)
+        fresh_frames = [frame for frame in range(first_frame, last_frame + 1) if frame not in pending]
+        if fresh_frames:
+            print(f'Incremental render: {len(pending)} of {last_frame - first_frame + 1} frames need rendering'
+                  + (f' ({describe_ranges(ranges)})' if ranges else ''))
+        return ranges, fresh_frames
+
+    def plan_render_chunks(self, first_frame, last_frame, processes=None, ranges=None):
+        """Split a frame range over Nuke processes, returns (chunks, processes, threads per process).
+
+        ranges limits the chunks to those (first, last) parts of the range.
+        """
+        cores = os.cpu_count() or 1
+        ranges = [(first_frame, last_frame)] if ranges is None else ranges
+        frame_count = sum(last - first + 1 for first, last in ranges)
+        processes = processes or RENDER_PROCESSES or max(1, cores // RENDER_THREADS_PER_PROCESS)
+        processes = max(1, min(processes, frame_count // RENDER_MIN_CHUNK_FRAMES or 1))
+        threads = max(1, cores // processes)
+
+        # Twice as many chunks as processes so a slow chunk doesn't hold up the rest
+        chunk_count = min(processes * 2, max(1, frame_count // RENDER_MIN_CHUNK_FRAMES)) if processes > 1 else 1
+        size = -(-frame_count // chunk_count)
+        chunks = [
+            (start, min(start + size - 1, last))
+            for first, last in ranges
+            for start in range(first, last + 1, size)
+        ]
+        return chunks, processes, threads
+
+    @traced("render")
+    def render_chunks(self, script_path, image_path, first_frame, last_frame, processes=None, on_frame=None, job=None,
+                      input_paths=None):
+        """Render a saved script in frame chunks with parallel `nuke -x` processes.
+
+        Failed chunks are retried once. Returns True once every frame of the
+        range is verified on disk, so publishing can safely continue.
+        input_paths are the Read node files for the render cache and the
+        incremental render, parsed from the script when not given.
+        """
+        if input_paths is None:
+            input_paths = read_script_info(script_path)["read_files"]
+        if not input_paths and (RENDER_CACHE or INCREMENTAL_RENDER):
+            print("Render cache and incremental render skipped: no Read nodes found in the script")
+
+        cache = None
+        if RENDER_CACHE and input_paths:
+            cache = RenderCache(script_path, image_path, first_frame, last_frame, input_paths)
+            if cache.check():
+                if job is not None:
+                    job.set_progress(1.0)
+                report_frames(on_frame, first_frame, last_frame)
+                return True
+
+        lock = threading.Lock()
+        done_frames = set()
+        ranges = [(first_frame, last_frame)]
+        if INCREMENTAL_RENDER and input_paths:
+            ranges, fresh_frames = self.incremental_ranges(
+                script_path, image_path, first_frame, last_frame, input_paths
+            )
+            done_frames.update(fresh_frames)
+            if on_frame is not None:
+                for frame in fresh_frames:
+                    on_frame(frame)
+
+        chunks, processes, threads = self.plan_render_chunks(first_frame, last_frame, processes, ranges)
+        if chunks:
+            print(f'Rendering frames {describe_ranges(ranges)} in {len(chunks)} chunks '
+                  f'on {processes} processes with {threads} threads each...')
+
+        head, _, tail = os.path.basename(image_path).partition('%04d')
+        written = re.compile(re.escape(head) + r'(\d+)' + re.escape(tail) + r'.* took')
+
+        def on_line(line):
+            match = written.search(line)
+            if not match:
                 return
-
-            nuke_script_path = self.pfm.get_nuke_script_path(new=True)
-            self.nuke_instance.create_comp(image_sequence, self.tree, nuke_script_path)
+            frame = int(match.group(1))
+            with lock:
+                if frame in done_frames:
+                    return
+                done_frames.add(frame)
+                progress = len(done_frames) / (last_frame - first_frame + 1)
+            if job is not None:
+                job.set_progress(progress)
+            if on_frame is not None:
+                on_frame(frame)
+
+        def render_chunk(chunk):
+            cmd = self.render_command(script_path, chunk[0], chunk[1], threads)
+            for attempt in (1, 2):
+                if stream_command(cmd, on_line, job) == 0:
+                    return True
+                if job is not None and job.cancelled:
+                    return False
+                print(f'Chunk {chunk[0]}-{chunk[1]} failed (attempt {attempt} of 2)')
+            return False
+
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=processes) as executor:
+            results = list(executor.map(render_chunk, chunks))
+
+        failed = [chunk for chunk, ok in zip(chunks, results) if not ok]
+        for chunk in failed:
+            print(f'Chunk {chunk[0]}-{chunk[1]} failed to render')
+
+        frames = scan_frames(image_path)
+        missing = [frame for frame in range(first_frame, last_frame + 1) if not frames.get(frame)]
+        if missing:
+            print(f'Frames missing after render: {describe_ranges(frame_ranges(missing))}')
+            return False
+        if failed:
+            return False
+
+        # Frames the log didn't report, e.g. with quiet Nuke builds
+        if on_frame is not None:
+            for frame in range(first_frame, last_frame + 1):
+                if frame not in done_frames:
+                    on_frame(frame)
+        if cache is not None:
+            cache.store()
+        current().set(bytes=sum(frames.values()), frames=sum(last - first + 1 for first, last in ranges))
+        print('Render finished, all frames verified.')
+        return True
 
 
 def run():
     """Main entry point"""
     try:
         global my_window
+        from PySide6.QtWidgets import QApplication
+        from .ui import MainWindow
+
         app = QApplication.instance()
-        sgio = SGIO(SG, RETRIEVED_USER_ID)
+        sgio = SGIO()
         my_window = MainWindow(sgio)
         my_window.show()
     except Exception as e:
@@ -0,0 +1,11 @@
+"""Benchmarks of SGNukeBuilder's hot paths, on plain CPython without Nuke or a ShotGrid site.
+
+    python -m SGNukeBuilder.benchmarks                    # every suite, compared with baseline.json
+    python -m SGNukeBuilder.benchmarks tree paths --quick
+    python -m SGNukeBuilder.benchmarks --check            # exit 1 if something got slower or bigger
+    python -m SGNukeBuilder.benchmarks --save-baseline    # record this machine's numbers
+
+Config and nuke are stubs (stubs.py), ShotGrid is an in-process stand-in
+with the Shotgun API (mockgun.py) and projects are generated on the fly
+(projects.py), in a temporary folder that is removed afterwards.
+"""
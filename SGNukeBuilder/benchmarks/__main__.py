@@ -0,0 +1,58 @@
+"""Runs the benchmark suites, see the package docstring for usage."""
+
+# Standard library imports
+import sys
+import argparse
+import importlib
+
+# Local application imports
+from . import stubs, harness
+
+# Suite modules, each with run(folder, quick) returning a list of results
+SUITES = ("imports", "tree", "models", "paths", "comp", "scan", "extraction")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m SGNukeBuilder.benchmarks",
+                                     description="Time the hot paths of SGNukeBuilder outside Nuke.")
+    parser.add_argument("suites", nargs="*", help=f"suites to run: {', '.join(SUITES)}; default all")
+    parser.add_argument("--quick", action="store_true", help="only the smallest sizes")
+    parser.add_argument("--check", action="store_true", help="exit with 1 if a result regressed from the baseline")
+    parser.add_argument("--tolerance", type=float, default=1.0,
+                        help="how much worse than the baseline counts as a regression, default 1.0 = twice "
+                             "the baseline; timings on shared machines easily vary by 50%%")
+    parser.add_argument("--save-baseline", action="store_true", help="record the results as the new baseline")
+    parser.add_argument("--baseline", help="baseline file, default baseline.json next to the suites")
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.suites if name not in SUITES]
+    if unknown:
+        parser.error(f"unknown suites: {', '.join(unknown)}")
+
+    # Before the suites import anything that reads config.py or imports nuke
+    folder = stubs.install()
+    baseline_path = args.baseline or harness.BASELINE_PATH
+
+    results = []
+    for name in args.suites or SUITES:
+        print(f"Running {name}...")
+        results.extend(importlib.import_module(f".{name}", __package__).run(folder, quick=args.quick))
+
+    baseline = harness.load_baseline(baseline_path)
+    harness.print_results(results, baseline)
+    if args.save_baseline:
+        harness.save_baseline(results, baseline_path)
+        print(f"Baseline saved to {baseline_path}")
+
+    failures = harness.failures(results)
+    for message in failures:
+        print(f"FAILED {message}")
+    if args.check:
+        regressions = harness.regressions(results, baseline, args.tolerance)
+        for message in regressions:
+            print(f"REGRESSION {message}")
+        failures += regressions
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,42 @@
+"""create_comp frame detection: Build Comp on extracted plates, in the stub nuke module.
+
+With a complete extraction manifest the frame range comes from the
+manifest; without one (plates extracted before manifests existed, or by
+hand) the plate folder is scanned, uncached.
+"""
+
+# Standard library imports
+import os
+
+# Local application imports
+from ..SGNukeBuilder import ShotContext, NukeHandler
+from ..sequences import invalidate
+from .harness import measure, quiet
+from .projects import make_project_tree
+
+SHOTS = 10
+FRAMES = (100, 1000)
+QUICK_FRAMES = (100,)
+
+
+def run(folder, quick=False):
+    import nuke
+
+    results = []
+    for frames in QUICK_FRAMES if quick else FRAMES:
+        for manifest in (True, False):
+            source = "manifest" if manifest else "scan"
+            root = os.path.join(folder, "comp", f"{source}_{frames}")
+            names = make_project_tree(root, 1, 1, SHOTS, versions=1, frames=frames, manifest=manifest)
+            contexts = [ShotContext(proj, seq, shot, root) for proj, seq, shot in names]
+            handler = NukeHandler()
+
+            def build_all():
+                for context in contexts:
+                    nuke.scriptClear()
+                    handler.create_comp(context.paths['comp_input'], context.paths['next_nuke_script'], context)
+
+            results.append(measure(
+                f"create_comp_{source}[{frames} frames]", quiet(build_all), setup=invalidate, items=len(contexts)
+            ))
+    return results
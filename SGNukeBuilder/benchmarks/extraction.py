@@ -0,0 +1,131 @@
+"""Segmented plate extraction: wall clock of video_to_images by plate length and worker count.
+
+A synthetic source movie (testsrc2 with noise, a keyframe every second)
+is extracted from scratch with 1, 2 and 4 ffmpeg processes; the speedup is
+against one process on the same plate. Plates shorter than
+EXTRACT_MIN_SEGMENT_FRAMES per worker get fewer segments than workers.
+
+exact extracts each of EXACT_CLIPS once in one pass and once in
+EXACT_WORKERS segments and compares the frames' hashes: the segments have
+to write the very same frames, or the run fails. The clips cover what
+makes seeking and timestamps go wrong: other frame rates (29.97 and
+23.976 resampled to 24), a movie not starting at 0 and variable frame
+rate. Needs ffmpeg and ffprobe on the PATH.
+"""
+
+# Standard library imports
+import os
+import time
+import shutil
+import hashlib
+import subprocess
+
+# Local application imports
+from ..SGNukeBuilder import SGIO, PIPELINE_FPS
+from ..jobs import Job
+from ..sequences import find_sequence
+from .harness import result, quiet
+
+RESOLUTION = (1280, 720)
+LENGTHS = (96, 480)  # frames
+QUICK_LENGTHS = (96,)
+WORKERS = (1, 2, 4)
+QUICK_WORKERS = (1, 2)
+PLATE_NAME = "plate.%04d.exr"
+REPEAT = 2  # runs per case, the fastest counts; the first run also pays for cold caches
+
+# Small clips, each made by ffmpeg with these input and output options
+EXACT_SIZE = "320x180"
+EXACT_CLIPS = {
+    "24fps": ["-f", "lavfi", "-i", f"testsrc2=size={EXACT_SIZE}:rate=24", "-frames:v", "240"],
+    "29.97fps": ["-f", "lavfi", "-i", f"testsrc2=size={EXACT_SIZE}:rate=30000/1001", "-frames:v", "300"],
+    "23.976fps": ["-f", "lavfi", "-i", f"testsrc2=size={EXACT_SIZE}:rate=24000/1001", "-frames:v", "240"],
+    "start_time": ["-f", "lavfi", "-i", f"testsrc2=size={EXACT_SIZE}:rate=24", "-frames:v", "240",
+                   "-output_ts_offset", "3.7"],
+    # 48 fps with irregular gaps, kept as they are
+    "vfr": ["-f", "lavfi", "-i", f"testsrc2=size={EXACT_SIZE}:rate=48",
+            "-vf", r"select='not(mod(n\,3))+lt(mod(n\,7)\,2)'", "-fps_mode", "vfr", "-frames:v", "300"],
+}
+EXACT_WORKERS = 4
+
+
+def make_movie(path, frames, resolution=RESOLUTION):
+    width, height = resolution
+    cmd = [
+        "ffmpeg", "-v", "error", "-y",
+        "-f", "lavfi", "-i", f"testsrc2=size={width}x{height}:rate={PIPELINE_FPS}",
+        "-vf", "noise=alls=20:allf=t", "-frames:v", str(frames), "-g", str(PIPELINE_FPS), path,
+    ]
+    subprocess.run(cmd, check=True)
+    return path
+
+
+def make_clip(path, options):
+    subprocess.run(["ffmpeg", "-v", "error", "-y", *options, "-g", str(PIPELINE_FPS), path], check=True)
+    return path
+
+
+def frame_hashes(folder):
+    """{frame: sha1} of the plate extracted into folder"""
+    sequence = find_sequence(os.path.join(folder, PLATE_NAME), use_cache=False)
+    hashes = {}
+    for frame in sorted(sequence.sizes):
+        with open(sequence.frame_path(frame), "rb") as f:
+            hashes[frame] = hashlib.sha1(f.read()).hexdigest()
+    return hashes
+
+
+def check_exact(sgio, folder, name, options):
+    """Extract a clip in one pass and in segments, the result fails if any frame differs"""
+    movie_path = make_clip(os.path.join(folder, f"exact_{name}.mov"), options)
+    single_folder, segmented_folder = (os.path.join(folder, f"exact_{name}_{w}") for w in (1, EXACT_WORKERS))
+    extract(sgio, movie_path, single_folder, 1)
+    seconds = extract(sgio, movie_path, segmented_folder, EXACT_WORKERS)
+    single, segmented = frame_hashes(single_folder), frame_hashes(segmented_folder)
+    segments = len(sgio.plan_segments(quiet(lambda: sgio.probe_media(movie_path))(), EXACT_WORKERS))
+    differ = sorted(frame for frame in set(single) | set(segmented) if single.get(frame) != segmented.get(frame))
+    shutil.rmtree(single_folder, ignore_errors=True)
+    shutil.rmtree(segmented_folder, ignore_errors=True)
+    return result(
+        f"exact[{name}]", seconds, len(segmented), segments=segments,
+        note=f"{len(single)} frames, segments={segments}, "
+             f"{f'{len(differ)} differ' if differ else 'identical to one pass'}",
+        failure=f"{len(differ)} of {len(single)} frames differ from one pass, e.g. {differ[:3]}" if differ else None,
+    )
+
+
+def extract(sgio, movie_path, folder, workers):
+    """Seconds one extraction from scratch took"""
+    shutil.rmtree(folder, ignore_errors=True)
+    image_path = os.path.join(folder, PLATE_NAME)
+    job = Job(f"extract {workers}", None)
+    started = time.perf_counter()
+    if not quiet(lambda: sgio.video_to_images(movie_path, image_path, workers=workers, job=job))():
+        raise RuntimeError(f"Extracting {movie_path} with {workers} workers failed")
+    return time.perf_counter() - started
+
+
+def run(folder, quick=False):
+    if shutil.which("ffmpeg") is None or shutil.which("ffprobe") is None:
+        print("extraction skipped: ffmpeg or ffprobe isn't on the PATH")
+        return []
+
+    sgio = SGIO(sg_api=object())
+    results = []
+    for frames in QUICK_LENGTHS if quick else LENGTHS:
+        movie_path = make_movie(os.path.join(folder, f"source_{frames}.mov"), frames)
+        output = os.path.join(folder, f"plate_{frames}")
+        single = None
+        for workers in QUICK_WORKERS if quick else WORKERS:
+            seconds = min(extract(sgio, movie_path, output, workers) for _ in range(REPEAT))
+            single = single or seconds
+            segments = len(sgio.plan_segments(quiet(lambda: sgio.probe_media(movie_path))(), workers))
+            results.append(result(
+                f"extract[{frames} frames, workers={workers}]", seconds, frames,
+                segments=segments, speedup=round(single / seconds, 2),
+                note=f"segments={segments}, {single / seconds:.2f}x the speed of 1 worker",
+            ))
+        shutil.rmtree(output, ignore_errors=True)
+    for name, options in EXACT_CLIPS.items():
+        results.append(check_exact(sgio, folder, name, options))
+    return results
@@ -0,0 +1,188 @@
+"""Timing, memory and baseline helpers shared by the benchmark suites.
+
+A result is a dict: "case", "seconds" (best of the repeats), "items" the
+case went through, and whichever memory figures it measured: "peak_kb",
+the peak of Python allocations during one more run (tracemalloc), or
+"rss_kb", the growth of the process' resident memory, which includes Qt's.
+"""
+
+# Standard library imports
+import io
+import os
+import sys
+import json
+import time
+import platform
+import subprocess
+import contextlib
+import tracemalloc
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+METRICS = ("seconds", "peak_kb", "rss_kb")
+RESULT_MARKER = "BENCHMARK_RESULT "
+
+
+def measure(case, func, setup=None, repeat=9, items=None, **extra):
+    """Best time of `repeat` calls of func, each after setup(), and the peak Python memory of one more call"""
+    times = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - started)
+
+    if setup is not None:
+        setup()
+    tracemalloc.start()
+    try:
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return result(case, min(times), items, peak_kb=peak / 1024, **extra)
+
+
+def result(case, seconds, items=None, **extra):
+    return dict(case=case, seconds=seconds, items=items, **extra)
+
+
+def quiet(func):
+    """func with the progress it prints swallowed"""
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            return func()
+    return run
+
+
+def rss_kb():
+    """Current resident memory of this process in KB, None where it can't be read"""
+    try:
+        with open("/proc/self/statm", encoding="ascii") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    # Only the peak is available here, good enough for one measured build per process
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def run_isolated(module, function, *args):
+    """Run benchmarks.<module>.<function>(*args) in a fresh interpreter, returns its result dict.
+
+    For measurements a warm process would spoil: resident memory, imports.
+    """
+    cmd = [sys.executable, "-m", f"{__package__}.isolated", module, function, json.dumps(args)]
+    completed = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, env=isolated_env())
+    for line in reversed(completed.stdout.splitlines()):
+        if line.startswith(RESULT_MARKER):
+            return json.loads(line[len(RESULT_MARKER):])
+    raise RuntimeError(f"{module}.{function}{tuple(args)} failed: {completed.stdout.strip()[-1000:]}")
+
+
+def isolated_env():
+    """Environment for a fresh interpreter that can import the package"""
+    package_parent = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [package_parent, env.get("PYTHONPATH")]))
+    return env
+
+
+def machine():
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def load_baseline(path=BASELINE_PATH):
+    """{"machine": ..., "results": {case: result}}, empty results if there is no baseline yet"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"machine": None, "results": {}}
+
+
+def save_baseline(results, path=BASELINE_PATH, merge=True):
+    """Record results as the baseline; cases not run this time keep their old numbers"""
+    baseline = load_baseline(path) if merge else {"results": {}}
+    baseline["machine"] = machine()
+    for item in results:
+        baseline["results"][item["case"]] = {
+            key: round(value, 6) if isinstance(value, float) else value
+            for key, value in item.items() if key not in ("case", "note", "budget", "failure")
+        }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(baseline, f, indent=1, sort_keys=True)
+        f.write("\n")
+
+
+def regressions(results, baseline, tolerance):
+    """Messages for every metric more than `tolerance` (0.5 = 50%) worse than its baseline"""
+    messages = []
+    for item in results:
+        recorded = baseline["results"].get(item["case"])
+        if not recorded:
+            continue
+        for metric in METRICS:
+            old, new = recorded.get(metric), item.get(metric)
+            if old and new is not None and new > old * (1 + tolerance):
+                messages.append(f"{item['case']}: {metric} {format_metric(metric, new)}, "
+                                f"baseline {format_metric(metric, old)} (+{(new / old - 1) * 100:.0f}%)")
+    return messages
+
+
+def failures(results):
+    """Messages for every result that fails the run, with or without a baseline.
+
+    That is a result slower than its "budget" in seconds, or one with a
+    "failure", e.g. extracted frames that differ.
+    """
+    messages = []
+    for item in results:
+        if item.get("failure"):
+            messages.append(f"{item['case']}: {item['failure']}")
+        if item.get("budget") is not None and item["seconds"] > item["budget"]:
+            messages.append(f"{item['case']}: {format_metric('seconds', item['seconds'])}, "
+                            f"over its budget of {format_metric('seconds', item['budget'])}")
+    return messages
+
+
+def format_metric(metric, value):
+    if value is None:
+        return "-"
+    if metric == "seconds":
+        if value < 1e-6:
+            return f"{value * 1e9:.0f} ns"
+        if value < 1e-3:
+            return f"{value * 1e6:.1f} us"
+        if value < 1:
+            return f"{value * 1e3:.1f} ms"
+        return f"{value:.2f} s"
+    if value < 1024:
+        return f"{value:.0f} KB"
+    return f"{value / 1024:.1f} MB"
+
+
+def print_results(results, baseline=None):
+    print(f"{'case':<46} {'time':>10} {'per item':>10} {'peak py':>9} {'rss':>9} {'baseline':>10} {'change':>7}")
+    for item in results:
+        items = item.get("items")
+        per_item = format_metric("seconds", item["seconds"] / items) if items else "-"
+        recorded = (baseline or {}).get("results", {}).get(item["case"], {})
+        old = recorded.get("seconds")
+        change = f"{(item['seconds'] / old - 1) * 100:+.0f}%" if old else "-"
+        print(
+            f"{item['case']:<46} {format_metric('seconds', item['seconds']):>10} {per_item:>10} "
+            f"{format_metric('peak_kb', item.get('peak_kb')):>9} {format_metric('rss_kb', item.get('rss_kb')):>9} "
+            f"{format_metric('seconds', old):>10} {change:>7}"
+        )
+        if item.get("note"):
+            print(f"    {item['note']}")
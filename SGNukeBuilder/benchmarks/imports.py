@@ -0,0 +1,56 @@
+"""Import time of SGNukeBuilder.SGNukeBuilder, which Nuke's init.py pays at every launch.
+
+Each import runs in a fresh interpreter that only loaded the stubs, after
+the package was compiled, so neither bytecode compilation nor modules the
+benchmarks already imported are counted. The fastest import has to stay
+within IMPORT_BUDGET: python -m SGNukeBuilder.benchmarks exits with 1 when
+it doesn't, --check or not.
+
+    python -m SGNukeBuilder.benchmarks.imports    # prints the seconds of one import
+"""
+
+# Standard library imports
+import os
+import sys
+import time
+import importlib
+
+# The suite's own imports (subprocess, harness) are made in run(), so the
+# timed interpreter doesn't have them loaded already
+
+IMPORT_BUDGET = 0.03  # seconds
+REPEAT = 9  # interpreters, the fastest counts
+QUICK_REPEAT = 3
+
+
+def time_import():
+    """Seconds importing the pipeline module takes in this interpreter"""
+    from . import stubs
+
+    stubs.install()
+    started = time.perf_counter()
+    importlib.import_module(f"{stubs.PACKAGE}.SGNukeBuilder")
+    return time.perf_counter() - started
+
+
+def run(folder, quick=False):
+    import compileall
+    import subprocess
+    from .harness import result, isolated_env
+
+    package_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    compileall.compile_dir(package_dir, quiet=1)
+    cmd = [sys.executable, "-m", __name__]
+    times = []
+    for _ in range(QUICK_REPEAT if quick else REPEAT):
+        completed = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True,
+                                   env=isolated_env())
+        if completed.returncode:
+            raise RuntimeError(f"Importing the pipeline failed: {completed.stdout.strip()[-1000:]}")
+        times.append(float(completed.stdout.split()[-1]))
+    return [result("import_sgnukebuilder", min(times), budget=IMPORT_BUDGET,
+                   note=f"budget {IMPORT_BUDGET * 1e3:.0f} ms, slowest of {len(times)} {max(times) * 1e3:.1f} ms")]
+
+
+if __name__ == "__main__":
+    print(time_import())
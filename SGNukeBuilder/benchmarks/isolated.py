@@ -0,0 +1,26 @@
+"""Runs one benchmark function in a fresh interpreter, for harness.run_isolated.
+
+    python -m SGNukeBuilder.benchmarks.isolated models build '["tasktreemodel", "/tmp/tasks.json"]'
+"""
+
+# Standard library imports
+import sys
+import json
+import importlib
+
+# Local application imports
+from . import stubs
+from .harness import RESULT_MARKER
+
+
+def main(argv):
+    module_name, function_name = argv[:2]
+    args = json.loads(argv[2]) if len(argv) > 2 else []
+    stubs.install()
+    module = importlib.import_module(f".{module_name}", __package__)
+    print(RESULT_MARKER + json.dumps(getattr(module, function_name)(*args)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
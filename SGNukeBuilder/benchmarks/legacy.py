@@ -0,0 +1,224 @@
+"""Earlier implementations of the hot paths, kept to compare the current ones with.
+
+Copied from the commits that replaced them, without their progress prints.
+Importing this module imports the pipeline, so the stubs go in first.
+"""
+
+# Standard library imports
+import os
+import re
+
+# Local application imports
+from ..SGNukeBuilder import VERSION_INDEX, VERSION_REGEX
+from ..tracing import traced
+
+
+def build_tree_qstandarditem(tasks):
+    """The panel's build_tree before TaskTreeModel: every row as a QStandardItem, built up front"""
+    from PySide6.QtCore import Qt
+    from PySide6.QtGui import QStandardItem, QStandardItemModel
+
+    model = QStandardItemModel()
+    root = model.invisibleRootItem()
+
+    # Sort tasks by proj, seq then shot
+    tasks_sorted = sorted(
+        tasks,
+        key=lambda x: (
+            x["entity.Shot.project"]["name"],
+            x["entity.Shot.sg_sequence"]["name"],
+            x["entity.Shot.code"],
+            x["id"]
+        )
+    )
+
+    project_items = {}
+    for task in tasks_sorted:
+        proj = task["entity.Shot.project"]["name"].replace(' ', '')
+        seq = task["entity.Shot.sg_sequence"]["name"]
+        shot = task["entity.Shot.code"].split('_')[-1]
+        task_id = task["id"]
+        proj_id = task['entity.Shot.project.Project.id']
+        shot_id = task['entity.Shot.id']
+
+        # Build project level
+        if proj not in project_items:
+            project_item = QStandardItem(proj)
+            root.appendRow([project_item])
+            project_items[proj] = (project_item, {})
+
+        project_item, seq_items = project_items[proj]
+
+        # Build sequence level
+        if seq not in seq_items:
+            seq_item = QStandardItem(seq)
+            project_item.appendRow([seq_item])
+            seq_items[seq] = (seq_item, {})
+
+        seq_item, shot_items = seq_items[seq]
+
+        # Build shot level
+        if shot not in shot_items:
+            shot_item = QStandardItem(shot)
+            shot_item.setData(proj, Qt.UserRole)  # Store project
+            shot_item.setData(seq, Qt.UserRole + 1)  # Store sequence
+            shot_item.setData(shot, Qt.UserRole + 2)  # Store shot
+            shot_item.setData(task_id, Qt.UserRole + 3)  # Store task ID
+            shot_item.setData(proj_id, Qt.UserRole + 4)
+            shot_item.setData(shot_id, Qt.UserRole + 5)
+            seq_item.appendRow([shot_item])
+            shot_items[shot] = shot_item
+
+    return model
+
+
+def frame_range_listdir(input_images):
+    """create_comp's frame range before the sequences module: (first, last) or None"""
+    dir_path = os.path.dirname(input_images)
+    base_name = os.path.basename(input_images)
+
+    if os.path.exists(dir_path):
+        # Replace %04d with regex for 4 digits
+        pattern = re.sub(r'%04d', r'(\\d{4})', base_name)
+        regex = re.compile('^' + pattern + '$')
+        frames = []
+        for f in os.listdir(dir_path):
+            m = regex.match(f)
+            if m:
+                frames.append(int(m.group(1)))
+        if frames:
+            return min(frames), max(frames)
+    return None
+
+
+def scan_frame_stats(image_path):
+    """Return {frame: os.stat_result} for the files on disk matching a %04d image path"""
+    dir_path = os.path.dirname(image_path)
+    head, _, tail = os.path.basename(image_path).partition('%04d')
+    regex = re.compile('^' + re.escape(head) + r'(\d{4})' + re.escape(tail) + '$')
+
+    frames = {}
+    try:
+        with os.scandir(dir_path) as entries:
+            for entry in entries:
+                match = regex.match(entry.name)
+                if match:
+                    frames[int(match.group(1))] = entry.stat()
+    except FileNotFoundError:
+        pass
+    return frames
+
+
+class PipelineFileManager:
+    """The path manager before ShotContext, without its tree selection: every getter resolves again"""
+
+    def __init__(self, proj, seq, shot, base_path):
+        self.proj_path = base_path
+        self.version_index = VERSION_INDEX
+        self.proj = proj
+        self.seq = seq
+        self.shot = shot
+
+    def get_shot_dir(self):
+        if not all([self.proj, self.seq, self.shot]):
+            return None
+        return os.path.join(self.proj_path, self.proj, "shots", self.seq, self.shot.split('_')[-1])
+
+    @traced("filesystem")
+    def get_latest_version(self, folder_path):
+        versions = self.version_index.get_versions(folder_path)
+        if versions:
+            return f"v{versions[-1]:03d}"
+        return None
+
+    @traced("filesystem")
+    def get_next_version(self, folder_path):
+        latest = self.get_latest_version(folder_path)
+        if latest is None:
+            return "v001"
+        version_num = int(VERSION_REGEX.match(latest).group(1))
+        return f"v{version_num + 1:03d}"
+
+    def make_filename(self, task, version, extension=""):
+        if not all([self.proj, self.seq, self.shot]):
+            return None
+        base_name = f"{self.proj}_{self.seq}_{self.shot}_{task}_{version}"
+        if extension:
+            return f"{base_name}.{extension}"
+        return base_name
+
+    @traced("filesystem")
+    def get_source_video_path(self):
+        shot_dir = self.get_shot_dir()
+        if not shot_dir:
+            return None
+        source_dir = os.path.join(shot_dir, "source", "output")
+        latest_version = self.get_latest_version(source_dir)
+        if not latest_version:
+            return None
+        video_filename = self.make_filename("source", latest_version, "mov")
+        video_path = os.path.join(source_dir, latest_version, video_filename)
+        if os.path.exists(video_path):
+            return video_path
+        return None
+
+    @traced("filesystem")
+    def get_comp_input_path(self, for_nuke=False):
+        shot_dir = self.get_shot_dir()
+        if not shot_dir:
+            return None
+        source_dir = os.path.join(shot_dir, "source", "output")
+        source_version = self.get_latest_version(source_dir)
+        if not source_version:
+            return None
+        comp_input_dir = os.path.join(shot_dir, "comp", "input", source_version)
+        base_name = self.make_filename("source", source_version)
+        if for_nuke:
+            return os.path.join(comp_input_dir, f"{base_name}.####.exr")
+        return os.path.join(comp_input_dir, f"{base_name}.%04d.exr")
+
+    @traced("filesystem")
+    def get_comp_output_path(self, for_nuke=False):
+        shot_dir = self.get_shot_dir()
+        if not shot_dir:
+            return None
+        comp_output_dir = os.path.join(shot_dir, "comp", "output")
+        comp_work_dir = os.path.join(shot_dir, "comp", "work")
+        next_version = self.get_latest_version(comp_work_dir)
+        output_dir = os.path.join(comp_output_dir, next_version)
+        os.makedirs(output_dir, exist_ok=True)
+        base_name = self.make_filename("comp", next_version)
+        if for_nuke:
+            return os.path.join(output_dir, f"{base_name}.####.exr")
+        return os.path.join(output_dir, f"{base_name}.%04d.exr")
+
+    @traced("filesystem")
+    def get_nuke_script_path(self, new=False):
+        shot_dir = self.get_shot_dir()
+        if not shot_dir:
+            return None
+        work_dir = os.path.join(shot_dir, "comp", "work")
+        if new is False:
+            version = self.get_latest_version(work_dir) or 'v001'
+        else:
+            version = self.get_next_version(work_dir)
+        script_dir = os.path.join(work_dir, version)
+        if new:
+            os.makedirs(script_dir, exist_ok=True)
+            self.version_index.add_version(work_dir, version)
+        filename = self.make_filename("comp", version, "nknc")
+        return os.path.join(script_dir, filename)
+
+    @traced("filesystem")
+    def get_publish_video_path(self):
+        shot_dir = self.get_shot_dir()
+        if not shot_dir:
+            return None
+        comp_output_dir = os.path.join(shot_dir, "comp", "output")
+        latest_comp_version = self.get_latest_version(comp_output_dir)
+        if not latest_comp_version:
+            return None
+        publish_dir = os.path.join(shot_dir, "comp", "publish", latest_comp_version)
+        os.makedirs(publish_dir, exist_ok=True)
+        filename = self.make_filename("comp", latest_comp_version, "mov")
+        return os.path.join(publish_dir, filename)
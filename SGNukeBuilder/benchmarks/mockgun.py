@@ -0,0 +1,80 @@
+"""In-process ShotGrid stand-in with the Shotgun API, in the spirit of shotgun_api3's mockgun.
+
+Mockgun needs a schema dumped from a real site; this one answers from the
+sgstandin EntityStore instead, so the benchmarks run without a site, a
+schema or a network connection. Filters are translated the way
+shotgun_api3 sends them, so the store filters them exactly like the
+sgstandin server does.
+"""
+
+# Local application imports
+from ..sgstandin import EntityStore
+
+
+def translate_filters(filters, filter_operator="all"):
+    """Shotgun API filters -> the {"logical_operator", "conditions"} dict of the wire format"""
+    conditions = []
+    for item in filters:
+        if isinstance(item, dict):
+            conditions.append(translate_filters(item["filters"], item["filter_operator"]))
+            continue
+        path, relation, *values = item
+        if len(values) == 1 and isinstance(values[0], (list, tuple)):
+            values = list(values[0])
+        conditions.append({"path": path, "relation": relation, "values": values})
+    return {"logical_operator": "or" if filter_operator in ("any", "or") else "and", "conditions": conditions}
+
+
+class Shotgun:
+    """The Shotgun methods SGIO and ShotGridPool call, answered by an EntityStore"""
+
+    def __init__(self, store=None):
+        self.store = store if store is not None else EntityStore()
+        self.calls = 0
+
+    def find(self, entity_type, filters, fields=None, order=None, filter_operator=None, limit=0, page=0):
+        self.calls += 1
+        params = {
+            "type": entity_type,
+            "filters": translate_filters(filters, filter_operator or "all"),
+            "return_fields": fields or ["id"],
+            "sorts": [{"field_name": o["field_name"], "direction": o.get("direction", "asc")} for o in order or []],
+            "paging": {"entities_per_page": limit or len(self.store.entities.get(entity_type, ())) or 1,
+                       "current_page": page or 1},
+        }
+        return self.store.read(params)["entities"]
+
+    def find_one(self, entity_type, filters, fields=None, order=None, filter_operator=None):
+        found = self.find(entity_type, filters, fields, order, filter_operator, limit=1)
+        return found[0] if found else None
+
+    def create(self, entity_type, data, return_fields=None):
+        self.calls += 1
+        return self.store.create({
+            "type": entity_type, "fields": [{"field_name": k, "value": v} for k, v in data.items()],
+            "return_fields": return_fields,
+        })
+
+    def update(self, entity_type, entity_id, data):
+        self.calls += 1
+        return self.store.update({
+            "type": entity_type, "id": entity_id, "fields": [{"field_name": k, "value": v} for k, v in data.items()],
+        })
+
+    def delete(self, entity_type, entity_id):
+        self.calls += 1
+        return self.store.delete({"type": entity_type, "id": entity_id})
+
+    def batch(self, requests):
+        self.calls += 1
+        calls = []
+        for request in requests:
+            call = {"request_type": request["request_type"], "type": request["entity_type"],
+                    "fields": [{"field_name": k, "value": v} for k, v in request.get("data", {}).items()]}
+            if "entity_id" in request:
+                call["id"] = request["entity_id"]
+            calls.append(call)
+        return self.store.batch(calls)
+
+    def close(self):
+        pass
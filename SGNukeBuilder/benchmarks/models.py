@@ -0,0 +1,76 @@
+"""TaskTreeModel against the QStandardItemModel build_tree it replaced, at 1k, 10k and 50k tasks.
+
+Every build runs in a fresh interpreter, so rss is what that process grew
+by while building, Qt's items included. tasktreemodel is what the panel
+does when the tasks arrive; tasktreemodel_expanded also creates every
+row, like a view with everything expanded, which the old model always
+did. Needs PySide6.
+"""
+
+# Standard library imports
+import gc
+import os
+import json
+import time
+import importlib.util
+
+# Local application imports
+from ..SGNukeBuilder import SGIO
+from .harness import run_isolated, rss_kb, result, quiet
+from .projects import make_site, fetch_tasks, size_for
+
+SIZES = (1000, 10000, 50000)
+QUICK_SIZES = (1000,)
+IMPLEMENTATIONS = ("qstandarditemmodel", "tasktreemodel", "tasktreemodel_expanded")
+REPEAT = 3  # processes per case, the fastest counts
+
+
+def builder(implementation):
+    from ..ui import TaskTreeModel
+    from .legacy import build_tree_qstandarditem
+    from .tree import expand_all
+
+    return {
+        "qstandarditemmodel": build_tree_qstandarditem,
+        "tasktreemodel": TaskTreeModel,
+        "tasktreemodel_expanded": lambda tasks: expand_all(TaskTreeModel(tasks)),
+    }[implementation]
+
+
+def build(implementation, tasks_path):
+    """Build one model in this process, run through harness.run_isolated"""
+    with open(tasks_path, "r", encoding="utf-8") as f:
+        tasks = json.load(f)
+    build_model = builder(implementation)
+    # Qt's one-time setup isn't part of the build
+    build_model(tasks[:10])
+    gc.collect()
+
+    before = rss_kb()
+    started = time.perf_counter()
+    model = build_model(tasks)
+    seconds = time.perf_counter() - started
+    after = rss_kb()
+    del model
+    return result(f"{implementation}[{len(tasks)}]", seconds, len(tasks),
+                  rss_kb=after - before if before is not None else None)
+
+
+def run(folder, quick=False):
+    if importlib.util.find_spec("PySide6") is None:
+        print("models skipped: PySide6 isn't installed")
+        return []
+
+    results = []
+    for size in QUICK_SIZES if quick else SIZES:
+        sg, user_id = make_site(*size_for(size))
+        tasks_path = os.path.join(folder, f"tasks_{size}.json")
+        with open(tasks_path, "w", encoding="utf-8") as f:
+            json.dump(quiet(lambda: fetch_tasks(SGIO(sg_api=sg, user_id=user_id)))(), f)
+        for implementation in IMPLEMENTATIONS:
+            runs = [run_isolated("models", "build", implementation, tasks_path) for _ in range(REPEAT)]
+            best = min(runs, key=lambda item: item["seconds"])
+            best["rss_kb"] = min((item["rss_kb"] for item in runs if item["rss_kb"] is not None), default=None)
+            best["case"] = f"{implementation}[{size}]"
+            results.append(best)
+    return results
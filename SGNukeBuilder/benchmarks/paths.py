@@ -0,0 +1,79 @@
+"""Path resolution: a ShotContext per shot of a synthetic project tree.
+
+resolve_cold starts without cached version folders, like the first
+selection of every shot after opening the panel; resolve_warm is a
+reselection. lookups are the paths Build/Open Comp asks a context for.
+select_shotcontext builds a context and asks it those paths, against
+select_per_call doing the same with the old PipelineFileManager, which
+looks the versions up again for every path and makes the output and
+publish folders it names; it runs once first, so both see the same tree.
+"""
+
+# Standard library imports
+import os
+
+# Local application imports
+from ..SGNukeBuilder import ShotContext, VERSION_INDEX
+from .harness import measure, quiet
+from .legacy import PipelineFileManager
+from .projects import make_project_tree
+
+SIZE = (2, 10, 50)  # projects, sequences, shots per sequence
+QUICK_SIZE = (1, 5, 20)
+VERSIONS = 3
+
+
+def selection_paths(context):
+    """The paths the panel resolves when a shot is selected and its comp opened or built"""
+    return (
+        context.get_source_video_path(),
+        context.get_comp_input_path(for_nuke=False),
+        context.get_nuke_script_path(new=False),
+        context.get_comp_output_path(for_nuke=True, next_version=True),
+        context.get_publish_video_path(),
+    )
+
+
+def selection_paths_per_call(manager):
+    """selection_paths with the old PipelineFileManager, whose output path had no next_version"""
+    return (
+        manager.get_source_video_path(),
+        manager.get_comp_input_path(for_nuke=False),
+        manager.get_nuke_script_path(new=False),
+        manager.get_comp_output_path(for_nuke=True),
+        manager.get_publish_video_path(),
+    )
+
+
+def run(folder, quick=False):
+    root = os.path.join(folder, "paths")
+    names = make_project_tree(root, *(QUICK_SIZE if quick else SIZE), versions=VERSIONS)
+
+    def resolve_all():
+        return [ShotContext(proj, seq, shot, root) for proj, seq, shot in names]
+
+    contexts = resolve_all()
+
+    def lookup_all():
+        for context in contexts:
+            selection_paths(context)
+
+    def select_shotcontext():
+        for proj, seq, shot in names:
+            selection_paths(ShotContext(proj, seq, shot, root))
+
+    def select_per_call():
+        for proj, seq, shot in names:
+            selection_paths_per_call(PipelineFileManager(proj, seq, shot, root))
+
+    shots = len(names)
+    results = [
+        measure(f"resolve_cold[{shots}]", resolve_all, setup=VERSION_INDEX.invalidate, items=shots),
+        measure(f"resolve_warm[{shots}]", resolve_all, items=shots),
+        measure(f"lookups[{shots}]", quiet(lookup_all), items=shots),
+    ]
+    select_per_call()
+    return results + [
+        measure(f"select_shotcontext[{shots}]", quiet(select_shotcontext), items=shots),
+        measure(f"select_per_call[{shots}]", quiet(select_per_call), items=shots),
+    ]
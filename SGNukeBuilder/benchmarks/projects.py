@@ -0,0 +1,95 @@
+"""Synthetic projects: ShotGrid tasks and shot folders of N projects x sequences x shots x versions.
+
+Names follow sgstandin's seed (SEQ010, shot 0010...) and the folder layout
+ShotContext resolves, so the pipeline code finds everything where it would
+on a real project.
+"""
+
+# Standard library imports
+import os
+
+# Local application imports
+from ..SGNukeBuilder import ExtractionManifest, FIRST_FRAME
+from ..sgstandin import EntityStore, STATUSES
+from .mockgun import Shotgun
+
+FRAME_BYTES = 512  # stand-in frames only need a size, nothing reads the pixels
+
+
+def size_for(tasks, projects=2, sequences=10):
+    """(projects, sequences, shots per sequence) giving about this many comp tasks"""
+    return projects, sequences, max(1, round(tasks / (projects * sequences)))
+
+
+def make_site(projects, sequences, shots, seed=1):
+    """A mockgun Shotgun seeded with one artist assigned to every comp task, returns (sg, user id)"""
+    store = EntityStore()
+    user_ids = store.seed(artists=1, projects=projects, sequences=sequences, shots=shots, seed=seed)
+    return Shotgun(store), user_ids[0]
+
+
+def fetch_tasks(sgio):
+    """The artist's comp tasks, whatever their status, as the panel gets them"""
+    sgio.can_work_on = list(STATUSES)
+    return sgio.get_tasks()
+
+
+def shot_names(projects, sequences, shots):
+    """(project, sequence, shot) names, in the same order and naming as sgstandin's seed"""
+    return [
+        (f"LoadTest{p:02d}", f"SEQ{s * 10:03d}", f"{n * 10:04d}")
+        for p in range(1, projects + 1)
+        for s in range(1, sequences + 1)
+        for n in range(1, shots + 1)
+    ]
+
+
+def make_project_tree(root, projects, sequences, shots, versions=3, frames=0, manifest=True):
+    """Shot folders under root, returns their (project, sequence, shot) names.
+
+    Every shot gets `versions` source movies, work scripts and render
+    folders; with frames, the latest source version also gets an extracted
+    plate of that many frames (with its extraction manifest unless
+    manifest=False) and the latest work version as many rendered frames.
+    """
+    names = shot_names(projects, sequences, shots)
+    for proj, seq, shot in names:
+        shot_dir = os.path.join(root, proj, "shots", seq, shot)
+        for number in range(1, versions + 1):
+            version = f"v{number:03d}"
+            prefix = f"{proj}_{seq}_{shot}"
+            source = os.path.join(shot_dir, "source", "output", version, f"{prefix}_source_{version}.mov")
+            touch(source)
+            touch(os.path.join(shot_dir, "comp", "work", version, f"{prefix}_comp_{version}.nknc"))
+            if not frames or number < versions:
+                continue
+            plate = os.path.join(shot_dir, "comp", "input", version, f"{prefix}_source_{version}.%04d.exr")
+            write_frames(plate, frames)
+            if manifest:
+                write_manifest(plate, source, frames)
+            write_frames(os.path.join(shot_dir, "comp", "output", version, f"{prefix}_comp_{version}.%04d.exr"), frames)
+    return names
+
+
+def touch(path, size=FRAME_BYTES):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(b"\0" * size)
+
+
+def write_frames(image_path, count, first_frame=FIRST_FRAME):
+    """`count` frames of a printf style image path"""
+    os.makedirs(os.path.dirname(image_path), exist_ok=True)
+    data = b"\0" * FRAME_BYTES
+    for frame in range(first_frame, first_frame + count):
+        with open(image_path % frame, "wb") as f:
+            f.write(data)
+
+
+def write_manifest(image_path, source_path, count):
+    """A complete extraction manifest for frames written by write_frames"""
+    manifest = ExtractionManifest.for_source(image_path, source_path, count)
+    manifest.frames = {frame: FRAME_BYTES for frame in range(FIRST_FRAME, FIRST_FRAME + count)}
+    manifest.complete = True
+    manifest.save()
+    return manifest
@@ -0,0 +1,57 @@
+"""Image sequence scanning: the sequences module against the listdir and regex loops it replaced.
+
+Two folders: one 10k frame render, and a plate folder with three
+interleaved 10k frame sequences (beauty, matte and a png proxy), where
+find_sequence(use_cache=False) only stats the files of the one it looks
+for. The legacy cases are create_comp's old listdir range lookup, without
+sizes, and the old scan_frame_stats.
+"""
+
+# Standard library imports
+import os
+import time
+
+# Local application imports
+from ..sequences import scan_directory, find_sequence, invalidate
+from .harness import measure
+from .legacy import frame_range_listdir, scan_frame_stats
+from .projects import write_frames
+
+FRAMES = 10000
+QUICK_FRAMES = 2000
+# Sequences of each folder, the first is the one looked up
+FOLDERS = {
+    "single": ("render.%04d.exr",),
+    "interleaved": ("plate.%04d.exr", "plate_matte.%04d.exr", "plate_proxy.%04d.png"),
+}
+
+
+def make_folder(folder, names, frames):
+    os.makedirs(folder, exist_ok=True)
+    for name in names:
+        write_frames(os.path.join(folder, name), frames)
+    # Folders changed in the last seconds aren't cached, as if frames were still being written
+    settled = time.time() - 60
+    os.utime(folder, (settled, settled))
+    return os.path.join(folder, names[0])
+
+
+def run(folder, quick=False):
+    frames = QUICK_FRAMES if quick else FRAMES
+    results = []
+    for kind, names in FOLDERS.items():
+        image_path = make_folder(os.path.join(folder, "scan", kind), names, frames)
+        dir_path = os.path.dirname(image_path)
+        files = frames * len(names)
+        label = f"{kind} {len(names)}x{frames}"
+        results += [
+            measure(f"scan_directory[{label}]", lambda: scan_directory(dir_path, use_cache=False), items=files),
+            measure(f"find_sequence_uncached[{label}]", lambda: find_sequence(image_path, use_cache=False),
+                    items=frames),
+            measure(f"find_sequence_cached[{label}]", lambda: find_sequence(image_path),
+                    setup=lambda: find_sequence(image_path), items=frames),
+            measure(f"legacy_listdir_range[{label}]", lambda: frame_range_listdir(image_path), items=frames),
+            measure(f"legacy_scan_frame_stats[{label}]", lambda: scan_frame_stats(image_path), items=frames),
+        ]
+        invalidate(dir_path)
+    return results
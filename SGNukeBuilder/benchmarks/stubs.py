@@ -0,0 +1,221 @@
+"""Stand-ins for what the benchmarks can't have outside Nuke: config.py and the nuke module.
+
+install() has to run before any SGNukeBuilder module is imported, they read
+their settings from config.py when they are loaded.
+"""
+
+# Standard library imports
+import os
+import sys
+import types
+import atexit
+import shutil
+import tempfile
+import importlib
+
+PACKAGE = __package__.rpartition('.')[0]
+
+# Settings of the stub config.py; background features are off so nothing runs behind a benchmark
+CONFIG = {
+    "SERVER_PATH": "http://localhost:0",
+    "LOGIN": "benchmark",
+    "PASSWORD": "benchmark",
+    "TRACE": False,
+    "SYNC_EVENTS": False,
+    "WATCH_FILES": False,
+    "PREFETCH_PLATES": False,
+    "STREAMING_PUBLISH": False,
+    "PARALLEL_RENDER": False,
+}
+
+
+def install(folder=None, **settings):
+    """Install the stub config and nuke modules, returns the folder projects and caches go in.
+
+    Without a folder a temporary one is made and removed at exit. Keyword
+    arguments override or add config settings.
+    """
+    if folder is None:
+        folder = tempfile.mkdtemp(prefix="sgnb_bench_")
+        atexit.register(shutil.rmtree, folder, True)
+    install_config(folder, **settings)
+    install_nuke()
+    return folder
+
+
+def install_config(folder, **settings):
+    config = types.ModuleType(f"{PACKAGE}.config")
+    config.__dict__.update(CONFIG)
+    config.PROJECT_FOLDER_LOCATION = os.path.join(folder, "projects")
+    config.CACHE_FOLDER_LOCATION = os.path.join(folder, "cache")
+    config.TRACE_FOLDER = os.path.join(folder, "traces")
+    config.__dict__.update(settings)
+    os.makedirs(config.PROJECT_FOLDER_LOCATION, exist_ok=True)
+    sys.modules[config.__name__] = config
+    setattr(importlib.import_module(PACKAGE), "config", config)
+    return config
+
+
+def install_nuke():
+    module = types.ModuleType("nuke")
+    module.__dict__.update(FakeNuke().functions())
+    sys.modules["nuke"] = module
+    return module
+
+
+class Knob:
+    __slots__ = ('_value',)
+
+    def __init__(self, value=None):
+        self._value = value
+
+    def value(self):
+        return self._value
+
+    getValue = value
+
+    def setValue(self, value):
+        self._value = value
+        return True
+
+
+class Node:
+    """A node with any knob, knobs are created on first use"""
+
+    def __init__(self, node_class, name, **knobs):
+        self._class = node_class
+        self._name = name
+        self._knobs = {key: Knob(value) for key, value in knobs.items()}
+        self._inputs = {}
+
+    def __getitem__(self, key):
+        knob = self._knobs.get(key)
+        if knob is None:
+            knob = self._knobs[key] = Knob()
+        return knob
+
+    def knobs(self):
+        return dict(self._knobs)
+
+    def Class(self):
+        return self._class
+
+    def name(self):
+        return self._name
+
+    def setName(self, name):
+        self._name = name
+
+    def setInput(self, index, node):
+        self._inputs[index] = node
+        return True
+
+    def input(self, index):
+        return self._inputs.get(index)
+
+
+class Root(Node):
+    """The root node is named after the saved script, 'Root' before it was saved"""
+
+    def __init__(self):
+        super().__init__("Root", "Root", first_frame=1, last_frame=100)
+        self.path = None
+
+    def name(self):
+        return self.path or "Root"
+
+    def modified(self):
+        return False
+
+
+class FakeNuke:
+    """The parts of the nuke module NukeHandler uses, over an in-memory node graph.
+
+    Saving writes a plain text .nk script with the root frame range and the
+    nodes' knobs, enough for read_script_info to parse it back. Renders
+    write nothing, they only call the after frame render callbacks.
+    """
+
+    def __init__(self):
+        self.graph = []
+        self.root_node = Root()
+        self.this_node = None
+        self.current_frame = 1
+        self.after_frame = []
+        self.formats = []
+
+    def functions(self):
+        return {
+            "nodes": types.SimpleNamespace(**{
+                node_class: self.node_factory(node_class) for node_class in ("Read", "Write", "CurveTool")
+            }),
+            "root": lambda: self.root_node,
+            "allNodes": self.all_nodes,
+            "toNode": self.to_node,
+            "thisNode": lambda: self.this_node,
+            "frame": lambda: self.current_frame,
+            "addFormat": self.formats.append,
+            "scriptSaveAs": self.script_save_as,
+            "scriptSave": self.script_save,
+            "scriptOpen": self.script_open,
+            "scriptClear": self.script_clear,
+            "execute": self.execute,
+            "executeMultiple": self.execute_multiple,
+            "addAfterFrameRender": lambda callback, nodeClass=None: self.after_frame.append(callback),
+            "removeAfterFrameRender": lambda callback, nodeClass=None: self.after_frame.remove(callback),
+        }
+
+    def script_clear(self):
+        self.graph = []
+        self.root_node = Root()
+
+    def script_open(self, path):
+        self.script_clear()
+        self.root_node.path = path
+
+    def node_factory(self, node_class):
+        def create(**knobs):
+            count = sum(1 for node in self.graph if node.Class() == node_class)
+            node = Node(node_class, f"{node_class}{count + 1}", **knobs)
+            self.graph.append(node)
+            return node
+        return create
+
+    def all_nodes(self, node_class=None):
+        return [node for node in self.graph if node_class is None or node.Class() == node_class]
+
+    def to_node(self, name):
+        return next((node for node in self.graph if node.name() == name), None)
+
+    def execute(self, node, first, last, increment=1):
+        self.this_node = node
+        for frame in range(first, last + 1, increment):
+            self.current_frame = frame
+            for callback in list(self.after_frame):
+                callback()
+        return True
+
+    def execute_multiple(self, nodes, ranges, *args):
+        for node in nodes:
+            for frame_range in ranges:
+                self.execute(node, *frame_range)
+
+    def script_save(self, path=None):
+        self.script_save_as(path or self.root_node.path)
+
+    def script_save_as(self, path):
+        self.root_node.path = path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        lines = []
+        for node in [self.root_node] + self.graph:
+            lines.append(f"{node.Class()} {{")
+            for key, knob in node.knobs().items():
+                value = knob.value()
+                if isinstance(value, str):
+                    value = f'"{value}"'
+                lines.append(f" {key} {value}")
+            if node is not self.root_node:
+                lines.append(f" name {node.name()}")
+            lines.append("}")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
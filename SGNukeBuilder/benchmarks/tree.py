@@ -0,0 +1,51 @@
+"""build_tree: the panel's task tree over the artist's tasks from the mockgun stand-in.
+
+build_tree is what the panel does when the tasks arrive; expand_tree also
+creates every row and reads its text, like a view with everything
+expanded. Needs PySide6.
+"""
+
+# Local application imports
+from ..SGNukeBuilder import SGIO
+from .harness import measure, quiet
+from .projects import make_site, fetch_tasks, size_for
+
+SIZES = (1000, 10000)
+QUICK_SIZES = (1000,)
+
+
+def expand_all(model):
+    """Fetch and read every row of a model, returns the number of rows"""
+    from PySide6.QtCore import QModelIndex
+
+    rows = 0
+    pending = [QModelIndex()]
+    while pending:
+        parent = pending.pop()
+        while model.canFetchMore(parent):
+            model.fetchMore(parent)
+        for row in range(model.rowCount(parent)):
+            index = model.index(row, 0, parent)
+            model.data(index)
+            rows += 1
+            if model.hasChildren(index):
+                pending.append(index)
+    return rows
+
+
+def run(folder, quick=False):
+    try:
+        from ..ui import TaskTreeModel
+    except ImportError as e:
+        print(f"tree skipped: {e}")
+        return []
+
+    results = []
+    for size in QUICK_SIZES if quick else SIZES:
+        sg, user_id = make_site(*size_for(size))
+        tasks = quiet(lambda: fetch_tasks(SGIO(sg_api=sg, user_id=user_id)))()
+        results.append(measure(f"build_tree[{size}]", lambda: TaskTreeModel(tasks), items=len(tasks)))
+        results.append(measure(
+            f"expand_tree[{size}]", lambda: expand_all(TaskTreeModel(tasks)), repeat=3, items=len(tasks)
+        ))
+    return results
@@ -0,0 +1,224 @@
+"""Headless render and publish for SGNukeBuilder.
+
+Renders, encodes and publishes the latest comp of many shots without the
+panel, e.g. for overnight batch publishes on render nodes:
+
+    python -m SGNukeBuilder.cli --workers 4
+    python -m SGNukeBuilder.cli MyProject/SEQ010/0010 MyProject/SEQ010/0020 --dry-run
+    nuke -t SGNukeBuilder/cli.py --workers 1 MyProject/SEQ010/0010
+
+Shots are picked from the user's comp tasks (USER_ID or --user-id), either
+all of them or the ones named as project/sequence/shot. Every shot is
+handled in its own worker process with its own ShotGrid connection.
+"""
+
+# Standard library imports
+import os
+import sys
+import argparse
+import importlib
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+
+if __package__ in (None, ""):
+    # Run as a script, e.g. `nuke -t SGNukeBuilder/cli.py`
+    package_dir = os.path.dirname(os.path.abspath(__file__))
+    # Without the script's own folder on the path, SGNukeBuilder is the package and not SGNukeBuilder.py
+    sys.path[:] = [path for path in sys.path if os.path.abspath(path or os.curdir) != package_dir]
+    sys.path.insert(0, os.path.dirname(package_dir))
+    importlib.import_module("SGNukeBuilder")
+    __package__ = "SGNukeBuilder"
+
+# Local application imports
+from .SGNukeBuilder import (
+    SGIO, NukeHandler, ShotContext, TaskRecord, RenderCache,
+    scan_frames, read_script_info, RENDER_CACHE, INCREMENTAL_RENDER
+)
+from .sequences import find_sequence
+from . import tracing
+from .tracing import process_span, traced
+
+
+def select_shots(sgio, shot_names, statuses=None):
+    """TaskRecords of the user's tasks, limited to project/sequence/shot names when given"""
+    if statuses:
+        sgio.can_work_on = statuses
+    records = sorted((TaskRecord.from_task(task) for task in sgio.get_tasks()), key=TaskRecord.sort_key)
+
+    # One task per shot, like the tree
+    by_shot = {}
+    for record in records:
+        by_shot.setdefault(f"{record.proj}/{record.seq}/{record.shot}", record)
+
+    if not shot_names:
+        return list(by_shot.values())
+
+    selected = []
+    for name in shot_names:
+        record = by_shot.get(name.strip('/'))
+        if record is None:
+            print(f"No comp task found for {name}")
+        else:
+            selected.append(record)
+    return selected
+
+
+def comp_frame_range(script_path, context):
+    """(first, last) frame of a comp, None if unknown.
+
+    Read from the saved script; .nknc scripts can't be read outside Nuke, for
+    those it's the range of the extracted plate, which Build Comp set the
+    comp to.
+    """
+    info = read_script_info(script_path)
+    if info["first_frame"] is not None:
+        return info["first_frame"], info["last_frame"]
+    plate = context.paths["comp_input"] and find_sequence(context.paths["comp_input"])
+    return (plate.first_frame, plate.last_frame) if plate else None
+
+
+def plan_shot(record):
+    """Resolve the paths and commands publishing one shot would use"""
+    context = ShotContext.for_record(record)
+    script_path = context.get_nuke_script_path(new=False)
+    plan = {
+        "shot": f"{record.proj}/{record.seq}/{record.shot}",
+        "task_id": record.task_id,
+        "script": script_path,
+        "script_exists": os.path.exists(script_path),
+        "output": None,
+        "movie": None,
+        "frame_range": None,
+        "render_cmd": None,
+    }
+    if not plan["script_exists"]:
+        return plan
+
+    plan["output"] = context.paths["comp_output"]
+    plan["movie"] = context.paths["publish_video"]
+    plan["frame_range"] = comp_frame_range(script_path, context)
+    plan["render_cmd"] = NukeHandler().render_command(script_path)
+    return plan
+
+
+@traced("shot")
+def publish_shot(record, skip_render=False, user_id=None, trace_path=None):
+    """Render, encode and publish one shot, returns (shot, message, success)"""
+    if trace_path and not tracing.enabled():
+        # Worker processes that didn't inherit the parent's trace file
+        tracing.enable(trace_path)
+    plan = plan_shot(record)
+    shot = plan["shot"]
+    if not plan["script_exists"]:
+        return shot, f"no comp script at {plan['script']}", False
+
+    use_cache = RENDER_CACHE and not skip_render
+    incremental = INCREMENTAL_RENDER and not skip_render
+    if (use_cache or incremental) and plan["script"].endswith(".nknc"):
+        # Non-commercial scripts are encrypted, their frame range and Read nodes can't be read without Nuke
+        print(f"[{shot}] Render cache and incremental render skipped for {os.path.basename(plan['script'])}, "
+              f".nknc scripts can't be read outside Nuke; rendering all frames")
+        use_cache = incremental = False
+
+    cache = RenderCache.from_script(plan["script"], plan["output"]) if use_cache else None
+    if cache is not None and cache.check():
+        skip_render = True
+        cache = None
+
+    render_cmd = plan["render_cmd"]
+    info = read_script_info(plan["script"]) if incremental else None
+    if info and info["first_frame"] is not None and info["read_files"]:
+        nuke_handler = NukeHandler()
+        ranges, _ = nuke_handler.incremental_ranges(
+            plan["script"], plan["output"], info["first_frame"], info["last_frame"], info["read_files"]
+        )
+        skip_render = not ranges
+        render_cmd = nuke_handler.render_command(plan["script"], ranges=ranges)
+
+    if not skip_render:
+        print(f"[{shot}] Rendering {plan['script']}")
+        with process_span(render_cmd, shot=shot) as process_trace:
+            result = subprocess.run(render_cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+            process_trace.set(returncode=result.returncode)
+        if result.returncode != 0:
+            return shot, f"render failed: {result.stdout.strip()[-500:]}", False
+    if cache is not None:
+        cache.store()
+
+    if not scan_frames(plan["output"]):
+        return shot, f"no rendered frames at {plan['output']}", False
+
+    sgio = SGIO(user_id=user_id)
+    if plan["frame_range"] is None:
+        print(f"[{shot}] Comp frame range unknown, encoding the frames on disk")
+    video_file = sgio.images_to_video(plan["output"], plan["movie"], frame_range=plan["frame_range"])
+    if not video_file:
+        return shot, "encode failed", False
+
+    # Make name
+    version = os.path.splitext(os.path.basename(video_file))[0][-4:]
+    published = sgio.publish_video(video_file, version, record.proj_id, record.shot_id, record.task_id)
+    if not published:
+        return shot, "publish failed", False
+    return shot, f"published Version {published['id']}", True
+
+
+def print_plan(plans):
+    for plan in plans:
+        print(plan["shot"])
+        print(f"  task:   {plan['task_id']}")
+        print(f"  script: {plan['script']}{'' if plan['script_exists'] else '  (missing, skipped)'}")
+        if plan["script_exists"]:
+            print(f"  render: {subprocess.list2cmdline(plan['render_cmd'])}")
+            print(f"  output: {plan['output']}")
+            if plan["frame_range"]:
+                print(f"  frames: {plan['frame_range'][0]}-{plan['frame_range'][1]}")
+            print(f"  movie:  {plan['movie']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render and publish comps to ShotGrid without the panel.")
+    parser.add_argument("shots", nargs="*", help="project/sequence/shot to publish, default all assigned comp tasks")
+    parser.add_argument("--user-id", type=int, help="ShotGrid HumanUser id, default the USER_ID environment variable")
+    parser.add_argument("--status", nargs="+", help="only tasks with these status codes")
+    parser.add_argument("--workers", type=int, default=2, help="shots processed in parallel")
+    parser.add_argument("--skip-render", action="store_true", help="publish the frames already on disk")
+    parser.add_argument("--dry-run", action="store_true", help="only print the resolved plan")
+    parser.add_argument("--trace", action="store_true", help="record timings and print a summary at the end")
+    args = parser.parse_args(argv)
+
+    if args.trace and not tracing.enabled():
+        tracing.enable()
+    trace_path = tracing.trace_path()
+
+    records = select_shots(SGIO(user_id=args.user_id), args.shots, args.status)
+    if not records:
+        print("Nothing to publish.")
+        return 1 if args.shots else 0
+
+    if args.dry_run:
+        print_plan([plan_shot(record) for record in records])
+        return 0
+
+    workers = max(1, min(args.workers, len(records)))
+    if workers == 1:
+        results = [publish_shot(record, args.skip_render, args.user_id) for record in records]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(
+                publish_shot, records, [args.skip_render] * len(records), [args.user_id] * len(records),
+                [trace_path] * len(records)
+            ))
+
+    failed = 0
+    for shot, message, success in results:
+        print(f"{'OK  ' if success else 'FAIL'} {shot}: {message}")
+        failed += not success
+    print(f"{len(results) - failed} published, {failed} failed")
+    if trace_path:
+        tracing.print_summary(tracing.load([trace_path]))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
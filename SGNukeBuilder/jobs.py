@@ -0,0 +1,292 @@
+"""Background jobs for SGNukeBuilder.
+
+Conversions, renders, uploads and ShotGrid updates run as Jobs on a
+JobScheduler instead of blocking the panel. Jobs can depend on each other
+(extract -> build, render -> encode -> upload), each job
+holds one resource slot (e.g. 2 ffmpeg processes, 1 upload at a time) and
+child processes started through Job.run_process are killed on cancel.
+Low priority jobs run their child processes at idle CPU and disk priority.
+"""
+
+# Standard library imports
+import os
+import sys
+import shutil
+import itertools
+import threading
+import subprocess
+
+# Local application imports
+from . import config
+from .tracing import span, process_span
+try:
+    import nuke
+except ImportError:  # plain Python, e.g. the headless command line
+    nuke = None
+
+
+RESOURCE_LIMITS = {
+    "ffmpeg": 2,
+    "render": 1,
+    "upload": 1,
+    "shotgrid": 1,
+    "prefetch": 1,
+    "default": 4,
+}
+RESOURCE_LIMITS.update(getattr(config, "JOB_RESOURCE_LIMITS", {}))
+
+PENDING = 'pending'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+FINISHED_STATES = (DONE, FAILED, CANCELLED)
+
+LOW_PRIORITY_NICE = 19
+
+
+class JobCancelled(Exception):
+    pass
+
+
+def in_main_thread(fn, *args, **kwargs):
+    """Call fn on Nuke's main thread and return its result; nodes and renders must run there"""
+    if threading.current_thread() is threading.main_thread():
+        return fn(*args, **kwargs)
+    return nuke.executeInMainThreadWithResult(fn, args=args, kwargs=kwargs)
+
+
+def low_priority_command(cmd):
+    """cmd and extra Popen arguments running it at idle CPU and disk priority, where the platform allows"""
+    if sys.platform == "win32":
+        return cmd, {"creationflags": subprocess.IDLE_PRIORITY_CLASS}
+    prefix = []
+    if shutil.which("ionice"):
+        prefix += ["ionice", "-c", "3"]
+    if shutil.which("nice"):
+        prefix += ["nice", "-n", str(LOW_PRIORITY_NICE)]
+    return prefix + list(cmd), {}
+
+
+class Job:
+    """A unit of background work; fn is called with the job and its return value kept as result"""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, name, fn, resource="default", depends_on=(), low_priority=False):
+        self.id = next(self._ids)
+        self.name = name
+        self.fn = fn
+        self.resource = resource
+        self.depends_on = list(depends_on)
+        self.low_priority = low_priority  # child processes yield the CPU and disk to everything else
+        self.state = PENDING
+        self.progress = None  # 0.0 - 1.0, None while unknown
+        self.total_frames = None  # set to report progress from ffmpeg frame counts
+        self.result = None
+        self.error = None
+        self.scheduler = None
+
+        self._lock = threading.Lock()
+        self._cancel_event = threading.Event()
+        self._processes = {}  # running child process -> frames done
+        self._finished_frames = 0
+
+    def __repr__(self):
+        return f"<Job {self.id} {self.name!r} {self.state}>"
+
+    @property
+    def cancelled(self):
+        return self._cancel_event.is_set()
+
+    def cancel(self):
+        """Request cancellation and kill any child process the job started"""
+        self._cancel_event.set()
+        with self._lock:
+            processes = list(self._processes)
+        for process in processes:
+            if process.poll() is None:
+                process.kill()
+
+    def check_cancelled(self):
+        if self.cancelled:
+            raise JobCancelled(self.name)
+
+    def set_progress(self, progress):
+        progress = None if progress is None else max(0.0, min(1.0, progress))
+        changed = progress is None or self.progress is None or abs(progress - self.progress) >= 0.01
+        self.progress = progress
+        if changed and self.scheduler is not None:
+            self.scheduler.notify(self)
+
+    def run_process(self, cmd, check=False, on_line=None):
+        """Run a child process for this job, parsing ffmpeg -progress output into job progress.
+
+        on_line, if given, is called with every line the process writes to
+        stdout. Returns a subprocess.CompletedProcess with stderr captured,
+        raises JobCancelled if the job was cancelled while it ran.
+        """
+        self.check_cancelled()
+        cmd = list(cmd)
+        if os.path.basename(cmd[0]).startswith("ffmpeg"):
+            cmd[1:1] = ["-progress", "pipe:1", "-nostats"]
+        popen_kwargs = {}
+        if self.low_priority:
+            cmd, popen_kwargs = low_priority_command(cmd)
+
+        with process_span(cmd, job=self.name) as process_trace:
+            process = subprocess.Popen(
+                cmd, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True,
+                **popen_kwargs
+            )
+            with self._lock:
+                self._processes[process] = 0
+            if self.cancelled:
+                process.kill()
+
+            # Read stderr on a side thread so a chatty process can't fill the pipe and stall
+            stderr_chunks = []
+            stderr_reader = threading.Thread(
+                target=lambda: stderr_chunks.append(process.stderr.read()), daemon=True
+            )
+            stderr_reader.start()
+
+            for line in process.stdout:
+                if on_line is not None:
+                    on_line(line)
+                key, _, value = line.strip().partition("=")
+                if key == "frame" and value.isdigit():
+                    with self._lock:
+                        self._processes[process] = int(value)
+                    self._update_frame_progress()
+
+            process.wait()
+            stderr_reader.join()
+            with self._lock:
+                self._finished_frames += self._processes.pop(process)
+            self._update_frame_progress()
+            process_trace.set(returncode=process.returncode)
+
+        self.check_cancelled()
+        stderr = "".join(stderr_chunks)
+        if check and process.returncode != 0:
+            raise subprocess.CalledProcessError(process.returncode, cmd, stderr=stderr)
+        return subprocess.CompletedProcess(cmd, process.returncode, "", stderr)
+
+    def _update_frame_progress(self):
+        if not self.total_frames:
+            return
+        with self._lock:
+            frames = self._finished_frames + sum(self._processes.values())
+        self.set_progress(frames / self.total_frames)
+
+
+class JobScheduler:
+    """Runs submitted jobs on worker threads once their dependencies are done and a resource slot is free"""
+
+    def __init__(self, limits=None):
+        self.limits = dict(RESOURCE_LIMITS)
+        self.limits.update(limits or {})
+        self.jobs = []
+        self.listeners = []
+        self._running = {}  # resource -> running job count
+        self._lock = threading.RLock()
+
+    def add_listener(self, listener):
+        """listener(job) is called from worker threads whenever a job changes"""
+        self.listeners.append(listener)
+
+    def notify(self, job):
+        for listener in self.listeners:
+            try:
+                listener(job)
+            except Exception as e:
+                print(f"Job listener failed: {e}")
+
+    def submit(self, name, fn, resource="default", depends_on=(), low_priority=False):
+        """Create and queue a job, returns the Job"""
+        job = Job(name, fn, resource, depends_on, low_priority)
+        job.scheduler = self
+        with self._lock:
+            self.jobs.append(job)
+        self.notify(job)
+        self._schedule()
+        return job
+
+    def cancel(self, job):
+        """Cancel a job and everything waiting on it"""
+        with self._lock:
+            to_cancel = [job]
+            for other in self.jobs:
+                if other.state not in FINISHED_STATES and self._depends_on(other, job):
+                    to_cancel.append(other)
+            for cancelled_job in to_cancel:
+                cancelled_job.cancel()
+                if cancelled_job.state == PENDING:
+                    cancelled_job.state = CANCELLED
+        for cancelled_job in to_cancel:
+            self.notify(cancelled_job)
+        self._schedule()
+
+    def clear_finished(self):
+        with self._lock:
+            self.jobs = [job for job in self.jobs if job.state not in FINISHED_STATES]
+
+    def active_jobs(self, resource=None):
+        with self._lock:
+            return [
+                job for job in self.jobs
+                if job.state == RUNNING and (resource is None or job.resource == resource)
+            ]
+
+    def _depends_on(self, job, other):
+        return any(dep is other or self._depends_on(dep, other) for dep in job.depends_on)
+
+    def _schedule(self):
+        started = []
+        skipped = []
+        with self._lock:
+            for job in self.jobs:
+                if job.state != PENDING:
+                    continue
+                if any(dep.state in (FAILED, CANCELLED) for dep in job.depends_on):
+                    job.state = CANCELLED
+                    job.error = "A job it depends on did not finish"
+                    skipped.append(job)
+                    continue
+                if not all(dep.state == DONE for dep in job.depends_on):
+                    continue
+                limit = self.limits.get(job.resource, self.limits["default"])
+                if self._running.get(job.resource, 0) >= limit:
+                    continue
+                self._running[job.resource] = self._running.get(job.resource, 0) + 1
+                job.state = RUNNING
+                started.append(job)
+
+        for job in skipped:
+            self.notify(job)
+        if skipped:
+            self._schedule()
+        for job in started:
+            self.notify(job)
+            threading.Thread(target=self._run, args=(job,), name=f"job-{job.id}", daemon=True).start()
+
+    def _run(self, job):
+        try:
+            job.check_cancelled()
+            with span(job.name, "job", resource=job.resource):
+                job.result = job.fn(job)
+            job.check_cancelled()
+            job.state = DONE
+            job.progress = 1.0
+        except JobCancelled:
+            job.state = CANCELLED
+        except Exception as e:
+            job.state = FAILED
+            job.error = str(e)
+            print(f"Job '{job.name}' failed: {e}")
+        finally:
+            with self._lock:
+                self._running[job.resource] -= 1
+            self.notify(job)
+            self._schedule()
@@ -0,0 +1,205 @@
+"""Load test of SGIO against the local ShotGrid stand-in.
+
+Simulates many artists working at once. Each artist runs on its own thread
+with its own ShotGrid connection and task cache, like separate Nuke
+sessions, or with --pool-size they share one ShotGridPool like the
+workers of a batch publish. An artist opens the panel (cached tasks, then refresh_tasks),
+publishes review movies with publish_video and reopens the panel, which
+refreshes from the cache, or with --polls follows the event log like an open
+panel does. Client-side latencies per operation are reported as
+percentiles, next to what the stand-in saw.
+
+    python -m SGNukeBuilder.loadtest --artists 40 --publishes 2 --latency 150 --jitter 100
+    python -m SGNukeBuilder.loadtest --artists 60 --rate-limit 25 --failure-rate 0.02 --trace
+    python -m SGNukeBuilder.loadtest --server http://localhost:8090 --user-ids 1 2 3
+    python -m SGNukeBuilder.loadtest --artists 16 --pool-size 4
+    python -m SGNukeBuilder.loadtest --artists 40 --polls 3
+
+Without --server a stand-in is started in this process with the given
+latency, rate limit and failure options.
+"""
+
+# Standard library imports
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+import threading
+import contextlib
+
+# Local application imports
+from .SGNukeBuilder import SGIO, ShotGridPool, TaskCache, TaskRecord
+from .sgstandin import StandinServer, add_behaviour_arguments, behaviour_from_args
+from .sync import TaskSync
+from . import tracing
+
+
+class Results:
+    """Client-side latencies and failures per operation"""
+
+    def __init__(self):
+        self.times = {}  # operation -> [seconds]
+        self.failures = {}
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def measure(self, operation):
+        started = time.perf_counter()
+        outcome = {'ok': True}
+        try:
+            yield outcome
+        except Exception as e:
+            outcome['ok'] = False
+            outcome['error'] = e
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.times.setdefault(operation, []).append(elapsed)
+                if not outcome['ok']:
+                    self.failures[operation] = self.failures.get(operation, 0) + 1
+
+    def print_summary(self, wall_seconds):
+        print(f"{'operation':<16} {'count':>6} {'failed':>7} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+        for operation in sorted(self.times):
+            times = sorted(self.times[operation])
+            print(f"{operation:<16} {len(times):>6} {self.failures.get(operation, 0):>7} "
+                  f"{percentile(times, 50) * 1000:>8.0f} {percentile(times, 90) * 1000:>8.0f} "
+                  f"{percentile(times, 99) * 1000:>8.0f} {times[-1] * 1000:>8.0f}")
+        total = sum(len(times) for times in self.times.values())
+        print(f"{total} operations in {wall_seconds:.1f} s ({total / wall_seconds:.1f}/s)")
+
+
+def percentile(sorted_values, percent):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(percent / 100.0 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def connect(server_url, user_id):
+    """A ShotGrid connection of its own for one simulated artist"""
+    from shotgun_api3.shotgun import Shotgun
+
+    return Shotgun(server_url, script_name="sgnukebuilder_loadtest", api_key=f"artist-{user_id}")
+
+
+def open_panel(sgio, results, operation, sync=None):
+    """What the panel does when it opens: show cached tasks, then revalidate them"""
+    sgio.get_cached_tasks()
+    with results.measure(operation) as outcome:
+        tasks = sync.load() if sync is not None else sgio.refresh_tasks()
+    return tasks if outcome['ok'] else []
+
+
+def run_artist(server_url, user_id, args, movie_path, cache_root, results, rng, pool=None):
+    if pool is None:
+        pool = ShotGridPool(factory=lambda: connect(server_url, user_id), size=1)
+    sgio = SGIO(user_id=user_id, pool=pool)
+    sgio.task_cache = TaskCache(os.path.join(cache_root, f"artist_{user_id}"))
+
+    sync = TaskSync(sgio) if args.polls else None
+    tasks = open_panel(sgio, results, "open panel", sync)
+    for publish in range(args.publishes):
+        time.sleep(rng.uniform(0, args.think))
+        if not tasks:
+            break
+        record = TaskRecord.from_task(rng.choice(tasks))
+        with results.measure("publish_video"):
+            if not sgio.publish_video(movie_path, f"loadtest_v{publish + 1:03d}", record.proj_id,
+                                      record.shot_id, record.task_id):
+                raise RuntimeError("publish failed")
+        if args.reopen:
+            tasks = open_panel(sgio, results, "reopen panel", sync) or tasks
+        for _ in range(args.polls):
+            time.sleep(rng.uniform(0, args.think))
+            with results.measure("poll events"):
+                sync.poll()
+            tasks = sync.task_list() or tasks
+
+
+def run_load_test(server_url, user_ids, args, pool=None):
+    results = Results()
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory(prefix="sgnb_loadtest_") as tmp_dir:
+        movie_path = os.path.join(tmp_dir, "loadtest_v001.mov")
+        with open(movie_path, "wb") as f:
+            f.write(os.urandom(int(args.upload_mb * 1024 * 1024)) or b"\0")
+
+        threads = []
+        for index, user_id in enumerate(user_ids):
+            delay = args.ramp * index / max(1, len(user_ids) - 1)
+            artist_rng = random.Random(rng.random())
+
+            def artist(user_id=user_id, delay=delay, artist_rng=artist_rng):
+                time.sleep(delay)
+                with tracing.span("artist", "loadtest", user_id=user_id):
+                    run_artist(server_url, user_id, args, movie_path, tmp_dir, results, artist_rng, pool)
+
+            threads.append(threading.Thread(target=artist, name=f"artist-{user_id}", daemon=True))
+
+        started = time.perf_counter()
+        # SGIO reports every call with print(); keep the report readable unless asked for
+        with contextlib.ExitStack() as output:
+            if not args.verbose:
+                output.enter_context(contextlib.redirect_stdout(output.enter_context(open(os.devnull, "w"))))
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        return results, time.perf_counter() - started
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test SGIO with simulated artists against a ShotGrid stand-in.")
+    parser.add_argument("--server", help="URL of a running stand-in, default start one in this process")
+    parser.add_argument("--artists", type=int, default=40, help="simulated artists working at once")
+    parser.add_argument("--user-ids", type=int, nargs="+", help="HumanUser ids to use with --server")
+    parser.add_argument("--publishes", type=int, default=2, help="publishes per artist")
+    parser.add_argument("--pool-size", type=int, help="share one ShotGrid pool of this size between all artists")
+    parser.add_argument("--reopen", action="store_true", help="reopen the panel after every publish")
+    parser.add_argument("--polls", type=int, default=0, help="event log polls of the open panel after every publish")
+    parser.add_argument("--upload-mb", type=float, default=2.0, help="size of the uploaded review movie")
+    parser.add_argument("--ramp", type=float, default=2.0, help="seconds over which artists start")
+    parser.add_argument("--think", type=float, default=1.0, help="max seconds an artist waits between actions")
+    parser.add_argument("--verbose", action="store_true", help="show SGIO's output")
+    parser.add_argument("--trace", action="store_true", help="record timings and print a summary at the end")
+    add_behaviour_arguments(parser)
+    args = parser.parse_args(argv)
+
+    if args.trace and not tracing.enabled():
+        tracing.enable()
+
+    server = None
+    if args.server:
+        server_url = args.server
+        user_ids = args.user_ids or list(range(1, args.artists + 1))
+    else:
+        server = StandinServer(behaviour=behaviour_from_args(args)).start()
+        server_url = server.url
+        user_ids = server.store.seed(artists=args.artists, seed=args.seed)
+        print(f"Started ShotGrid stand-in on {server_url}: {server.store.counts()}")
+
+    pool = None
+    if args.pool_size:
+        pool = ShotGridPool(factory=lambda: connect(server_url, "pool"), size=args.pool_size)
+    print(f"{len(user_ids)} artists, {args.publishes} publishes each")
+    try:
+        results, wall_seconds = run_load_test(server_url, user_ids, args, pool)
+    finally:
+        if server is not None:
+            server.stop()
+
+    results.print_summary(wall_seconds)
+    if pool is not None:
+        pool.print_metrics()
+    if server is not None:
+        server.stats.print_summary()
+    if tracing.trace_path():
+        tracing.print_summary(tracing.load([tracing.trace_path()]))
+    return 1 if results.failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
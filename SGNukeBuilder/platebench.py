@@ -0,0 +1,197 @@
+"""Benchmark of the plate formats in PLATE_FORMATS.
+
+Extracts one source movie with every plate format (or the ones named) and
+reports per format how long the extraction took, the bytes on disk, and
+how fast the frames read back: plain file reads, ffmpeg decoding the
+sequence and, with --nuke, Nuke reading every frame through a Read node.
+Run it with --output on the shared storage the plates live on, that's
+where the bytes cost the most.
+
+    python -m SGNukeBuilder.platebench source.mov
+    python -m SGNukeBuilder.platebench source.mov --formats exr exr_half_zip dpx10 --frames 96
+    python -m SGNukeBuilder.platebench source.mov --output /mnt/projects/bench --nuke
+
+Before every read pass the frames are dropped from the page cache where
+the OS allows it (posix_fadvise), so reads come from the disk or the file
+server instead of memory.
+"""
+
+# Standard library imports
+import os
+import re
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+# Local application imports
+from .SGNukeBuilder import SGIO, get_plate_format, PLATE_FORMATS, FIRST_FRAME, NUKE_EXECUTABLE
+from .jobs import Job
+from .sequences import find_sequence
+
+READ_CHUNK = 1024 * 1024
+
+# Run by `nuke -t`: reads every frame of a sequence through a Read node
+NUKE_READ_SCRIPT = """
+import sys
+import time
+import nuke
+
+path, first, last = sys.argv[1], int(sys.argv[2]), int(sys.argv[3])
+read = nuke.nodes.Read(file=path, first=first, last=last)
+curve = nuke.nodes.CurveTool(inputs=[read])
+started = time.perf_counter()
+nuke.execute(curve, first, last)
+print(f"READ_SECONDS {time.perf_counter() - started}")
+"""
+
+
+def trim_movie(movie_path, frames, folder):
+    """Copy of the first frames of a movie, without re-encoding it"""
+    trimmed = os.path.join(folder, "source" + os.path.splitext(movie_path)[1])
+    cmd = ["ffmpeg", "-v", "error", "-y", "-i", movie_path, "-map", "0:v:0", "-c", "copy",
+           "-frames:v", str(frames), trimmed]
+    subprocess.run(cmd, check=True)
+    return trimmed
+
+
+def drop_cached(paths):
+    """Ask the OS to forget the cached pages of these files; False where it can't"""
+    if not hasattr(os, "posix_fadvise"):
+        return False
+    for path in paths:
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        finally:
+            os.close(fd)
+    return True
+
+
+def read_files(paths):
+    """Read files start to end, returns the seconds it took"""
+    started = time.perf_counter()
+    for path in paths:
+        with open(path, "rb", buffering=0) as f:
+            while f.read(READ_CHUNK):
+                pass
+    return time.perf_counter() - started
+
+
+def decode_sequence(image_path):
+    """Decode a sequence with ffmpeg, returns the seconds it took"""
+    cmd = ["ffmpeg", "-v", "error", "-start_number", str(FIRST_FRAME), "-i", image_path, "-f", "null", "-"]
+    started = time.perf_counter()
+    subprocess.run(cmd, check=True)
+    return time.perf_counter() - started
+
+
+def nuke_read(image_path, first_frame, last_frame, folder):
+    """Seconds Nuke took to read every frame, None if it couldn't run"""
+    script_path = os.path.join(folder, "nuke_read.py")
+    with open(script_path, "w", encoding="utf-8") as f:
+        f.write(NUKE_READ_SCRIPT)
+    cmd = [NUKE_EXECUTABLE, "-t", script_path, image_path.replace('\\', '/'), str(first_frame), str(last_frame)]
+    try:
+        result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    except OSError as e:
+        print(f"Could not run {NUKE_EXECUTABLE}: {e}")
+        return None
+    match = re.search(r"READ_SECONDS ([\d.]+)", result.stdout)
+    if not match:
+        print(f"Nuke read failed: {result.stdout.strip()[-500:]}")
+        return None
+    return float(match.group(1))
+
+
+def benchmark_format(sgio, movie_path, name, folder, workers=None, use_nuke=False):
+    """Extract a movie in one plate format and time reading it back, returns a dict of results"""
+    profile = get_plate_format(name)
+    format_dir = os.path.join(folder, name)
+    image_path = os.path.join(format_dir, f"plate.%04d.{profile['extension']}")
+
+    # As a Job, like the panel's extractions, so ffmpeg's output is captured
+    job = Job(f"extract {name}", None)
+    started = time.perf_counter()
+    extracted = sgio.video_to_images(movie_path, image_path, workers=workers, job=job, plate_format=name)
+    extract_seconds = time.perf_counter() - started
+    sequence = find_sequence(image_path, use_cache=False)
+    if not extracted or not sequence:
+        return None
+
+    frame_paths = [sequence.frame_path(frame) for frame in sorted(sequence.sizes)]
+    results = {
+        "format": name,
+        "frames": len(sequence),
+        "extract_seconds": extract_seconds,
+        "bytes": sequence.total_bytes,
+        "cold": drop_cached(frame_paths),
+    }
+    results["read_seconds"] = read_files(frame_paths)
+    drop_cached(frame_paths)
+    results["decode_seconds"] = decode_sequence(image_path)
+    if use_nuke:
+        drop_cached(frame_paths)
+        results["nuke_seconds"] = nuke_read(image_path, sequence.first_frame, sequence.last_frame, folder)
+    return results
+
+
+def print_results(all_results):
+    print(f"{'format':<16} {'frames':>6} {'extract s':>10} {'MB':>9} {'MB/frame':>9} "
+          f"{'read MB/s':>10} {'decode fps':>11} {'nuke fps':>9}")
+    for results in all_results:
+        megabytes = results["bytes"] / 1e6
+        nuke_seconds = results.get("nuke_seconds")
+        nuke_fps = f"{results['frames'] / nuke_seconds:9.1f}" if nuke_seconds else f"{'-':>9}"
+        print(
+            f"{results['format']:<16} {results['frames']:>6} {results['extract_seconds']:>10.2f} "
+            f"{megabytes:>9.1f} {megabytes / results['frames']:>9.2f} "
+            f"{megabytes / results['read_seconds']:>10.0f} {results['frames'] / results['decode_seconds']:>11.1f} "
+            f"{nuke_fps}"
+        )
+    if not all(results["cold"] for results in all_results):
+        print("The page cache couldn't be dropped here, reads may have come from memory.")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare plate formats: extraction time, size and read speed.")
+    parser.add_argument("movie", help="source movie to extract")
+    parser.add_argument("--formats", nargs="+", default=list(PLATE_FORMATS), choices=list(PLATE_FORMATS),
+                        help="plate formats to compare, default all")
+    parser.add_argument("--frames", type=int, default=48, help="frames of the movie to extract, 0 = all")
+    parser.add_argument("--output", help="folder to extract into, default a temporary folder")
+    parser.add_argument("--workers", type=int, help="ffmpeg processes per extraction, default EXTRACT_WORKERS")
+    parser.add_argument("--nuke", action="store_true", help="also time reading the frames in Nuke (nuke -t)")
+    parser.add_argument("--keep", action="store_true", help="keep the extracted frames")
+    args = parser.parse_args(argv)
+
+    if args.output:
+        os.makedirs(args.output, exist_ok=True)
+    folder = tempfile.mkdtemp(prefix="platebench_", dir=args.output)
+    try:
+        movie_path = trim_movie(args.movie, args.frames, folder) if args.frames else args.movie
+        sgio = SGIO()
+        all_results = []
+        for name in args.formats:
+            print(f"Extracting {name}...")
+            results = benchmark_format(sgio, movie_path, name, folder, args.workers, args.nuke)
+            if results is None:
+                print(f"Extracting {name} failed")
+                continue
+            all_results.append(results)
+    finally:
+        if args.keep:
+            print(f"Frames kept in {folder}")
+        else:
+            shutil.rmtree(folder, ignore_errors=True)
+
+    if all_results:
+        print_results(all_results)
+    return 0 if len(all_results) == len(args.formats) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
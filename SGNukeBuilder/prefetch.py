@@ -0,0 +1,210 @@
+"""Extracting the plates of assigned shots before the artist asks for them.
+
+Build/Open Comp on a shot without a script first has to extract its source
+movie to comp/input, which can take minutes. With PREFETCH_PLATES on, the
+panel hands its task list to a Prefetcher, which queues a low priority
+"prefetch plate" job (ffprobe and ffmpeg under nice/ionice) for every
+assigned shot with a source movie but no extracted frames, shots of ready
+to start tasks first.
+
+Prefetching stops once PREFETCH_DISK_BUDGET_GB of plates were written in
+this session or the project disk would drop below PREFETCH_MIN_FREE_GB
+free. While one of the panel's renders runs, prefetch jobs are cancelled
+and queued again once it finished; the extraction manifest lets them carry
+on from the frames already written.
+"""
+
+# Standard library imports
+import os
+import shutil
+import threading
+
+# Local application imports
+from . import config
+from .SGNukeBuilder import TaskRecord, get_plate_format
+from .jobs import RUNNING, FINISHED_STATES
+from .sequences import find_sequence
+from .watch import shot_key, existing_folder
+
+
+PREFETCH_PLATES = getattr(config, "PREFETCH_PLATES", False)  # extract plates of assigned shots in the background
+PREFETCH_WORKERS = getattr(config, "PREFETCH_WORKERS", 1)  # plates extracted at once, one ffmpeg process each
+PREFETCH_DISK_BUDGET_GB = getattr(config, "PREFETCH_DISK_BUDGET_GB", 100)  # plates written per session
+PREFETCH_MIN_FREE_GB = getattr(config, "PREFETCH_MIN_FREE_GB", 50)  # free space left on the project disk
+PREFETCH_STATUS_ORDER = getattr(config, "PREFETCH_STATUS_ORDER", ('rdy', 'att'))  # other statuses follow
+
+
+def prefetch_order(tasks, status_order=None):
+    """TaskRecords of one task per shot, by task status in status_order and then in tree order"""
+    status_order = list(PREFETCH_STATUS_ORDER if status_order is None else status_order)
+    ranked = []
+    for task in tasks:
+        status = task.get('sg_status_list')
+        rank = status_order.index(status) if status in status_order else len(status_order)
+        record = TaskRecord.from_task(task)
+        ranked.append((rank, record.sort_key(), record))
+    ranked.sort(key=lambda item: item[:2])
+
+    records = {}
+    for _, _, record in ranked:
+        records.setdefault(shot_key(record), record)
+    return list(records.values())
+
+
+def estimate_plate_bytes(media):
+    """Bytes the extracted plate of a probed movie takes on disk at most, in the PLATE_FORMAT encoding"""
+    return media.width * media.height * (media.pipeline_frame_count or 0) * get_plate_format()["bytes_per_pixel"]
+
+
+class Prefetcher:
+    """Queues prefetch plate jobs for assigned shots on the panel's JobScheduler.
+
+    Shots are picked from a ShotStateIndex: a source version but no frames
+    in comp/input. fill() is called again whenever the index rescanned
+    shots or a job finished.
+    """
+
+    def __init__(self, scheduler, sgio, index, workers=None, budget_gb=None, min_free_gb=None):
+        self.scheduler = scheduler
+        self.sgio = sgio
+        self.index = index
+        self.workers = max(1, workers or PREFETCH_WORKERS)
+        self.budget = (PREFETCH_DISK_BUDGET_GB if budget_gb is None else budget_gb) * 1e9
+        self.min_free = (PREFETCH_MIN_FREE_GB if min_free_gb is None else min_free_gb) * 1e9
+        self.order = []  # TaskRecords, one per shot, in prefetch order
+        self.jobs = {}  # shot key -> queued or running Job
+        self.done = set()  # keys extracted, failed, cancelled by the artist or built by the artist
+        self.paused = set()  # jobs cancelled for a render, their shots are queued again
+        self.bytes_written = 0
+        self.reserved = 0  # estimated bytes of the plates being extracted
+        self.stopped = False
+        self._lock = threading.RLock()
+        scheduler.limits['prefetch'] = self.workers
+        scheduler.add_listener(self.on_job_changed)
+
+    def set_tasks(self, tasks):
+        """Prefetch the plates of the shots of these tasks, in status order"""
+        order = prefetch_order(tasks)
+        with self._lock:
+            self.order = order
+        self.fill()
+
+    def render_running(self):
+        return bool(self.scheduler.active_jobs("render"))
+
+    def needs_plate(self, key):
+        state = self.index.get(key)
+        return state is not None and state.context.paths['source_video'] is not None and not state.plate
+
+    def fill(self):
+        """Queue jobs for the next shots until PREFETCH_WORKERS are queued or running"""
+        with self._lock:
+            if self.stopped or self.render_running():
+                return
+            free_slots = self.workers - len(self.jobs)
+            for record in self.order:
+                if free_slots <= 0:
+                    break
+                key = shot_key(record)
+                if key in self.jobs or key in self.done or not self.needs_plate(key):
+                    continue
+                context = self.index.get(key).context
+                self.jobs[key] = self.scheduler.submit(
+                    f"{record.shot}: prefetch plate", lambda job, context=context: self.prefetch(job, context),
+                    resource="prefetch", low_priority=True
+                )
+                free_slots -= 1
+
+    def prefetch(self, job, context):
+        """Probe and extract one shot's plate, returns its path or None if it was skipped"""
+        source_video_path = context.get_source_video_path()
+        comp_input_path = context.get_comp_input_path(for_nuke=False)
+        if not source_video_path or not comp_input_path:
+            return None
+        media = self.sgio.probe_media(source_video_path, job=job)
+        if media is None:
+            raise RuntimeError("Could not read the source video")
+
+        estimate = estimate_plate_bytes(media)
+        if not self.reserve(estimate, comp_input_path, context.base_path):
+            return None
+        # Frames left by an extraction paused for a render were counted then
+        existing = find_sequence(comp_input_path, use_cache=False).total_bytes
+        try:
+            # One ffmpeg process, the plate isn't waited for
+            image_sequence = self.sgio.video_to_images(source_video_path, comp_input_path, workers=1, job=job)
+        finally:
+            written = find_sequence(comp_input_path, use_cache=False).total_bytes
+            with self._lock:
+                self.reserved -= estimate
+                self.bytes_written += written - existing
+        if not image_sequence:
+            raise RuntimeError("Failed to extract the plate")
+        return image_sequence
+
+    def reserve(self, size, image_path, base_path):
+        """Book disk space for a plate; stops prefetching once the budget or the disk is used up"""
+        folder = existing_folder(os.path.dirname(image_path), base_path) or base_path
+        try:
+            free = shutil.disk_usage(folder).free
+        except OSError as e:
+            print(f"Plate prefetch can't check free disk space: {e}")
+            free = None
+        with self._lock:
+            if self.stopped:
+                return False
+            if self.bytes_written + self.reserved + size > self.budget:
+                print(f"Plate prefetch stopped, {self.bytes_written / 1e9:.1f} GB of its "
+                      f"{self.budget / 1e9:.1f} GB budget used")
+            elif free is not None and free - self.reserved - size < self.min_free:
+                print(f"Plate prefetch stopped, {free / 1e9:.1f} GB free on the project disk")
+            else:
+                self.reserved += size
+                return True
+            self.stopped = True
+            return False
+
+    def take_over(self, key):
+        """Stop prefetching a shot the artist builds a comp for, its own extraction carries on from there"""
+        with self._lock:
+            self.done.add(key)
+            job = self.jobs.get(key)
+        if job is not None and job.state not in FINISHED_STATES:
+            self.scheduler.cancel(job)
+
+    def pause(self):
+        with self._lock:
+            to_pause = [job for job in self.jobs.values() if job.state not in FINISHED_STATES]
+            self.paused.update(to_pause)
+        if to_pause:
+            print(f"Plate prefetch paused for the render, {len(to_pause)} plates continue afterwards")
+        for job in to_pause:
+            self.scheduler.cancel(job)
+
+    def on_job_changed(self, job):
+        """Scheduler listener, called from worker threads"""
+        if job.resource == "render":
+            if job.state == RUNNING:
+                self.pause()
+            elif job.state in FINISHED_STATES:
+                self.fill()
+            return
+        if job.resource != "prefetch" or job.state not in FINISHED_STATES:
+            return
+        with self._lock:
+            for key, queued in list(self.jobs.items()):
+                if queued is job:
+                    del self.jobs[key]
+                    if job in self.paused:
+                        self.paused.discard(job)
+                    else:
+                        self.done.add(key)
+        self.fill()
+
+    def stop(self):
+        """Cancel all prefetching, e.g. when the panel closes"""
+        with self._lock:
+            self.stopped = True
+            jobs = [job for job in self.jobs.values() if job.state not in FINISHED_STATES]
+        for job in jobs:
+            self.scheduler.cancel(job)
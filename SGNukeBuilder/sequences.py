@@ -0,0 +1,214 @@
+"""Image sequence scanning for SGNukeBuilder.
+
+Groups the files of a directory into frame sequences in one os.scandir
+pass, e.g. plate.1001.exr ... plate.1100.exr becomes one Sequence with its
+frame sizes and mtimes, gaps, zero-size frames and total bytes. Results are
+cached per directory and reused while the directory's mtime is unchanged.
+"""
+
+# Standard library imports
+import os
+import re
+import time
+import threading
+
+
+# Files are grouped as <head><frame digits><extension>
+FRAME_FILE_REGEX = re.compile(r'^(.*?)(\d+)(\.[A-Za-z0-9]+)$')
+
+# A directory changed this recently may still have frames being written,
+# its scan isn't cached
+SETTLE_SECONDS = 2.0
+CACHE_MAX_DIRECTORIES = 256
+
+_CACHE = {}  # directory -> (mtime_ns, {(head, tail): Sequence})
+_CACHE_LOCK = threading.Lock()
+
+
+class Sequence:
+    """Frames on disk of one image sequence, frame numbers mapped to sizes and mtimes"""
+
+    __slots__ = ('directory', 'head', 'tail', 'padding', 'sizes', 'mtimes')
+
+    def __init__(self, directory, head, tail, padding=4):
+        self.directory = directory
+        self.head = head
+        self.tail = tail
+        self.padding = padding
+        self.sizes = {}
+        self.mtimes = {}
+
+    def __repr__(self):
+        return f"<Sequence {self.path} {self.frame_range_text()}>"
+
+    def __len__(self):
+        return len(self.sizes)
+
+    @property
+    def path(self):
+        """printf style path, e.g. /dir/plate.%04d.exr"""
+        return os.path.join(self.directory, f"{self.head}%0{self.padding}d{self.tail}")
+
+    @property
+    def nuke_path(self):
+        """Nuke style path, e.g. /dir/plate.####.exr"""
+        return os.path.join(self.directory, f"{self.head}{'#' * self.padding}{self.tail}")
+
+    def frame_path(self, frame):
+        return self.path % frame
+
+    @property
+    def first_frame(self):
+        return min(self.sizes) if self.sizes else None
+
+    @property
+    def last_frame(self):
+        return max(self.sizes) if self.sizes else None
+
+    @property
+    def total_bytes(self):
+        return sum(self.sizes.values())
+
+    @property
+    def zero_frames(self):
+        return sorted(frame for frame, size in self.sizes.items() if size == 0)
+
+    @property
+    def gaps(self):
+        """Missing (first, last) frame ranges between the first and last frame"""
+        return self.missing_ranges(self.first_frame, self.last_frame) if self.sizes else []
+
+    def missing_ranges(self, first_frame, last_frame):
+        """(first, last) ranges of a frame range that have no file"""
+        ranges = []
+        for frame in range(first_frame, last_frame + 1):
+            if frame in self.sizes:
+                continue
+            if ranges and frame == ranges[-1][1] + 1:
+                ranges[-1][1] = frame
+            else:
+                ranges.append([frame, frame])
+        return [tuple(r) for r in ranges]
+
+    def is_complete(self, first_frame=None, last_frame=None):
+        """True if every frame of the range (default first to last on disk) exists and isn't empty"""
+        if not self.sizes:
+            return False
+        first_frame = self.first_frame if first_frame is None else first_frame
+        last_frame = self.last_frame if last_frame is None else last_frame
+        return all(self.sizes.get(frame, 0) > 0 for frame in range(first_frame, last_frame + 1))
+
+    def frame_range_text(self):
+        if not self.sizes:
+            return "no frames"
+        return f"{self.first_frame}-{self.last_frame}"
+
+    def describe_problems(self):
+        """Gaps and empty frames as a short message, empty string when there are none"""
+        problems = []
+        if self.gaps:
+            problems.append("missing frames " + ", ".join(
+                f"{a}-{b}" if a != b else str(a) for a, b in self.gaps
+            ))
+        if self.zero_frames:
+            problems.append(f"{len(self.zero_frames)} empty frames from {self.zero_frames[0]}")
+        return "; ".join(problems)
+
+
+def scan_directory(dir_path, use_cache=True):
+    """Return {(head, tail): Sequence} for all frame sequences in a directory.
+
+    With use_cache the previous scan is reused while the directory mtime is
+    unchanged. Frames rewritten in place don't change the directory mtime,
+    so pass use_cache=False when sizes must be current, e.g. right after a
+    render or extraction.
+    """
+    dir_path = os.path.normpath(dir_path)
+    try:
+        dir_mtime = os.stat(dir_path).st_mtime_ns
+    except OSError:
+        return {}
+
+    if use_cache:
+        with _CACHE_LOCK:
+            cached = _CACHE.get(dir_path)
+        if cached is not None and cached[0] == dir_mtime:
+            return cached[1]
+
+    sequences = {}
+    try:
+        with os.scandir(dir_path) as entries:
+            for entry in entries:
+                match = FRAME_FILE_REGEX.match(entry.name)
+                if not match:
+                    continue
+                head, digits, tail = match.groups()
+                sequence = sequences.get((head, tail))
+                if sequence is None:
+                    sequence = sequences[(head, tail)] = Sequence(dir_path, head, tail, len(digits))
+                elif len(digits) < sequence.padding:
+                    sequence.padding = len(digits)
+                stat = entry.stat()
+                frame = int(digits)
+                sequence.sizes[frame] = stat.st_size
+                sequence.mtimes[frame] = stat.st_mtime_ns
+    except OSError as e:
+        print(f"Could not scan {dir_path}: {e}")
+        return {}
+
+    with _CACHE_LOCK:
+        if time.time_ns() - dir_mtime > SETTLE_SECONDS * 1e9:
+            _CACHE.pop(dir_path, None)
+            _CACHE[dir_path] = (dir_mtime, sequences)
+            while len(_CACHE) > CACHE_MAX_DIRECTORIES:
+                del _CACHE[next(iter(_CACHE))]
+        else:
+            _CACHE.pop(dir_path, None)
+    return sequences
+
+
+def find_sequence(image_path, use_cache=True):
+    """Sequence of a %04d or #### image path, an empty Sequence when no frames exist.
+
+    Without use_cache only the files of this sequence are stat'ed, which is
+    much cheaper than a full scan_directory in folders holding several sequences.
+    """
+    image_path = image_path.replace('####', '%04d')
+    dir_path, name = os.path.split(image_path)
+    match = re.match(r'^(.*)%0(\d)d(.*)$', name)
+    if not match:
+        raise ValueError(f"Not an image sequence path: {image_path}")
+    head, padding, tail = match.group(1), int(match.group(2)), match.group(3)
+    dir_path = os.path.normpath(dir_path)
+
+    if use_cache:
+        sequence = scan_directory(dir_path).get((head, tail))
+        return sequence if sequence is not None else Sequence(dir_path, head, tail, padding)
+
+    sequence = Sequence(dir_path, head, tail, padding)
+    regex = re.compile('^' + re.escape(head) + r'(\d+)' + re.escape(tail) + '$')
+    try:
+        with os.scandir(dir_path) as entries:
+            for entry in entries:
+                if not entry.name.startswith(head):
+                    continue
+                match = regex.match(entry.name)
+                if match:
+                    stat = entry.stat()
+                    frame = int(match.group(1))
+                    sequence.sizes[frame] = stat.st_size
+                    sequence.mtimes[frame] = stat.st_mtime_ns
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        print(f"Could not scan {dir_path}: {e}")
+    return sequence
+
+
+def invalidate(dir_path=None):
+    """Drop cached scans, of one directory or all"""
+    with _CACHE_LOCK:
+        if dir_path is None:
+            _CACHE.clear()
+        else:
+            _CACHE.pop(os.path.normpath(dir_path), None)
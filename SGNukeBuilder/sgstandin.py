@@ -0,0 +1,594 @@
+"""Local ShotGrid stand-in for load-testing SGNukeBuilder.
+
+Answers the part of the ShotGrid API that SGIO uses (info, find/read,
+create, update, delete, batch and file uploads) from an in-memory database
+seeded with synthetic projects, shots, comp tasks and artists. Changes made
+through the API are written to EventLogEntry like on a real site. It speaks the same
+JSON-RPC wire format as a real site, so an unmodified shotgun_api3.Shotgun
+connection can be pointed at it.
+
+Every call can be slowed down and disturbed the way a remote site is:
+per-method latency with jitter, a limited number of concurrent requests,
+upload bandwidth, site-wide rate limiting (HTTP 429) and random failures
+(HTTP 502/503, or API errors such as an expired session).
+
+    python -m SGNukeBuilder.sgstandin --port 8090 --latency 150 --jitter 100 --rate-limit 20
+
+Setting SERVER_PATH = "http://localhost:8090" in config.py runs the panel
+against it; see loadtest.py for many simulated artists at once.
+"""
+
+# Standard library imports
+import sys
+import json
+import time
+import random
+import argparse
+import datetime
+import threading
+from email.parser import BytesParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+STATUSES = ['wtg', 'rdy', 'ip', 'rti', 'rvi', 'att', 'fin']
+RELATIONS = ('is', 'is_not', 'in', 'not_in', 'greater_than', 'less_than', 'contains', 'starts_with')
+SERVER_VERSION = [8, 0, 0]
+API_ERROR = 104  # any error code other than the auth ones becomes a plain Fault in shotgun_api3
+SESSION_EXPIRED = 102  # raised as AuthenticationFault
+
+
+class StandinError(Exception):
+    pass
+
+
+def now_text():
+    return datetime.datetime.now(datetime.timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+class EntityStore:
+    """In-memory entities by type and id; entity links are stored as {"type", "id"}"""
+
+    NAME_FIELDS = ('code', 'name', 'content', 'login')
+
+    def __init__(self):
+        self.entities = {}  # type -> {id: dict}
+        self._next_ids = {}
+        self._lock = threading.Lock()
+
+    def add(self, entity_type, fields):
+        with self._lock:
+            return self._add(entity_type, fields)
+
+    def _add(self, entity_type, fields):
+        entity_id = self._next_ids.get(entity_type, 1)
+        self._next_ids[entity_type] = entity_id + 1
+        entity = dict(fields, type=entity_type, id=entity_id)
+        entity.setdefault('created_at', now_text())
+        entity.setdefault('updated_at', entity['created_at'])
+        self.entities.setdefault(entity_type, {})[entity_id] = entity
+        return entity
+
+    def link(self, entity):
+        return {'type': entity['type'], 'id': entity['id']}
+
+    def _log_event(self, entity, action, attribute_name=None, old_value=None, new_value=None):
+        """EventLogEntry for a change made through the API, e.g. Shotgun_Task_Change"""
+        meta = {'type': 'attribute_change' if attribute_name else action.lower(),
+                'entity_type': entity['type'], 'entity_id': entity['id']}
+        if attribute_name:
+            meta.update(attribute_name=attribute_name, old_value=old_value, new_value=new_value)
+        self._add('EventLogEntry', {
+            'event_type': f"Shotgun_{entity['type']}_{action}",
+            'entity': self.link(entity),
+            'attribute_name': attribute_name,
+            'meta': meta,
+        })
+
+    def get(self, entity_type, entity_id):
+        return self.entities.get(entity_type, {}).get(entity_id)
+
+    def resolve(self, entity, path):
+        """Value of a field path such as 'entity.Shot.project.Project.id' on an entity"""
+        parts = path.split('.')
+        value = entity.get(parts[0])
+        index = 1
+        while index < len(parts):
+            if not isinstance(value, dict) or value.get('type') != parts[index] or index + 1 >= len(parts):
+                return None
+            linked = self.get(value['type'], value['id'])
+            if linked is None:
+                return None
+            value = linked.get(parts[index + 1])
+            index += 2
+        return value
+
+    def output_value(self, value):
+        """Entity links as ShotGrid returns them, with their display name"""
+        if isinstance(value, list):
+            return [self.output_value(v) for v in value]
+        if isinstance(value, dict) and 'type' in value and 'id' in value:
+            linked = self.get(value['type'], value['id']) or {}
+            name = next((linked[f] for f in self.NAME_FIELDS if linked.get(f)), value.get('name'))
+            return {'type': value['type'], 'id': value['id'], 'name': name}
+        return value
+
+    def record(self, entity, fields):
+        result = {'type': entity['type'], 'id': entity['id']}
+        for field in fields or []:
+            if field not in ('type', 'id'):
+                result[field] = self.output_value(self.resolve(entity, field))
+        return result
+
+    def matches(self, entity, conditions):
+        """Check an entity against a translated filter dict ({"logical_operator", "conditions"})"""
+        results = (
+            self.matches(entity, c) if 'logical_operator' in c else self.matches_condition(entity, c)
+            for c in conditions.get('conditions', [])
+        )
+        if conditions.get('logical_operator') == 'or':
+            return any(results)
+        return all(results)
+
+    def matches_condition(self, entity, condition):
+        relation = condition['relation']
+        if relation not in RELATIONS:
+            raise StandinError(f"Unsupported filter relation '{relation}'")
+        value = self.resolve(entity, condition['path'])
+        wanted = [_comparable(v) for v in condition.get('values', [])]
+        # Multi-entity fields match when any of their entities does
+        values = [_comparable(v) for v in value] if isinstance(value, list) else [_comparable(value)]
+
+        if relation in ('is', 'in'):
+            return any(v in wanted for v in values)
+        if relation in ('is_not', 'not_in'):
+            return not any(v in wanted for v in values)
+        if not wanted or values[0] is None:
+            return False
+        try:
+            if relation == 'greater_than':
+                return values[0] > wanted[0]
+            if relation == 'less_than':
+                return values[0] < wanted[0]
+        except TypeError:
+            return False
+        text = str(values[0]).lower()
+        if relation == 'contains':
+            return str(wanted[0]).lower() in text
+        return text.startswith(str(wanted[0]).lower())
+
+    def read(self, params):
+        entity_type = params['type']
+        filters = params.get('filters') or {'logical_operator': 'and', 'conditions': []}
+        paging = params.get('paging') or {}
+        per_page = paging.get('entities_per_page', 500)
+        page = max(1, paging.get('current_page', 1))
+        with self._lock:
+            found = [
+                entity for entity in self.entities.get(entity_type, {}).values()
+                if not entity.get('retired') and self.matches(entity, filters)
+            ]
+            for sort in reversed(params.get('sorts') or []):
+                found.sort(key=lambda entity: _sortable(self.resolve(entity, sort['field_name'])),
+                           reverse=sort.get('direction') == 'desc')
+            start = (page - 1) * per_page
+            entities = [self.record(entity, params.get('return_fields')) for entity in found[start:start + per_page]]
+        result = {'entities': entities}
+        if params.get('return_paging_info_without_counts'):
+            result['paging_info'] = {'has_next_page': start + per_page < len(found)}
+        elif params.get('return_paging_info'):
+            result['paging_info'] = {'entity_count': len(found)}
+        return result
+
+    def create(self, params):
+        fields = {f['field_name']: f['value'] for f in params.get('fields', [])}
+        with self._lock:
+            entity = self._add(params['type'], fields)
+            self._log_event(entity, 'New')
+            return self.record(entity, list(fields) + list(params.get('return_fields') or []))
+
+    def update(self, params):
+        fields = {f['field_name']: f['value'] for f in params.get('fields', [])}
+        with self._lock:
+            entity = self.get(params['type'], params['id'])
+            if entity is None:
+                raise StandinError(f"{params['type']} {params['id']} does not exist")
+            for field_name, value in fields.items():
+                if entity.get(field_name) != value:
+                    self._log_event(entity, 'Change', field_name, entity.get(field_name), value)
+            entity.update(fields)
+            entity['updated_at'] = now_text()
+            return self.record(entity, list(fields))
+
+    def delete(self, params):
+        """Retire an entity and its tasks; they stay in the store but no longer match any read"""
+        with self._lock:
+            entity = self.get(params['type'], params['id'])
+            if entity is None or entity.get('retired'):
+                return False
+            link = _comparable(self.link(entity))
+            tasks = [task for task in self.entities.get('Task', {}).values()
+                     if _comparable(task.get('entity')) == link and not task.get('retired')]
+            for retired in [entity] + tasks:
+                retired['retired'] = True
+                self._log_event(retired, 'Retirement')
+            return True
+
+    def batch(self, calls):
+        # A real batch is one transaction; a failing request fails the whole call before anything is applied
+        for call in calls:
+            if call.get('request_type') not in ('create', 'update'):
+                raise StandinError(f"Unsupported batch request '{call.get('request_type')}'")
+            if call['request_type'] == 'update' and self.get(call['type'], call['id']) is None:
+                raise StandinError(f"{call['type']} {call['id']} does not exist")
+        return [self.create(call) if call['request_type'] == 'create' else self.update(call) for call in calls]
+
+    def attach(self, entity_type, entity_id, field_name, display_name, size):
+        """Store an uploaded file as an Attachment, linked from field_name; returns the Attachment id"""
+        with self._lock:
+            entity = self.get(entity_type, entity_id)
+            if entity is None:
+                raise StandinError(f"{entity_type} {entity_id} does not exist")
+            attachment = self._add('Attachment', {
+                'this_file': {'name': display_name}, 'filename': display_name, 'file_size': size,
+                'attachment_links': [self.link(entity)]
+            })
+            if field_name:
+                value = {'type': 'Attachment', 'id': attachment['id'], 'name': display_name}
+                self._log_event(entity, 'Change', field_name, entity.get(field_name), value)
+                entity[field_name] = value
+                entity['updated_at'] = now_text()
+            return attachment['id']
+
+    def seed(self, artists=40, projects=2, sequences=5, shots=20, seed=1):
+        """Synthetic site: artists as HumanUsers, projects of sequences of shots with comp and roto tasks.
+
+        Comp tasks are assigned round-robin so every artist gets a similar
+        share. Returns the artists' HumanUser ids.
+        """
+        rng = random.Random(seed)
+        users = [self.add('HumanUser', {'login': f'artist{i:03d}', 'name': f'Artist {i}'}) for i in range(1, artists + 1)]
+        comp = self.add('Step', {'code': 'comp'})
+        roto = self.add('Step', {'code': 'roto'})
+        counts = {'comp': 0, 'roto': 0}
+        for p in range(1, projects + 1):
+            project = self.add('Project', {'name': f'LoadTest{p:02d}'})
+            for s in range(1, sequences + 1):
+                sequence = self.add('Sequence', {'code': f'SEQ{s * 10:03d}', 'project': self.link(project)})
+                for n in range(1, shots + 1):
+                    shot = self.add('Shot', {
+                        'code': f'{n * 10:04d}', 'sg_sequence': self.link(sequence), 'project': self.link(project)
+                    })
+                    for step in (comp, roto):
+                        user = users[counts[step['code']] % len(users)] if users else None
+                        counts[step['code']] += 1
+                        self.add('Task', {
+                            'content': step['code'],
+                            'entity': self.link(shot),
+                            'project': self.link(project),
+                            'step': self.link(step),
+                            'sg_status_list': rng.choice(STATUSES),
+                            'task_assignees': [self.link(user)] if user else [],
+                        })
+        return [user['id'] for user in users]
+
+    def counts(self):
+        with self._lock:
+            return {entity_type: len(entities) for entity_type, entities in self.entities.items()}
+
+
+def _comparable(value):
+    if isinstance(value, dict) and 'type' in value and 'id' in value:
+        return (value['type'], value['id'])
+    return value
+
+
+def _sortable(value):
+    """Sort key that puts empty values first and never compares different types"""
+    value = _comparable(value)
+    if value is None:
+        return (0, '')
+    if isinstance(value, (int, float)):
+        return (1, value)
+    return (2, str(value))
+
+
+class Behaviour:
+    """How the stand-in delays, limits and fails calls; attributes can be changed while it runs"""
+
+    def __init__(self, latency_ms=0, jitter_ms=0, method_latency_ms=None, max_concurrent=0,
+                 rate_limit=0, burst=None, failure_rate=0.0, failure_statuses=(502, 503),
+                 upload_mbps=0, seed=None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.method_latency_ms = dict(method_latency_ms or {})  # e.g. {"read": 300, "upload": 800}
+        self.max_concurrent = max_concurrent  # requests handled at once, 0 = unlimited
+        self.rate_limit = rate_limit  # requests per second across the site, 0 = unlimited
+        self.burst = burst or max(1, int(rate_limit))
+        self.failure_rate = failure_rate
+        self.failure_statuses = tuple(failure_statuses)  # HTTP codes, below 400 ShotGrid API error codes
+        self.upload_mbps = upload_mbps  # upload bandwidth in megabytes per second, 0 = unlimited
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._tokens = float(self.burst)
+        self._refilled = time.monotonic()
+        self._slots = threading.BoundedSemaphore(max_concurrent) if max_concurrent else None
+
+    def delay(self, method):
+        base = self.method_latency_ms.get(method, self.latency_ms)
+        with self._lock:
+            # Exponential jitter: mostly small, with the long tail a busy remote site has
+            jitter = self._rng.expovariate(1.0 / self.jitter_ms) if self.jitter_ms else 0.0
+        return (base + jitter) / 1000.0
+
+    def allow(self):
+        """Take a rate limit token, False when the site would answer 429"""
+        if not self.rate_limit:
+            return True
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._refilled) * self.rate_limit)
+            self._refilled = now
+            if self._tokens < 1.0:
+                return False
+            self._tokens -= 1.0
+            return True
+
+    def failure(self):
+        """HTTP status or API error code to fail this call with, None to let it through"""
+        if not self.failure_rate:
+            return None
+        with self._lock:
+            if self._rng.random() >= self.failure_rate:
+                return None
+            return self._rng.choice(self.failure_statuses)
+
+    def acquire(self):
+        if self._slots is not None:
+            self._slots.acquire()
+
+    def release(self):
+        if self._slots is not None:
+            self._slots.release()
+
+
+class Stats:
+    """Per-method call counts and server-side times of the stand-in"""
+
+    def __init__(self):
+        self.methods = {}
+        self._lock = threading.Lock()
+
+    def add(self, method, outcome, seconds, nbytes=0):
+        with self._lock:
+            entry = self.methods.setdefault(method, {
+                'calls': 0, 'ok': 0, 'rate_limited': 0, 'injected': 0, 'errors': 0, 'seconds': 0.0, 'bytes': 0
+            })
+            entry['calls'] += 1
+            entry[outcome] += 1
+            entry['seconds'] += seconds
+            entry['bytes'] += nbytes
+
+    def snapshot(self):
+        with self._lock:
+            return {method: dict(entry) for method, entry in self.methods.items()}
+
+    def print_summary(self):
+        methods = self.snapshot()
+        print(f"{'stand-in method':<18} {'calls':>7} {'ok':>7} {'429':>6} {'injected':>9} {'errors':>7} "
+              f"{'mean ms':>8} {'MB':>8}")
+        for method in sorted(methods):
+            entry = methods[method]
+            print(f"{method:<18} {entry['calls']:>7} {entry['ok']:>7} {entry['rate_limited']:>6} "
+                  f"{entry['injected']:>9} {entry['errors']:>7} {entry['seconds'] / entry['calls'] * 1000:>8.1f} "
+                  f"{entry['bytes'] / 1e6:>8.1f}")
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real site
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def do_POST(self):
+        started = time.monotonic()
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        if self.path.startswith('/api3/json'):
+            try:
+                payload = json.loads(body.decode('utf-8'))
+                method = payload.get('method_name', '')
+            except ValueError:
+                return self.reply_error(started, 'invalid', 400, "Invalid JSON")
+            self.handle_call(started, method, lambda: self.server.call_rpc(method, payload.get('params', [])))
+        elif self.path.startswith('/upload/upload_file'):
+            self.handle_call(started, 'upload', lambda: self.upload(body, started), nbytes=len(body))
+        else:
+            self.reply_error(started, 'unknown', 404, f"No stand-in for {self.path}")
+
+    def handle_call(self, started, method, fn, nbytes=0):
+        server = self.server
+        behaviour = server.behaviour
+        if method != 'info' and not behaviour.allow():
+            server.stats.add(method, 'rate_limited', time.monotonic() - started)
+            return self.reply(429, b"Too many requests", 'text/plain', {'Retry-After': '1'})
+
+        behaviour.acquire()
+        try:
+            time.sleep(behaviour.delay(method))
+            status = behaviour.failure() if method != 'info' else None
+            if status is not None:
+                server.stats.add(method, 'injected', time.monotonic() - started, nbytes)
+                if status < 400 and method == 'upload':
+                    return self.reply(200, b"0:Injected API error\n", 'text/plain')
+                if status < 400:
+                    return self.reply_json({'exception': True, 'message': "Injected API error", 'error_code': status})
+                return self.reply(status, b"Injected failure", 'text/plain')
+            try:
+                result = fn()
+            except (StandinError, KeyError, TypeError, ValueError) as e:
+                server.stats.add(method, 'errors', time.monotonic() - started, nbytes)
+                if method == 'upload':
+                    return self.reply(200, f"0:{e}\n".encode('utf-8'), 'text/plain')
+                return self.reply_json({'exception': True, 'message': str(e), 'error_code': API_ERROR})
+            server.stats.add(method, 'ok', time.monotonic() - started, nbytes)
+            if method == 'upload':
+                return self.reply(200, f"1:{result}\n".encode('utf-8'), 'text/plain')
+            return self.reply_json({'results': result})
+        finally:
+            behaviour.release()
+
+    def upload(self, body, started):
+        message = BytesParser().parsebytes(
+            b"Content-Type: " + self.headers.get('Content-Type', '').encode('latin-1') + b"\r\n\r\n" + body
+        )
+        fields = {}
+        size = 0
+        for part in message.get_payload() if message.is_multipart() else []:
+            name = part.get_param('name', header='content-disposition')
+            data = part.get_payload(decode=True) or b""
+            if part.get_filename():
+                size = len(data)
+            else:
+                fields[name] = data.decode('utf-8')
+
+        # Hold the connection for as long as the bytes would take to arrive
+        bandwidth = self.server.behaviour.upload_mbps
+        if bandwidth:
+            remaining = len(body) / (bandwidth * 1e6) - (time.monotonic() - started)
+            if remaining > 0:
+                time.sleep(remaining)
+        return self.server.store.attach(
+            fields['entity_type'], int(fields['entity_id']), fields.get('field_name'),
+            fields.get('display_name', 'upload'), size
+        )
+
+    def reply_json(self, data):
+        self.reply(200, json.dumps(data).encode('utf-8'), 'application/json; charset=utf-8')
+
+    def reply_error(self, started, method, status, message):
+        self.server.stats.add(method, 'errors', time.monotonic() - started)
+        self.reply(status, message.encode('utf-8'), 'text/plain')
+
+    def reply(self, status, data, content_type, headers=None):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class StandinServer(ThreadingHTTPServer):
+    """The stand-in site; serve_forever() it, or start() it on a background thread"""
+
+    daemon_threads = True
+
+    def __init__(self, address=('127.0.0.1', 0), store=None, behaviour=None, verbose=False):
+        super().__init__(address, StandinHandler)
+        self.store = store if store is not None else EntityStore()
+        self.behaviour = behaviour or Behaviour()
+        self.stats = Stats()
+        self.verbose = verbose
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, name="sg-standin", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def call_rpc(self, method, params):
+        call_params = params[-1] if params and method != 'info' else None
+        if method == 'info':
+            return {
+                'version': SERVER_VERSION, 'full_version': SERVER_VERSION + [0],
+                's3_uploads_enabled': False, 's3_direct_uploads_enabled': False,
+                'api_max_entities_per_page': 500,
+            }
+        if method == 'read':
+            return self.store.read(call_params)
+        if method == 'create':
+            return self.store.create(call_params)
+        if method == 'update':
+            return self.store.update(call_params)
+        if method == 'delete':
+            return self.store.delete(call_params)
+        if method == 'batch':
+            return self.store.batch(call_params)
+        raise StandinError(f"Method '{method}' is not part of the stand-in")
+
+
+def parse_method_latency(values):
+    """["read=300", "upload=900"] -> {"read": 300.0, "upload": 900.0}"""
+    latencies = {}
+    for value in values or []:
+        method, _, ms = value.partition('=')
+        latencies[method] = float(ms)
+    return latencies
+
+
+def add_behaviour_arguments(parser):
+    """Latency, limit and failure options shared with the load test"""
+    parser.add_argument("--latency", type=float, default=100, help="base latency per call in ms")
+    parser.add_argument("--jitter", type=float, default=50, help="mean extra random latency in ms")
+    parser.add_argument("--method-latency", nargs="+", metavar="METHOD=MS",
+                        help="latency of single methods, e.g. read=300 batch=200 upload=800")
+    parser.add_argument("--max-concurrent", type=int, default=0, help="requests the site handles at once, 0 = unlimited")
+    parser.add_argument("--rate-limit", type=float, default=0, help="requests per second before answering 429, 0 = off")
+    parser.add_argument("--burst", type=int, help="requests allowed at once above the rate limit")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="share of calls that fail, e.g. 0.02")
+    parser.add_argument("--failure-status", type=int, nargs="+", default=[502, 503],
+                        help=f"HTTP codes failed calls get; below 400 an API error code, e.g. {SESSION_EXPIRED} "
+                             f"for an expired session or {API_ERROR} for a failed request")
+    parser.add_argument("--upload-mbps", type=float, default=0, help="upload bandwidth in MB/s, 0 = unlimited")
+    parser.add_argument("--seed", type=int, default=1, help="random seed for the site data and the jitter")
+
+
+def behaviour_from_args(args):
+    return Behaviour(
+        latency_ms=args.latency, jitter_ms=args.jitter, method_latency_ms=parse_method_latency(args.method_latency),
+        max_concurrent=args.max_concurrent, rate_limit=args.rate_limit, burst=args.burst,
+        failure_rate=args.failure_rate, failure_statuses=args.failure_status, upload_mbps=args.upload_mbps,
+        seed=args.seed
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve a local ShotGrid stand-in with injected latency and failures.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--artists", type=int, default=40, help="HumanUsers to seed, with ids 1..N")
+    parser.add_argument("--projects", type=int, default=2)
+    parser.add_argument("--sequences", type=int, default=5, help="sequences per project")
+    parser.add_argument("--shots", type=int, default=20, help="shots per sequence")
+    parser.add_argument("--verbose", action="store_true", help="log every request")
+    add_behaviour_arguments(parser)
+    args = parser.parse_args(argv)
+
+    server = StandinServer((args.host, args.port), behaviour=behaviour_from_args(args), verbose=args.verbose)
+    user_ids = server.store.seed(args.artists, args.projects, args.sequences, args.shots, args.seed)
+    print(f"ShotGrid stand-in on {server.url}: {server.store.counts()}")
+    print(f"Artists are HumanUsers {user_ids[0]}-{user_ids[-1]}, e.g. USER_ID={user_ids[0]}" if user_ids else "No artists")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.stats.print_summary()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,163 @@
+"""Live task list updates from the ShotGrid event log.
+
+Instead of every open panel re-running the full task query, TaskSync polls
+EventLogEntry for Task and Shot events newer than the last one it saw and
+refetches only the tasks those events touch. Polling backs off while the
+site is quiet and speeds up again as soon as events arrive. Changes are
+returned as (changed tasks, removed task ids) so the panel can apply them
+to its tree without rebuilding it.
+"""
+
+# Standard library imports
+import datetime
+import threading
+
+# Local application imports
+from . import config
+from .tracing import traced
+
+
+SYNC_EVENTS = getattr(config, "SYNC_EVENTS", True)  # poll the event log while the panel is open
+EVENT_POLL_INTERVAL = getattr(config, "EVENT_POLL_INTERVAL", 15)  # seconds between polls after a change
+EVENT_POLL_MAX_INTERVAL = getattr(config, "EVENT_POLL_MAX_INTERVAL", 120)  # slowest polling on a quiet site
+EVENT_POLL_BACKOFF = 1.5  # interval growth per poll without events
+EVENT_BATCH = 500  # events read per poll, more are read on the next one
+
+# Task fields that can change the task list or the tree
+TASK_ATTRIBUTES = {'sg_status_list', 'task_assignees', 'step', 'entity', 'content', 'project'}
+# Shot fields shown in the tree through the task's entity
+SHOT_ATTRIBUTES = {'code', 'sg_sequence', 'project'}
+
+
+class TaskSync:
+    """The artist's task list, kept current from the ShotGrid event log"""
+
+    def __init__(self, sgio, interval=None, max_interval=None):
+        self.sgio = sgio
+        self.base_interval = interval or EVENT_POLL_INTERVAL
+        self.max_interval = max(max_interval or EVENT_POLL_MAX_INTERVAL, self.base_interval)
+        self.interval = self.base_interval
+        self.last_event_id = None  # None until load() found the event log
+        self.tasks = {}  # task id -> task
+        self.generation = 0  # bumped by every load()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.last_event_id is not None
+
+    def task_list(self):
+        with self._lock:
+            return list(self.tasks.values())
+
+    @traced("sync")
+    def load(self):
+        """Load the task list with SGIO.refresh_tasks and start following the event log from here"""
+        # Taken first, so events made during the query are replayed rather than lost
+        try:
+            event_id = self.sgio.latest_event_id()
+        except Exception as e:
+            print(f"Event log unavailable, live task updates disabled: {e}")
+            event_id = None
+        tasks = self.sgio.refresh_tasks()
+        with self._lock:
+            self.tasks = {task['id']: task for task in tasks}
+            self.last_event_id = event_id
+            self.generation += 1
+            self.interval = self.base_interval
+        return tasks
+
+    @traced("sync")
+    def poll(self, generation=None):
+        """Apply the events since the last poll; returns (changed tasks, removed task ids).
+
+        With a generation, nothing is done once load() ran again since it was
+        taken, so a caller never misses changes made to a list it no longer shows.
+        The ShotGrid queries run without the lock, so task_list() and load()
+        don't wait on them; their result is dropped when load() or another poll
+        moved the list on meanwhile.
+        Raises if ShotGrid can't be reached, call failed() to back off.
+        """
+        with self._lock:
+            if not self.enabled or generation not in (None, self.generation):
+                return [], []
+            last_event_id, generation, tasks = self.last_event_id, self.generation, dict(self.tasks)
+
+        started = datetime.datetime.now(datetime.timezone.utc)
+        events = self.sgio.find_events(last_event_id, limit=EVENT_BATCH)
+        refetch, removed = self.affected_tasks(events, tasks)
+        changed = []
+        if refetch:
+            known_ids = refetch & tasks.keys()
+            returned = set()
+            for task in self.sgio.fetch_tasks(refetch, known_ids):
+                returned.add(task['id'])
+                if self.sgio.task_matches(task):
+                    changed.append(task)
+                else:
+                    removed.add(task['id'])
+            # Deleted, or no longer visible to this user
+            removed.update(known_ids - returned)
+
+        cached = None
+        with self._lock:
+            if (self.generation, self.last_event_id) != (generation, last_event_id):
+                return [], []
+            removed &= self.tasks.keys()
+            for task_id in removed:
+                del self.tasks[task_id]
+            for task in changed:
+                self.tasks[task['id']] = task
+
+            if events:
+                self.last_event_id = events[-1]['id']
+            drained = len(events) < EVENT_BATCH
+            if not drained:
+                self.interval = min(1, self.base_interval)
+            elif events:
+                self.interval = self.base_interval
+            else:
+                self.interval = min(self.max_interval, self.interval * EVENT_POLL_BACKOFF)
+            if (changed or removed) and drained:
+                cached = list(self.tasks.values())
+
+        if cached is not None:
+            # Next session's refresh_tasks only needs the tasks updated after this poll
+            self.sgio.save_cached_tasks(cached, started)
+        if events:
+            print(f"Read {len(events)} events: {len(changed)} tasks changed, {len(removed)} removed")
+        return changed, sorted(removed)
+
+    def affected_tasks(self, events, tasks):
+        """Ids of tasks to refetch and ids of tasks to remove for a batch of events on tasks"""
+        refetch, removed = set(), set()
+        for event in events:
+            entity = event.get('entity') or {}
+            meta = event.get('meta') or {}
+            entity_type = meta.get('entity_type') or entity.get('type')
+            entity_id = meta.get('entity_id') or entity.get('id')
+            action = event['event_type'].rsplit('_', 1)[-1]
+            attribute = event.get('attribute_name')
+
+            if entity_type == 'Task':
+                if action == 'Retirement':
+                    refetch.discard(entity_id)
+                    removed.add(entity_id)
+                elif action in ('New', 'Revival') or attribute in TASK_ATTRIBUTES:
+                    removed.discard(entity_id)
+                    refetch.add(entity_id)
+            elif entity_type == 'Shot':
+                # Tasks of a revived shot come back with the next full query
+                shot_tasks = {
+                    task_id for task_id, task in tasks.items() if task.get('entity.Shot.id') == entity_id
+                }
+                if action == 'Retirement':
+                    refetch -= shot_tasks
+                    removed |= shot_tasks
+                elif action == 'Change' and attribute in SHOT_ATTRIBUTES:
+                    refetch |= shot_tasks - removed
+        return refetch, removed
+
+    def failed(self):
+        """Back off after a poll that couldn't reach ShotGrid"""
+        self.interval = min(self.max_interval, self.interval * 2)
@@ -0,0 +1,313 @@
+"""Timing traces for SGNukeBuilder.
+
+ShotGrid calls, probes, extractions, renders, encodes, uploads, file
+lookups and child processes are wrapped in spans. With tracing enabled
+(TRACE = True in config.py, or enable()) every finished span is appended as
+one JSON line to a trace file, with its duration, parent span, thread,
+outcome and attributes such as byte counts. Disabled, a traced call costs a
+single flag check.
+
+Traces can be summarised per operation or converted for chrome://tracing
+and Perfetto:
+
+    python -m SGNukeBuilder.tracing summary ~/.sgnukebuilder/traces/trace_*.jsonl
+    python -m SGNukeBuilder.tracing chrome trace_1234.jsonl trace_1234.json
+"""
+
+# Standard library imports
+import os
+import sys
+import json
+import time
+import datetime
+import functools
+import itertools
+import threading
+
+# Local application imports
+from . import config
+
+
+_enabled = False
+_writer = None
+_ids = itertools.count(1)
+_local = threading.local()
+
+
+class Span:
+    """One timed operation; use as a context manager or through traced()"""
+
+    __slots__ = ('id', 'parent', 'name', 'category', 'attrs', 'wall_start', 'start', 'end', 'outcome', 'thread')
+
+    def __init__(self, name, category, attrs):
+        self.id = next(_ids)
+        self.parent = None
+        self.name = name
+        self.category = category
+        self.attrs = attrs
+        self.wall_start = None  # epoch ns, so spans of several processes line up
+        self.start = None
+        self.end = None
+        self.outcome = 'ok'
+        self.thread = threading.current_thread().name
+
+    def set(self, **attrs):
+        """Add attributes, e.g. bytes=... or returncode=..."""
+        self.attrs.update(attrs)
+
+    def __enter__(self):
+        stack = _stack()
+        self.parent = stack[-1].id if stack else None
+        stack.append(self)
+        self.wall_start = time.time_ns()
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end = time.perf_counter_ns()
+        stack = _stack()
+        if stack and stack[-1] is self:
+            stack.pop()
+        if exc_type is not None:
+            self.outcome = exc_type.__name__
+        elif self.attrs.get('returncode'):
+            self.outcome = 'failed'
+        if _writer is not None:
+            _writer.write(self)
+        return False
+
+    def as_dict(self):
+        return {
+            "id": self.id,
+            "parent": self.parent,
+            "name": self.name,
+            "cat": self.category,
+            "pid": os.getpid(),
+            "thread": self.thread,
+            "start_us": self.wall_start // 1000,
+            "duration_ms": round((self.end - self.start) / 1e6, 3),
+            "outcome": self.outcome,
+            "attrs": self.attrs,
+        }
+
+
+class _NullSpan:
+    """Stands in for a Span while tracing is disabled"""
+
+    __slots__ = ()
+
+    def set(self, **attrs):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NULL_SPAN = _NullSpan()
+
+
+class TraceWriter:
+    """Appends finished spans to a JSON-lines file"""
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def write(self, span):
+        line = json.dumps(span.as_dict(), default=str)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+def _stack():
+    stack = getattr(_local, 'stack', None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+def enabled():
+    return _enabled
+
+
+def trace_path():
+    """File spans are written to, None while disabled"""
+    return _writer.path if _writer is not None else None
+
+
+def enable(path=None):
+    """Start writing spans to path, default a new file in TRACE_FOLDER; returns the path"""
+    global _enabled, _writer
+    if _writer is not None:
+        _writer.close()
+    if path is None:
+        stamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        path = os.path.join(TRACE_FOLDER, f"trace_{stamp}_{os.getpid()}.jsonl")
+    _writer = TraceWriter(path)
+    _enabled = True
+    print(f"Tracing to {path}")
+    return path
+
+
+def disable():
+    global _enabled, _writer
+    _enabled = False
+    if _writer is not None:
+        _writer.close()
+        _writer = None
+
+
+def span(name, category="", **attrs):
+    """Context manager timing a block: `with span("encode", "ffmpeg", path=p) as s: ... s.set(bytes=n)`"""
+    if not _enabled:
+        return NULL_SPAN
+    return Span(name, category, attrs)
+
+
+def process_span(cmd, **attrs):
+    """Span for a child process, named after its executable; set returncode on it when it exits"""
+    if not _enabled:
+        return NULL_SPAN
+    attrs["cmd"] = " ".join(str(arg) for arg in cmd)[:500]
+    return Span(os.path.basename(str(cmd[0])), "process", attrs)
+
+
+def current():
+    """The innermost open span of this thread, a no-op span when there is none"""
+    if not _enabled:
+        return NULL_SPAN
+    stack = _stack()
+    return stack[-1] if stack else NULL_SPAN
+
+
+def traced(category, name=None):
+    """Decorator running every call of a function or method in a span"""
+    def decorator(fn):
+        span_name = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            with Span(span_name, category, {}):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def load(paths):
+    """Spans from one or more JSON-lines trace files, as dicts"""
+    spans = []
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    try:
+                        spans.append(json.loads(line))
+                    except ValueError:
+                        pass  # partly written last line of a killed process
+    return spans
+
+
+def summarize(spans):
+    """Totals per (category, name): count, total/mean/max ms, errors and bytes"""
+    summary = {}
+    for record in spans:
+        key = (record["cat"], record["name"])
+        entry = summary.setdefault(key, {"count": 0, "total_ms": 0.0, "max_ms": 0.0, "errors": 0, "bytes": 0})
+        entry["count"] += 1
+        entry["total_ms"] += record["duration_ms"]
+        entry["max_ms"] = max(entry["max_ms"], record["duration_ms"])
+        entry["errors"] += record["outcome"] != "ok"
+        entry["bytes"] += record["attrs"].get("bytes", 0) or 0
+    for entry in summary.values():
+        entry["mean_ms"] = entry["total_ms"] / entry["count"]
+    return summary
+
+
+def print_summary(spans):
+    summary = summarize(spans)
+    by_category = {}
+    for (category, _), entry in summary.items():
+        by_category[category] = by_category.get(category, 0.0) + entry["total_ms"]
+
+    print(f"{'operation':<52} {'count':>6} {'total s':>9} {'mean ms':>9} {'max ms':>9} {'errors':>6} {'MB':>8}")
+    for category in sorted(by_category, key=by_category.get, reverse=True):
+        print(f"[{category or 'other'}]  {by_category[category] / 1000:.2f} s")
+        entries = sorted(
+            ((name, entry) for (cat, name), entry in summary.items() if cat == category),
+            key=lambda item: item[1]["total_ms"], reverse=True
+        )
+        for name, entry in entries:
+            print(f"  {name[:50]:<50} {entry['count']:>6} {entry['total_ms'] / 1000:>9.2f} "
+                  f"{entry['mean_ms']:>9.1f} {entry['max_ms']:>9.1f} {entry['errors']:>6} "
+                  f"{entry['bytes'] / 1e6:>8.1f}")
+
+
+def chrome_trace(spans):
+    """Spans as a Chrome trace event list for chrome://tracing or Perfetto"""
+    threads = {}
+    events = []
+    for record in spans:
+        tid = threads.setdefault((record["pid"], record["thread"]), len(threads) + 1)
+        args = dict(record["attrs"], outcome=record["outcome"])
+        events.append({
+            "name": record["name"],
+            "cat": record["cat"],
+            "ph": "X",
+            "ts": record["start_us"],
+            "dur": int(record["duration_ms"] * 1000),
+            "pid": record["pid"],
+            "tid": tid,
+            "args": args,
+        })
+    for (pid, thread), tid in threads.items():
+        events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": thread}})
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def export_chrome_trace(paths, output_path):
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(chrome_trace(load(paths)), f)
+    print(f"Wrote {output_path}")
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Summarise or convert SGNukeBuilder traces.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    summary_parser = commands.add_parser("summary", help="time per operation")
+    summary_parser.add_argument("traces", nargs="+")
+    chrome_parser = commands.add_parser("chrome", help="convert to a Chrome trace json")
+    chrome_parser.add_argument("trace")
+    chrome_parser.add_argument("output")
+    args = parser.parse_args(argv)
+
+    if args.command == "summary":
+        print_summary(load(args.traces))
+    else:
+        export_chrome_trace([args.trace], args.output)
+    return 0
+
+
+TRACE_FOLDER = getattr(config, "TRACE_FOLDER", os.path.join(
+    getattr(config, "CACHE_FOLDER_LOCATION", os.path.join(os.path.expanduser("~"), ".sgnukebuilder")), "traces"
+))
+if getattr(config, "TRACE", False) or os.environ.get("SGNUKEBUILDER_TRACE"):
+    enable()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,986 @@
+"""Qt user interface for SGNukeBuilder.
+
+Kept separate from the pipeline classes so PySide6 is only imported once the
+panel is opened.
+"""
+
+# Standard library imports
+import os
+
+# Third-party library imports
+from PySide6.QtCore import (
+    Qt, QObject, QRunnable, QThreadPool, QTimer, QFileSystemWatcher, Signal,
+    QAbstractItemModel, QModelIndex
+)
+from PySide6.QtWidgets import (
+    QWidget, QMainWindow,
+    QTreeView, QAbstractItemView, QHeaderView, QLabel,
+    QVBoxLayout, QHBoxLayout, QPushButton,
+    QTreeWidget, QTreeWidgetItem
+)
+from PySide6.QtGui import QStandardItemModel
+
+# Local application imports
+from .SGNukeBuilder import (
+    ShotContext, NukeHandler, TaskRecord, StreamingEncoder,
+    STREAMING_PUBLISH, PARALLEL_RENDER
+)
+from .jobs import JobScheduler, in_main_thread, RUNNING
+from .sync import TaskSync, SYNC_EVENTS
+from .watch import ShotState, ShotStateIndex, shot_key, watch_mode, WATCH_POLL_INTERVAL, WATCH_BATCH_MS
+from .prefetch import Prefetcher, PREFETCH_PLATES
+try:
+    import nuke
+except ImportError:  # plain Python, e.g. profiling the task tree outside Nuke
+    nuke = None
+
+
+# Item data roles of shot rows
+PROJ_ROLE = int(Qt.UserRole)
+SEQ_ROLE = PROJ_ROLE + 1
+SHOT_ROLE = PROJ_ROLE + 2
+TASK_ID_ROLE = PROJ_ROLE + 3
+PROJ_ID_ROLE = PROJ_ROLE + 4
+SHOT_ID_ROLE = PROJ_ROLE + 5
+RECORD_ROLES = {
+    PROJ_ROLE: 'proj',
+    SEQ_ROLE: 'seq',
+    SHOT_ROLE: 'shot',
+    TASK_ID_ROLE: 'task_id',
+    PROJ_ID_ROLE: 'proj_id',
+    SHOT_ID_ROLE: 'shot_id',
+}
+
+# Number of child rows created per fetchMore call
+FETCH_BATCH_SIZE = 256
+# Above this many tasks only the project level is expanded when the tree is shown
+EXPAND_ALL_LIMIT = 500
+
+
+class TreeNode:
+    """Project, sequence or shot row of TaskTreeModel.
+
+    Covers records[start:end] of the model's sorted task table; children are
+    only created when the view asks for them.
+    """
+
+    __slots__ = ('name', 'parent', 'row', 'level', 'start', 'end', 'cursor', 'children')
+
+    def __init__(self, name, parent, row, level, start, end):
+        self.name = name
+        self.parent = parent
+        self.row = row
+        self.level = level
+        self.start = start
+        self.end = end
+        self.cursor = start  # first record not yet turned into a child
+        self.children = []
+
+
+class TaskTreeModel(QAbstractItemModel):
+    """Lazy project/sequence/shot model backed by a sorted table of TaskRecords"""
+
+    LEVEL_KEYS = ('proj', 'seq', 'shot')
+    COLUMNS = ('Shot', 'Comp', 'Plate', 'Render', 'Published')
+
+    def __init__(self, tasks=(), parent=None, shot_states=None):
+        super().__init__(parent)
+        self.records = []
+        self.root = TreeNode('', None, 0, -1, 0, 0)
+        self.updating = False  # no nested lazy fetching while rows are being changed
+        self.shot_states = shot_states  # ShotStateIndex shown in the extra columns of shot rows
+        self.set_tasks(tasks)
+
+    def set_tasks(self, tasks):
+        self.beginResetModel()
+        self.records = sorted((TaskRecord.from_task(task) for task in tasks), key=TaskRecord.sort_key)
+        self.by_id = {record.task_id: record for record in self.records}
+        self.root = TreeNode('', None, 0, -1, 0, len(self.records))
+        self.endResetModel()
+
+    def apply_changes(self, tasks, removed_ids):
+        """Insert, update, move and remove tasks in place, keeping the view's selection and expansion"""
+        self.updating = True
+        try:
+            self._apply_changes(tasks, removed_ids)
+        finally:
+            self.updating = False
+
+    def _apply_changes(self, tasks, removed_ids):
+        for task_id in removed_ids:
+            record = self.by_id.pop(task_id, None)
+            if record is not None:
+                self.remove_record(self.position(record.sort_key()))
+
+        for task in tasks:
+            record = TaskRecord.from_task(task)
+            old = self.by_id.get(record.task_id)
+            self.by_id[record.task_id] = record
+            if old is None:
+                self.insert_record(record)
+            elif old.sort_key() == record.sort_key():
+                position = self.position(record.sort_key())
+                self.records[position] = record
+                self.record_changed(position)
+            else:
+                # Moved to another project, sequence or shot
+                self.remove_record(self.position(old.sort_key()))
+                self.insert_record(record)
+
+    def node(self, index):
+        if index.isValid():
+            return index.internalPointer()
+        return self.root
+
+    def record(self, index):
+        """TaskRecord of a shot row, None for project/sequence rows"""
+        node = self.node(index)
+        if node.level != len(self.LEVEL_KEYS) - 1:
+            return None
+        return self.records[node.start]
+
+    # Incremental updates
+
+    def position(self, key):
+        """Index in records of the first record whose sort key is not below key"""
+        low, high = 0, len(self.records)
+        while low < high:
+            middle = (low + high) // 2
+            if self.records[middle].sort_key() < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def node_index(self, node):
+        if node is self.root:
+            return QModelIndex()
+        return self.createIndex(node.row, 0, node)
+
+    def node_path(self, position):
+        """Created nodes whose range holds records[position], root first"""
+        path = [self.root]
+        node = self.root
+        while True:
+            node = next((child for child in node.children if child.start <= position < child.end), None)
+            if node is None:
+                return path
+            path.append(node)
+
+    def record_changed(self, position):
+        """Tell the view when the record shown by a shot row was replaced"""
+        node = self.node_path(position)[-1]
+        if node.level == len(self.LEVEL_KEYS) - 1 and node.start == position:
+            index = self.node_index(node)
+            self.dataChanged.emit(index, index.siblingAtColumn(len(self.COLUMNS) - 1))
+
+    def shots_changed(self, keys):
+        """Refresh the state columns of the shot rows of (project, sequence, shot) keys"""
+        for key in keys:
+            position = self.position(key)
+            if position >= len(self.records) or shot_key(self.records[position]) != key:
+                continue
+            node = self.node_path(position)[-1]
+            if node.level == len(self.LEVEL_KEYS) - 1:
+                index = self.node_index(node)
+                self.dataChanged.emit(index.siblingAtColumn(1), index.siblingAtColumn(len(self.COLUMNS) - 1))
+
+    def shift(self, node, first, delta, path):
+        """Move the rows starting at records[first] or later by delta and resize the path rows by delta"""
+        if any(node is path_node for path_node in path):
+            node.end += delta
+        elif node.start >= first:
+            node.start += delta
+            node.end += delta
+            node.cursor += delta
+        for child in node.children:
+            self.shift(child, first, delta, path)
+
+    def remove_record(self, position):
+        path = self.node_path(position)
+        # The outermost row left without records goes, with everything below it
+        emptied = next((node for node in path[1:] if node.end - node.start == 1), None)
+        if emptied is not None:
+            parent = emptied.parent
+            path = path[:path.index(emptied)]
+            self.beginRemoveRows(self.node_index(parent), emptied.row, emptied.row)
+            del parent.children[emptied.row]
+            for row in range(emptied.row, len(parent.children)):
+                parent.children[row].row = row
+
+        self.shift(self.root, position + 1, -1, path)
+        for node in path:
+            if node.cursor > position:
+                node.cursor -= 1
+        del self.records[position]
+
+        if emptied is not None:
+            self.endRemoveRows()
+        elif position < len(self.records):
+            self.record_changed(position)
+
+    def insert_record(self, record):
+        position = self.position(record.sort_key())
+        path = [self.root]
+        node = self.root
+        new_node = None
+        while node.level < len(self.LEVEL_KEYS) - 1:
+            name = getattr(record, self.LEVEL_KEYS[node.level + 1])
+            child = next((child for child in node.children if child.name == name), None)
+            if child is not None:
+                path.append(child)
+                node = child
+                continue
+            # Rows past the cursor are created by fetchMore once the view gets there
+            if position < node.cursor or node.cursor == node.end:
+                row = sum(1 for child in node.children if child.start < position)
+                new_node = TreeNode(name, node, row, node.level + 1, position, position + 1)
+            break
+
+        parent = path[-1]
+        if new_node is not None:
+            self.beginInsertRows(self.node_index(parent), new_node.row, new_node.row)
+
+        self.shift(self.root, position, 1, path)
+        # The record lands in created rows below every path row but the last, unless a row is made for it
+        for node in path[:-1] if new_node is None else path:
+            node.cursor += 1
+        self.records.insert(position, record)
+
+        if new_node is None:
+            self.record_changed(position)
+            return
+        parent.children.insert(new_node.row, new_node)
+        for row in range(new_node.row + 1, len(parent.children)):
+            parent.children[row].row = row
+        self.endInsertRows()
+
+    # Lazy population
+
+    def canFetchMore(self, parent):
+        node = self.node(parent)
+        return not self.updating and node.level < len(self.LEVEL_KEYS) - 1 and node.cursor < node.end
+
+    def fetchMore(self, parent):
+        if not self.canFetchMore(parent):
+            return
+        node = self.node(parent)
+        new_children = []
+        cursor = node.cursor
+        child_level = node.level + 1
+        key = self.LEVEL_KEYS[child_level]
+        records = self.records
+
+        while cursor < node.end and len(new_children) < FETCH_BATCH_SIZE:
+            name = getattr(records[cursor], key)
+            end = cursor + 1
+            while end < node.end and getattr(records[end], key) == name:
+                end += 1
+            row = len(node.children) + len(new_children)
+            new_children.append(TreeNode(name, node, row, child_level, cursor, end))
+            cursor = end
+
+        if not new_children:
+            return
+        first = len(node.children)
+        self.updating = True
+        try:
+            self.beginInsertRows(parent, first, first + len(new_children) - 1)
+            node.children.extend(new_children)
+            node.cursor = cursor
+            self.endInsertRows()
+        finally:
+            self.updating = False
+
+    # QAbstractItemModel interface
+
+    def index(self, row, column, parent=QModelIndex()):
+        node = self.node(parent)
+        if column < 0 or column >= len(self.COLUMNS) or row < 0 or row >= len(node.children):
+            return QModelIndex()
+        return self.createIndex(row, column, node.children[row])
+
+    def parent(self, index):
+        if not index.isValid():
+            return QModelIndex()
+        parent_node = index.internalPointer().parent
+        if parent_node is None or parent_node is self.root:
+            return QModelIndex()
+        return self.createIndex(parent_node.row, 0, parent_node)
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.column() > 0:
+            return 0
+        return len(self.node(parent).children)
+
+    def columnCount(self, parent=QModelIndex()):
+        return len(self.COLUMNS)
+
+    def hasChildren(self, parent=QModelIndex()):
+        if parent.column() > 0:
+            return False
+        node = self.node(parent)
+        return node.level < len(self.LEVEL_KEYS) - 1 and node.end > node.start
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole and 0 <= section < len(self.COLUMNS):
+            return self.COLUMNS[section]
+        return None
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        node = index.internalPointer()
+        if role == Qt.DisplayRole and index.column() == 0:
+            return node.name
+        if node.level != len(self.LEVEL_KEYS) - 1:
+            return None
+        if role in (Qt.DisplayRole, Qt.ToolTipRole):
+            return self.state_text(node, index.column(), role)
+
+        attr = RECORD_ROLES.get(role)
+        if attr is None:
+            return None
+        return getattr(self.records[node.start], attr)
+
+    def state_text(self, node, column, role):
+        """Comp version, plate range, rendered frames and publish state of a shot row, from the index"""
+        state = self.shot_states.get(shot_key(self.records[node.start])) if self.shot_states else None
+        if state is None or column == 0:
+            return None
+        if column == 1:
+            return state.context.versions['work'] if state.script_exists else "-"
+        if column == 4:
+            return "yes" if state.published else "-"
+
+        sequence = state.plate if column == 2 else state.render
+        if not sequence:
+            return "-"
+        if role == Qt.ToolTipRole:
+            return sequence.describe_problems() or sequence.path
+        text = sequence.frame_range_text() if column == 2 else f"{len(sequence)} frames"
+        return text + " !" if sequence.gaps or sequence.zero_frames else text
+
+
+class WorkerSignals(QObject):
+    result = Signal(int, object)
+    error = Signal(int, str)
+    done = Signal(object)
+
+
+class Worker(QRunnable):
+    """Run a callable on a QThreadPool and report back to the ui thread through signals"""
+
+    def __init__(self, request_id, fn, *args, **kwargs):
+        super().__init__()
+        self.request_id = request_id
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = WorkerSignals()
+
+    def run(self):
+        try:
+            result = self.fn(*self.args, **self.kwargs)
+            self.signals.result.emit(self.request_id, result)
+        except Exception as e:
+            self.signals.error.emit(self.request_id, str(e))
+        finally:
+            self.signals.done.emit(self)
+
+
+class JobSignals(QObject):
+    changed = Signal(object)
+
+
+class JobListWidget(QWidget):
+    """List of background jobs with their progress, and buttons to cancel or clear them"""
+
+    def __init__(self, scheduler, parent=None):
+        super().__init__(parent)
+        self.scheduler = scheduler
+        self.items = {}  # job id -> (job, QTreeWidgetItem)
+
+        self.list = QTreeWidget()
+        self.list.setHeaderLabels(["Job", "Status", "Progress"])
+        self.list.setRootIsDecorated(False)
+        self.cancel_button = QPushButton("Cancel Job")
+        self.cancel_button.clicked.connect(self.cancel_selected)
+        self.clear_button = QPushButton("Clear Finished")
+        self.clear_button.clicked.connect(self.clear_finished)
+
+        buttons = QHBoxLayout()
+        buttons.addWidget(self.cancel_button)
+        buttons.addWidget(self.clear_button)
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(QLabel("Jobs:"))
+        layout.addWidget(self.list)
+        layout.addLayout(buttons)
+
+        # Scheduler callbacks come from worker threads, hop to the ui thread through a signal
+        self.signals = JobSignals()
+        self.signals.changed.connect(self.update_job)
+        scheduler.add_listener(self.signals.changed.emit)
+
+    def update_job(self, job):
+        if job.id not in self.items:
+            item = QTreeWidgetItem([job.name, "", ""])
+            self.list.addTopLevelItem(item)
+            self.items[job.id] = (job, item)
+        _, item = self.items[job.id]
+
+        item.setText(1, job.state if not job.error else f"{job.state}: {job.error}")
+        if job.state == RUNNING and job.progress is not None:
+            item.setText(2, f"{job.progress * 100:.0f}%")
+        elif job.state == RUNNING:
+            item.setText(2, "...")
+        else:
+            item.setText(2, "")
+
+    def cancel_selected(self):
+        for item in self.list.selectedItems():
+            for job, job_item in self.items.values():
+                if job_item is item:
+                    self.scheduler.cancel(job)
+
+    def clear_finished(self):
+        self.scheduler.clear_finished()
+        remaining = {job.id for job in self.scheduler.jobs}
+        for job_id in list(self.items):
+            if job_id not in remaining:
+                _, item = self.items.pop(job_id)
+                self.list.takeTopLevelItem(self.list.indexOfTopLevelItem(item))
+
+
+class ShotStateWatcher(QObject):
+    """Keeps a ShotStateIndex current while the panel is open.
+
+    Watched folders are reported by QFileSystemWatcher, or found by polling
+    their mtimes on network filesystems. Shots changed within WATCH_BATCH_MS
+    are rescanned together on the thread pool and shots_changed is emitted
+    with the keys whose shown state changed.
+    """
+
+    shots_changed = Signal(object)
+
+    def __init__(self, index, run_in_background, parent=None):
+        super().__init__(parent)
+        self.index = index
+        self.run_in_background = run_in_background
+        self.mode = watch_mode()
+        self.pending = set()
+        self.busy = False  # a scan or poll is running, changes found meanwhile wait for it
+
+        self.watcher = None
+        if self.mode == 'native':
+            self.watcher = QFileSystemWatcher(self)
+            self.watcher.directoryChanged.connect(self.on_folder_changed)
+        self.batch_timer = QTimer(self)
+        self.batch_timer.setSingleShot(True)
+        self.batch_timer.setInterval(WATCH_BATCH_MS)
+        self.batch_timer.timeout.connect(self.scan_pending)
+        self.poll_timer = QTimer(self)
+        self.poll_timer.setInterval(int(WATCH_POLL_INTERVAL * 1000))
+        self.poll_timer.timeout.connect(self.poll)
+        if self.mode == 'poll':
+            self.poll_timer.start()
+
+    def set_records(self, records):
+        """Follow the shots of these TaskRecords, scanning the ones not seen before"""
+        self.pending.update(self.index.set_shots(records))
+        self.update_watched_folders()
+        self.scan_pending()
+
+    def state(self, record):
+        """ShotState of a record's shot, scanned right away only when it has none yet.
+
+        A state whose folders changed since its scan is returned as it is and
+        queued for the background rescan, which emits shots_changed.
+        """
+        key = shot_key(record)
+        state = self.index.get(key)
+        if state is None:
+            if key not in self.index:
+                return ShotState.scan(record, self.index.base_path)
+            self.index.scan([key])
+            self.update_watched_folders()
+            return self.index.get(key)
+        if not state.is_current() and key not in self.pending:
+            self.pending.add(key)
+            if not self.batch_timer.isActive():
+                self.batch_timer.start()
+        return state
+
+    def on_folder_changed(self, folder):
+        self.pending.update(self.index.keys_for_folder(folder))
+        # Not restarted by later changes, so a running render still updates its row every batch
+        if not self.batch_timer.isActive():
+            self.batch_timer.start()
+
+    def poll(self):
+        if self.busy:
+            return
+        self.busy = True
+        self.run_in_background(0, self.index.changed_keys, self.on_polled, self.on_failed)
+
+    def on_polled(self, request_id, keys):
+        self.busy = False
+        self.pending.update(keys)
+        self.scan_pending()
+
+    def scan_pending(self):
+        if self.busy or not self.pending:
+            return
+        keys, self.pending = list(self.pending), set()
+        self.busy = True
+        self.run_in_background(0, lambda: self.index.scan(keys), self.on_scanned, self.on_failed)
+
+    def on_scanned(self, request_id, changed):
+        self.busy = False
+        self.update_watched_folders()
+        if changed:
+            self.shots_changed.emit(changed)
+        self.scan_pending()
+
+    def on_failed(self, request_id, message):
+        self.busy = False
+        print(f"Error scanning shot folders: {message}")
+
+    def update_watched_folders(self):
+        if self.watcher is None:
+            return
+        wanted = set(self.index.folders())
+        watched = set(self.watcher.directories())
+        if watched - wanted:
+            self.watcher.removePaths(list(watched - wanted))
+        if wanted - watched:
+            failed = self.watcher.addPaths(sorted(wanted - watched))
+            if failed:
+                print(f"Could not watch {len(failed)} folders, e.g. {failed[0]}")
+
+    def stop(self):
+        self.batch_timer.stop()
+        self.poll_timer.stop()
+        if self.watcher is not None and self.watcher.directories():
+            self.watcher.removePaths(self.watcher.directories())
+
+
+def require(result, message):
+    """Fail the running job when a pipeline step returned nothing"""
+    if not result:
+        raise RuntimeError(message)
+    return result
+
+
+class MainWindow(QMainWindow):
+    def __init__(self, sgio):
+        super().__init__()
+        self.io_instance = sgio
+        self.nuke_instance = NukeHandler()
+        self.context = None  # ShotContext of the selected shot, shared with the jobs it starts
+
+        # Sets ui elements
+        self.setWindowTitle("ShotGrid Task Tree")
+        self.resize(600, 600)
+        self.tree = QTreeView()
+        self.tree.header().setStretchLastSection(False)
+        self.tree.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.tree.setSelectionMode(QAbstractItemView.ExtendedSelection)
+
+        self.build_comp_button = self.add_button("Build/Open Comp", self.build_comp)
+        self.upversion_button = self.add_button("Write Up Version", self.upversion_passthrough)
+        self.in_progress_button = self.add_button("Put Task 'In Progress'", self.task_in_progress)
+        self.publish_button = self.add_button("Publish Video", self.task_publish)
+        self.refresh_button = self.add_button("Refresh Tasks", self.refresh_tasks)
+        self.status_label = QLabel()
+
+        self.main_widget = QWidget()
+        layout = QVBoxLayout(self.main_widget)
+
+        layout.addWidget(QLabel("Project Status:"))
+        layout.addWidget(self.tree)
+        layout.addWidget(self.status_label)
+        layout.addWidget(self.refresh_button)
+        layout.addWidget(self.build_comp_button)
+        layout.addWidget(self.upversion_button)
+        layout.addWidget(self.in_progress_button)
+        layout.addWidget(self.publish_button)
+
+        # Conversions, renders and uploads run as background jobs
+        self.scheduler = JobScheduler()
+        self.job_list = JobListWidget(self.scheduler)
+        layout.addWidget(self.job_list)
+
+        self.setCentralWidget(self.main_widget)
+
+        # Tasks are fetched on a worker thread so the window (and Nuke) stays responsive
+        self.data = []
+        self.thread_pool = QThreadPool.globalInstance()
+        self._workers = set()
+        self._fetch_id = 0
+        self._fetch_worker = None
+
+        # While the panel is open the tree follows the ShotGrid event log instead of re-querying
+        self.sync = TaskSync(self.io_instance) if SYNC_EVENTS else None
+        self.poll_timer = QTimer(self)
+        self.poll_timer.setSingleShot(True)
+        self.poll_timer.timeout.connect(self.poll_events)
+        self._poll_worker = None
+
+        # Script, plate, render and publish state per shot, shown in the tree and used by the buttons
+        self.shot_states = ShotStateIndex()
+        self.state_watcher = ShotStateWatcher(self.shot_states, self.run_in_background, self)
+        self.state_watcher.shots_changed.connect(self.on_shots_changed)
+
+        # Plates of assigned shots are extracted ahead of Build/Open Comp, if enabled
+        self.prefetcher = Prefetcher(self.scheduler, self.io_instance, self.shot_states) if PREFETCH_PLATES else None
+
+        # Show last session's tasks straight away, then revalidate them in the background
+        cached_tasks = self.io_instance.get_cached_tasks()
+        if cached_tasks:
+            self.show_tasks(cached_tasks)
+        self.refresh_tasks()
+
+    def run_in_background(self, request_id, fn, on_result, on_error=None):
+        """Start fn on the thread pool and deliver its result to on_result in the ui thread"""
+        worker = Worker(request_id, fn)
+        worker.signals.result.connect(on_result)
+        if on_error is not None:
+            worker.signals.error.connect(on_error)
+        worker.signals.done.connect(self._workers.discard)
+        self._workers.add(worker)
+        self.thread_pool.start(worker)
+        return worker
+
+    def refresh_tasks(self):
+        """(Re)load the task list asynchronously, unless a load is still running"""
+        # A ShotGrid find can't be interrupted, so a second one would only queue behind it
+        if self._fetch_worker is not None:
+            return
+        self.refresh_button.setEnabled(False)
+        self.poll_timer.stop()
+
+        self._fetch_id += 1
+        self.set_loading()
+        load = self.sync.load if self.sync is not None else self.io_instance.refresh_tasks
+        self._fetch_worker = self.run_in_background(self._fetch_id, load, self.on_tasks_loaded, self.on_tasks_failed)
+
+    def set_loading(self):
+        """Show a placeholder while tasks are being fetched"""
+        self.status_label.setText("Loading tasks...")
+        if not self.data:
+            model = QStandardItemModel(1, 1)
+            model.setData(model.index(0, 0), "Loading tasks...")
+            self.tree.setModel(model)
+
+    def on_tasks_loaded(self, request_id, tasks):
+        if request_id != self._fetch_id:
+            return
+        self._fetch_worker = None
+        self.refresh_button.setEnabled(True)
+        self.show_tasks(tasks)
+        self.scheduler.submit("Probe source videos", self.probe_source_videos)
+        if self.prefetcher is not None:
+            self.prefetcher.set_tasks(tasks)
+        self.schedule_poll()
+
+    def schedule_poll(self):
+        if self.sync is not None and self.sync.enabled and self.isVisible():
+            self.poll_timer.start(int(self.sync.interval * 1000))
+
+    def poll_events(self):
+        """Read new ShotGrid events in the background; skipped while a poll or a full load is running"""
+        if self._fetch_worker is not None or self._poll_worker is not None:
+            return
+        generation = self.sync.generation
+        self._poll_worker = self.run_in_background(
+            self._fetch_id, lambda: self.sync.poll(generation), self.on_events_polled, self.on_events_failed
+        )
+
+    def on_events_polled(self, request_id, changes):
+        self._poll_worker = None
+        if request_id != self._fetch_id:
+            return
+        tasks, removed_ids = changes
+        model = self.tree.model()
+        if (tasks or removed_ids) and isinstance(model, TaskTreeModel):
+            model.apply_changes(tasks, removed_ids)
+            self.data = self.sync.task_list()
+            self.state_watcher.set_records(model.records)
+            self.status_label.setText(f"{len(self.data)} tasks")
+            if self.prefetcher is not None:
+                self.prefetcher.set_tasks(self.data)
+        self.schedule_poll()
+
+    def on_events_failed(self, request_id, message):
+        self._poll_worker = None
+        if request_id != self._fetch_id:
+            return
+        print(f"Error reading ShotGrid events: {message}")
+        self.sync.failed()
+        self.schedule_poll()
+
+    def probe_source_videos(self, job):
+        """Warm the probe cache with the source video of every assigned shot"""
+        shots = {}
+        for task in self.data:
+            record = TaskRecord.from_task(task)
+            shots.setdefault((record.proj, record.seq, record.shot), record)
+
+        paths = []
+        for record in shots.values():
+            job.check_cancelled()
+            paths.append(ShotContext.for_record(record).get_source_video_path())
+        probed = self.io_instance.probe_many(paths)
+        print(f"Probed {sum(1 for media in probed.values() if media)} source videos")
+
+    def show_tasks(self, tasks):
+        self.data = tasks
+        model = self.build_tree(self.data)
+        self.tree.setModel(model)
+        self.tree.header().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.state_watcher.set_records(model.records)
+        if len(tasks) <= EXPAND_ALL_LIMIT:
+            self.tree.expandAll()
+        else:
+            self.tree.expandToDepth(0)
+        self.status_label.setText(f"{len(tasks)} tasks")
+
+    def on_tasks_failed(self, request_id, message):
+        if request_id != self._fetch_id:
+            return
+        self._fetch_worker = None
+        self.refresh_button.setEnabled(True)
+        print(f"Error fetching tasks: {message}")
+        if self.data:
+            self.status_label.setText(f"{len(self.data)} tasks (cached, ShotGrid unavailable)")
+        else:
+            self.status_label.setText("Could not load tasks")
+        # Keep following the event log from the last successful load, if any
+        self.schedule_poll()
+
+    def on_shots_changed(self, keys):
+        model = self.tree.model()
+        if isinstance(model, TaskTreeModel):
+            model.shots_changed(keys)
+        if self.prefetcher is not None:
+            # Newly scanned shots may need a plate
+            self.prefetcher.fill()
+
+    def closeEvent(self, event):
+        self.poll_timer.stop()
+        self.state_watcher.stop()
+        if self.prefetcher is not None:
+            self.prefetcher.stop()
+        super().closeEvent(event)
+
+    def current_state(self):
+        """ShotState of the selected shot from the index, a stale one is rescanned in the background"""
+        model = self.tree.model()
+        record = model.record(self.tree.currentIndex()) if isinstance(model, TaskTreeModel) else None
+        if record is None:
+            print("No shot selected!")
+            return None
+        return self.state_watcher.state(record)
+
+    def current_context(self):
+        """ShotContext of the selected shot, as resolved by its last scan"""
+        state = self.current_state()
+        if state is None:
+            return None
+        self.context = state.context
+        return self.context
+
+    def upversion_passthrough(self):
+        """Write up a version of the selected shot's comp"""
+        context = self.current_context()
+        if context is not None:
+            self.nuke_instance.upversion_proj(context)
+
+    def build_tree(self, tasks):
+        print('Started building tree...')
+        model = TaskTreeModel(tasks, shot_states=self.shot_states)
+        print('Tree has been built.')
+        return model
+
+    def add_button(self, label, action):
+        button = QPushButton(label)
+        button.clicked.connect(lambda: action())
+        return button
+
+    def task_in_progress(self):
+        """Set the status of every selected task to In Progress"""
+        indexes = self.tree.selectionModel().selectedRows()
+        task_ids = [index.data(TASK_ID_ROLE) for index in indexes if index.data(TASK_ID_ROLE)]
+
+        if not indexes:
+            print("No item selected!")
+            return
+
+        if not task_ids:
+            print("No Task ID found for selected item!")
+            return
+
+        def set_in_progress(job):
+            require(self.io_instance.set_task_statuses(task_ids, 'ip'), "Failed to update task status")
+            print('Changed status of task to In Progress.')
+
+        if len(task_ids) == 1:
+            name = f"{indexes[0].data(SHOT_ROLE)}: set In Progress"
+        else:
+            name = f"{len(task_ids)} shots: set In Progress"
+        self.scheduler.submit(name, set_in_progress, resource="shotgrid")
+
+    def task_publish(self):
+        """Publish task - queue render, encode, upload and status update jobs"""
+        index = self.tree.currentIndex()
+
+        if not index.isValid():
+            print("No item selected!")
+            return
+
+        shot = index.data(SHOT_ROLE)
+        shot_id = index.data(SHOT_ID_ROLE)
+        task_id = index.data(TASK_ID_ROLE)
+        proj_id = index.data(PROJ_ID_ROLE)
+        if not task_id:
+            print("No Task ID found for selected item!")
+            return
+
+        # Resolve everything now, the jobs may run after the selection changed
+        context = self.current_context()
+        if context is None:
+            return
+        comp_output_path = context.get_comp_output_path(False)
+        publish_video_path = context.get_publish_video_path()
+
+        if not comp_output_path or not publish_video_path:
+            print("Could not determine comp output or publish video paths")
+            return
+
+        first_frame, last_frame = self.nuke_instance.frame_range()
+        frame_count = last_frame - first_frame + 1
+
+        def render(job):
+            def on_frame(frame):
+                job.set_progress((frame - first_frame + 1) / frame_count)
+                if encoder is not None:
+                    encoder.frame_done(frame)
+
+            encoder = None
+            if STREAMING_PUBLISH:
+                # Encode the review movie while the frames are being rendered
+                encoder = StreamingEncoder(comp_output_path, publish_video_path, first_frame, last_frame)
+                encoder.start()
+
+            try:
+                if PARALLEL_RENDER:
+                    # Only saving the script needs the main thread, the chunks render in separate processes
+                    render_args = in_main_thread(self.nuke_instance.prepare_render, context)
+                    input_paths = in_main_thread(self.nuke_instance.read_paths)
+                    rendered = render_args is not None and self.nuke_instance.render_chunks(
+                        *render_args, on_frame=on_frame, job=job, input_paths=input_paths
+                    )
+                else:
+                    rendered = in_main_thread(self.nuke_instance.render, context, on_frame=on_frame)
+            except Exception:
+                if encoder is not None:
+                    encoder.abort()
+                raise
+
+            if encoder is None:
+                return require(rendered, "Render did not finish")
+            if not rendered or job.cancelled:
+                encoder.abort()
+                raise RuntimeError("Render did not finish")
+            return require(encoder.finish(), "Failed to create video for publishing")
+
+        def encode(job):
+            if STREAMING_PUBLISH:
+                return render_job.result
+            return require(
+                self.io_instance.images_to_video(
+                    comp_output_path, publish_video_path, job=job, frame_range=(first_frame, last_frame)
+                ),
+                "Failed to create video for publishing"
+            )
+
+        def upload(job):
+            video_file = encode_job.result
+            # Make name
+            base = os.path.splitext(os.path.basename(video_file))[0]
+            version = base[-4:]
+            # Version and task are both set to Review Internal in the same request
+            version = require(
+                self.io_instance.publish_video(video_file, version, proj_id, shot_id, task_id,
+                                               version_status='rvi', task_status='rvi'),
+                "Failed to publish video"
+            )
+            print('Changed status of version and task to Review Internal.')
+            return version
+
+        render_job = self.scheduler.submit(f"{shot}: render", render, resource="render")
+        encode_job = self.scheduler.submit(
+            f"{shot}: encode review", encode,
+            resource="default" if STREAMING_PUBLISH else "ffmpeg", depends_on=[render_job]
+        )
+        self.scheduler.submit(f"{shot}: publish", upload, resource="upload", depends_on=[encode_job])
+
+    def build_comp(self):
+        """Open the shot's comp, or queue extracting its plate and building a new one"""
+        state = self.current_state()
+        if state is None:
+            return
+        context = self.context = state.context
+        nuke_script_path = context.get_nuke_script_path(new=False)
+        print('path is', nuke_script_path)
+        if not nuke_script_path:
+            return
+
+        # Will open nuke script if it exists
+        if state.script_exists:
+            nuke.scriptOpen(nuke_script_path)
+            return
+
+        else:
+            print('making comp')
+
+            # Get source video and convert to images
+            source_video_path = context.get_source_video_path()
+            comp_input_path = context.get_comp_input_path(for_nuke=False)
+
+            if not source_video_path:
+                print("Source video not found")
+                return
+
+            if not comp_input_path:
+                print("Could not determine comp input path")
+                return
+
+            def extract(job):
+                image_sequence = require(
+                    self.io_instance.video_to_images(source_video_path, comp_input_path, job=job),
+                    "Failed to convert video to images"
+                )
+                media = require(self.io_instance.probe_media(source_video_path), "Could not read the source video")
+                return image_sequence, media
+
+            def build(job):
+                image_sequence, media = extract_job.result
+                in_main_thread(self.create_comp_from_plate, context, image_sequence, media)
+
+            if self.prefetcher is not None:
+                self.prefetcher.take_over(shot_key(context))
+            extract_job = self.scheduler.submit(f"{context.shot}: extract plate", extract, resource="ffmpeg")
+            self.scheduler.submit(f"{context.shot}: build comp", build, depends_on=[extract_job])
+
+    def create_comp_from_plate(self, context, image_sequence, media):
+        self.nuke_instance.set_nuke_project_settings(media.width, media.height, media.fps)
+        nuke_script_path = context.get_nuke_script_path(new=True)
+        self.nuke_instance.create_comp(image_sequence, nuke_script_path, context)
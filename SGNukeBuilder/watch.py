@@ -0,0 +1,221 @@
+"""What is on disk for every assigned shot, kept current while the panel is open.
+
+ShotStateIndex holds one ShotState per shot: its resolved ShotContext,
+whether the comp script exists and which plate, render and publish files
+are there. The panel shows this as extra tree columns and its buttons read
+from it instead of looking at the filesystem on every click.
+
+The index records the mtimes of each shot's comp/work, comp/input,
+comp/output and comp/publish folders (and their current version folders)
+when it scans them. The panel watches those folders with
+QFileSystemWatcher (inotify on Linux) and rescans only the shots whose
+folders changed. Network filesystems don't deliver change notifications
+for writes made by other machines, so on those the folders are polled with
+changed_keys() instead.
+"""
+
+# Standard library imports
+import os
+import sys
+import threading
+
+# Local application imports
+from . import config
+from .SGNukeBuilder import ShotContext, PROJECT_FOLDER_LOCATION
+from .sequences import find_sequence
+from .tracing import traced
+
+
+WATCH_FILES = getattr(config, "WATCH_FILES", "auto")  # "auto", "native", "poll" or False
+WATCH_POLL_INTERVAL = getattr(config, "WATCH_POLL_INTERVAL", 10)  # seconds between polls of watched folders
+WATCH_BATCH_MS = getattr(config, "WATCH_BATCH_MS", 500)  # changes within this window are rescanned together
+
+NETWORK_FILESYSTEMS = {'nfs', 'nfs4', 'cifs', 'smbfs', 'smb3', 'fuse.sshfs', 'afs', 'lustre', 'gpfs', 'beegfs'}
+
+
+def shot_key(record):
+    return record.proj, record.seq, record.shot
+
+
+def is_network_path(path):
+    """Best guess whether path lives on a network filesystem"""
+    path = os.path.abspath(path)
+    if sys.platform == "win32":
+        if path.startswith('\\\\'):
+            return True
+        try:
+            import ctypes
+            drive = os.path.splitdrive(path)[0] + '\\'
+            return ctypes.windll.kernel32.GetDriveTypeW(drive) == 4  # DRIVE_REMOTE
+        except Exception:
+            return False
+
+    # Longest mount point holding the path, from /proc/mounts on Linux
+    best, fs_type = '', None
+    try:
+        with open('/proc/mounts', 'r', encoding='utf-8') as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) < 3:
+                    continue
+                mount_point = parts[1].replace('\\040', ' ')
+                if (path == mount_point or path.startswith(mount_point.rstrip('/') + '/')) and len(mount_point) > len(best):
+                    best, fs_type = mount_point, parts[2]
+    except OSError:
+        return False
+    return fs_type in NETWORK_FILESYSTEMS
+
+
+def watch_mode(path=None):
+    """'native', 'poll' or None, from WATCH_FILES and the filesystem of the project folder"""
+    if not WATCH_FILES:
+        return None
+    if WATCH_FILES in ('native', 'poll'):
+        return WATCH_FILES
+    return 'poll' if is_network_path(path or PROJECT_FOLDER_LOCATION) else 'native'
+
+
+def existing_folder(folder, stop):
+    """folder, or its nearest existing parent not above stop; a folder made later changes that parent's mtime"""
+    while folder and not os.path.isdir(folder):
+        parent = os.path.dirname(folder)
+        if parent == folder or len(parent) < len(stop):
+            return None
+        folder = parent
+    return folder
+
+
+def folder_mtime(folder):
+    try:
+        return os.stat(folder).st_mtime_ns
+    except OSError:
+        return None
+
+
+class ShotState:
+    """One scan of a shot's comp folders"""
+
+    __slots__ = ('context', 'script_exists', 'plate', 'render', 'published', 'folder_mtimes')
+
+    def __init__(self, context, script_exists, plate, render, published, folder_mtimes):
+        self.context = context
+        self.script_exists = script_exists
+        self.plate = plate  # Sequence of the extracted plate, None without a source version
+        self.render = render  # Sequence of the latest work version's render, None without a work version
+        self.published = published
+        self.folder_mtimes = folder_mtimes  # watched folder -> mtime_ns at scan time
+
+    @classmethod
+    def scan(cls, record, base_path=None):
+        context = ShotContext.for_record(record, base_path)
+        paths = context.paths
+        comp_dir = os.path.join(paths['shot_dir'], "comp")
+
+        wanted = [paths['source_dir']] + [os.path.join(comp_dir, name) for name in ('work', 'input', 'output', 'publish')]
+        # Version folders the files below are written to
+        wanted += [
+            os.path.dirname(path) for path in (
+                paths['nuke_script'], paths['comp_input'], paths['comp_output'], paths['publish_video']
+            ) if path
+        ]
+        # Missing folders are watched through their nearest existing parent, up to the project folder
+        folders = {
+            os.path.normpath(folder) for folder in (existing_folder(path, context.base_path) for path in wanted) if folder
+        }
+        # Taken before the files are looked at, so a change during the scan triggers another one
+        folder_mtimes = {folder: folder_mtime(folder) for folder in folders}
+
+        return cls(
+            context,
+            os.path.exists(paths['nuke_script']),
+            find_sequence(paths['comp_input']) if paths['comp_input'] else None,
+            find_sequence(paths['comp_output']) if paths['comp_output'] else None,
+            bool(paths['publish_video']) and os.path.exists(paths['publish_video']),
+            folder_mtimes,
+        )
+
+    def summary(self):
+        """The values shown in the tree, to tell whether a rescan changed anything"""
+        return (
+            self.context.versions['work'], self.script_exists,
+            self.plate.frame_range_text() if self.plate is not None else None,
+            len(self.render) if self.render is not None else None,
+            self.published,
+        )
+
+    def is_current(self):
+        """True while none of the watched folders changed since the scan"""
+        return all(folder_mtime(folder) == mtime for folder, mtime in self.folder_mtimes.items())
+
+
+class ShotStateIndex:
+    """ShotStates of the assigned shots, by (project, sequence, shot)"""
+
+    def __init__(self, base_path=None):
+        self.base_path = base_path
+        self._records = {}  # key -> TaskRecord
+        self._states = {}  # key -> ShotState
+        self._folders = {}  # watched folder -> set of keys
+        self._lock = threading.Lock()
+
+    def set_shots(self, records):
+        """Follow the shots of these TaskRecords; returns the keys that still need a scan"""
+        with self._lock:
+            self._records = {}
+            for record in records:
+                self._records.setdefault(shot_key(record), record)
+            for key in list(self._states):
+                if key not in self._records:
+                    del self._states[key]
+            self._rebuild_folders()
+            return [key for key in self._records if key not in self._states]
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._records
+
+    def get(self, key):
+        with self._lock:
+            return self._states.get(key)
+
+    @traced("filesystem", "ShotStateIndex.scan")
+    def scan(self, keys):
+        """Rescan shots; returns the keys whose shown state changed"""
+        changed = []
+        for key in keys:
+            with self._lock:
+                record = self._records.get(key)
+                old = self._states.get(key)
+            if record is None:
+                continue
+            state = ShotState.scan(record, self.base_path)
+            with self._lock:
+                if key not in self._records:
+                    continue
+                self._states[key] = state
+            if old is None or old.summary() != state.summary():
+                changed.append(key)
+        with self._lock:
+            self._rebuild_folders()
+        return changed
+
+    def folders(self):
+        """Folders to watch"""
+        with self._lock:
+            return list(self._folders)
+
+    def keys_for_folder(self, folder):
+        with self._lock:
+            return set(self._folders.get(os.path.normpath(folder), ()))
+
+    def changed_keys(self):
+        """Keys of the shots with a folder whose mtime changed since their scan, for polling"""
+        with self._lock:
+            states = list(self._states.items())
+        return [key for key, state in states if not state.is_current()]
+
+    def _rebuild_folders(self):
+        self._folders = {}
+        for key, state in self._states.items():
+            for folder in state.folder_mtimes:
+                self._folders.setdefault(folder, set()).add(key)